@@ -1,24 +1,196 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import itertools
+import os
+import time
+
 from dotenv import load_dotenv
-from flask import Flask, jsonify, make_response, Response, request
+from flask import Flask, jsonify, make_response, Response, request, stream_with_context
+from flask.logging import default_handler
 # from flask_cors import CORS
 
-from meal_max.models import location_model
+from meal_max.db import db
+from meal_max.models import kitchen_model, location_model, weather_history
+from meal_max.models.weather_providers import get_weather_provider
+from meal_max.models.weather_refresh import WEATHER_REFRESH_ENABLED, WEATHER_REFRESH_INTERVAL, weather_refresher
 from meal_max.models.user_models import Users
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.utils import circuit_breaker, compression, metrics, serialization, sql_utils
+from meal_max.utils.health import READINESS_REQUIRE_FRESH_WEATHER, READINESS_STALE_FACTOR, readiness, staleness
+from meal_max.utils.export import get_weather_exporter, reset_weather_exporter
+from meal_max.utils.http_cache import conditional_response, conditional_stats, make_etag, max_age
+from meal_max.utils.http_client import get_http_client, reset_http_client
+from meal_max.utils.logger import configure_logger, restart_logging
+from meal_max.utils.password_hashing import VerificationQueueFull, verification_pool
+from meal_max.utils.pagination import DEFAULT_PAGE_SIZE, parse_fields
+from meal_max.utils.random_utils import random_pool
+from meal_max.utils.scheduling import ProcessLock
+from meal_max.utils.sql_utils import find_missing_tables, get_pool
 
 
 # Load environment variables from .env file
 load_dotenv()
 
 app = Flask(__name__)
+
+# Send app.logger through the shared background log writer instead of Flask's synchronous stderr handler
+app.logger.removeHandler(default_handler)
+configure_logger(app.logger)
+
+# Serialize JSON with orjson when available and compress large responses
+serialization.init_app(app)
+compression.init_app(app)
+# Time requests and SQL statements for /api/metrics
+metrics.init_app(app)
 # This bypasses standard security stuff we'll talk about later
 # If you get errors that use words like cross origin or flight,
 # uncomment this
 # CORS(app)
 
+# Apply migrations and pragmas, then reuse one pooled database connection per request
+sql_utils.init_db()
+sql_utils.init_app(app)
+
+# Users live in the same SQLite database, accessed through SQLAlchemy
+app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{sql_utils.DB_PATH}"
+db.init_app(app)
+
+# Keep stored weather fresh in the background so requests never wait on the weather API
+if WEATHER_REFRESH_ENABLED:
+    weather_refresher.start()
+
 # Initialize the UsersModel
 users = Users()
 
+# Gauges and counters read from the components' stats() at scrape time
+metrics.registry.register_stats("meal_max_db_pool", lambda: get_pool().stats(), "SQLite connection pool",
+                                counters=("checkouts", "waits", "wait_time", "timeouts", "discarded"))
+metrics.registry.register_stats("meal_max_weather_cache", location_model.weather_cache.stats, "Weather response cache",
+                                counters=("hits", "misses", "evictions", "expirations", "coalesced", "stale_served"))
+metrics.registry.register_stats("meal_max_weather_provider", lambda: get_weather_provider().stats(),
+                                "Weather provider", counters=("requests", "errors"))
+metrics.registry.register_stats("meal_max_weather_breaker", location_model.weather_breaker.stats,
+                                "Weather API circuit breaker", counters=("successes", "failures", "rejected"))
+metrics.registry.register_stats("meal_max_random_pool", random_pool.stats, "Random number buffer",
+                                counters=("served", "fallbacks", "refills", "refill_failures"))
+metrics.registry.register_stats("meal_max_weather_refresher", weather_refresher.stats, "Background weather refresher",
+                                counters=("cycles", "refreshed", "failed"))
+metrics.registry.register_stats("meal_max_weather_refresher_rate_limiter",
+                                lambda: weather_refresher.stats()['rate_limiter'], "Weather API rate limiter",
+                                counters=("granted", "wait_time"))
+metrics.registry.register_stats("meal_max_weather_export",
+                                lambda: get_weather_exporter() and get_weather_exporter().stats(), "Weather exporter",
+                                counters=("exported", "dropped", "batches", "rotations", "errors"))
+metrics.registry.register_stats("meal_max_http_cache", conditional_stats.stats, "Conditional GETs",
+                                counters=("requests", "conditional", "not_modified"))
+metrics.registry.register_stats("meal_max_compression", compression.compressor.stats, "Response compression",
+                                counters=("compressed", "bytes_in", "bytes_out"))
+metrics.registry.register_stats("meal_max_password_verification", verification_pool.stats,
+                                "Password verification pool", counters=("rejected",))
+metrics.registry.register_stats("meal_max_readiness", readiness.stats, "Readiness probe",
+                                counters=("evaluations", "cached", "failures"))
+
+
+def _latency_histograms() -> list[str]:
+    lines = ["# HELP meal_max_upstream_request_duration_seconds Outbound HTTP request attempts, by host",
+             "# TYPE meal_max_upstream_request_duration_seconds histogram"]
+    for host, snapshot in sorted(get_http_client().latency_stats().items()):
+        lines.extend(metrics.histogram_lines("meal_max_upstream_request_duration_seconds", {'host': host}, snapshot))
+    lines.extend(["# HELP meal_max_random_refill_duration_seconds random.org batch fetches",
+                  "# TYPE meal_max_random_refill_duration_seconds histogram"])
+    lines.extend(metrics.histogram_lines("meal_max_random_refill_duration_seconds", {},
+                                         random_pool.stats()['refill_latency']))
+    lines.extend(["# HELP meal_max_password_verification_duration_seconds Password verifications on the pool",
+                  "# TYPE meal_max_password_verification_duration_seconds histogram"])
+    lines.extend(metrics.histogram_lines("meal_max_password_verification_duration_seconds", {},
+                                         verification_pool.stats()['latency']))
+    return lines
+
+metrics.registry.register_collector(_latency_histograms)
+
+def _breaker_states() -> list[str]:
+    breaker = location_model.weather_breaker
+    state = breaker.state
+    lines = ["# HELP meal_max_weather_breaker_state Weather API circuit breaker state, 1 for the current one",
+             "# TYPE meal_max_weather_breaker_state gauge"]
+    lines.extend(f'meal_max_weather_breaker_state{{state="{name}"}} {int(name == state)}'
+                 for name in circuit_breaker.STATES)
+    lines.extend(["# HELP meal_max_weather_breaker_transitions_total Weather API circuit breaker state changes",
+                  "# TYPE meal_max_weather_breaker_transitions_total counter"])
+    lines.extend(f'meal_max_weather_breaker_transitions_total{{from="{before}",to="{after}"}} {count}'
+                 for (before, after), count in sorted(breaker.transitions().items()))
+    return lines
+
+metrics.registry.register_collector(_breaker_states)
+
+# Under a multi-process server only the worker holding this lock runs the refresher
+refresher_lock = ProcessLock(os.getenv("WEATHER_REFRESH_LOCK_PATH", f"{sql_utils.DB_PATH}.refresher.lock"))
+
+# Tables the routes need; readiness fails if any is missing
+REQUIRED_TABLES = ("locations", "meals", "meal_leaderboard", "users", "weather_observations")
+
+
+def _schema_check() -> tuple[bool, dict]:
+    missing = find_missing_tables(REQUIRED_TABLES)
+    return not missing, {'missing_tables': missing}
+
+def _weather_check() -> tuple[bool, dict]:
+    # Stored weather is what requests and the weather cache serve
+    return staleness(location_model.get_oldest_weather_update(), READINESS_STALE_FACTOR * WEATHER_REFRESH_INTERVAL)
+
+def _refresher_check() -> tuple[bool, dict]:
+    stats = weather_refresher.stats()
+    if not stats['running']:
+        # Refreshing is disabled or runs in another worker, unless this worker won the lock and lost its thread
+        held = refresher_lock.held
+        return not (held and WEATHER_REFRESH_ENABLED), {'running': False, 'enabled': WEATHER_REFRESH_ENABLED}
+    limit = READINESS_STALE_FACTOR * max(weather_refresher.check_interval, stats['last_cycle_seconds'])
+    ok, details = staleness(stats['last_cycle_at'], limit)
+    return ok, {'running': True, 'last_error': stats['last_error'], **details}
+
+def _weather_api_check() -> tuple[bool, dict]:
+    # An open circuit degrades the replica: requests are answered from the cache or fail fast
+    state = location_model.weather_breaker.state
+    return state != circuit_breaker.OPEN, {'circuit': state}
+
+readiness.add_check("database", _schema_check)
+readiness.add_check("weather", _weather_check, critical=READINESS_REQUIRE_FRESH_WEATHER)
+readiness.add_check("refresher", _refresher_check, critical=False)
+readiness.add_check("weather_api", _weather_api_check, critical=False)
+
+
+def prepare_for_fork() -> None:
+    """
+    Quiesces the preloading server process before it forks workers.
+
+    Stops the weather refresher and closes the database pool, so no
+    background thread or open SQLite connection is copied into the workers.
+    """
+    weather_refresher.stop(timeout=30)
+    sql_utils.reset_pool()
+    with app.app_context():
+        db.engine.dispose()
+
+def init_worker() -> None:
+    """
+    Rebuilds per-process state in a freshly forked server worker.
+
+    Background threads do not survive fork() and connections and sockets must
+    not be shared with the parent, so the log writer, database pools, HTTP
+    client, caches, random number buffer and weather exporter are all started
+    fresh. One worker, chosen by a file lock, runs the weather refresher.
+    """
+    restart_logging()
+    sql_utils.reset_pool()
+    with app.app_context():
+        db.engine.dispose(close=False)
+    reset_http_client()
+    location_model.weather_cache.clear()
+    location_model.weather_breaker.reset()
+    random_pool.clear()
+    reset_weather_exporter()
+    readiness.clear()
+    if WEATHER_REFRESH_ENABLED and refresher_lock.try_acquire():
+        weather_refresher.start()
+
 ####################################################
 #
 # Healthchecks
@@ -32,34 +204,72 @@ def healthcheck() -> Response:
     Health check route to verify the service is running.
 
     Returns:
-        JSON response indicating the health status of the service.
+        JSON response indicating the health status of the service, with the
+        conditional GET counters of the cacheable read routes.
     """
     app.logger.info('Health check')
-    return make_response(jsonify({'status': 'healthy'}), 200)
+    return make_response(jsonify({'status': 'healthy', 'http_cache': conditional_stats.stats()}), 200)
+
+@app.route('/api/live', methods=['GET'])
+def liveness() -> Response:
+    """
+    Liveness probe: the process is up and serving requests.
+
+    Does no I/O and no logging, so it can be polled as often as needed.
+
+    Returns:
+        JSON response with the status "alive".
+    """
+    return make_response(jsonify({'status': 'alive'}), 200)
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check() -> Response:
+    """
+    Readiness probe: the replica can serve traffic.
+
+    Checks the schema with one sqlite_master query on a pooled connection,
+    the age of the stalest stored weather, the refresher's last cycle and
+    the weather API circuit breaker.
+    The result is cached for READINESS_CACHE_TTL seconds.
+
+    Returns:
+        JSON response with the status ("ready", "degraded" or "unready") and
+        the details of each check.
+    Raises:
+        503 error if a critical check fails.
+    """
+    result = readiness.check()
+    return make_response(jsonify(result), 503 if result['status'] == "unready" else 200)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics() -> Response:
+    """
+    Route to scrape the service metrics.
+
+    Returns:
+        Prometheus text format response with request, SQL and upstream latency
+        histograms and the pool, cache and background worker gauges of this process.
+    """
+    return metrics.render_metrics()
 
 @app.route('/api/db-check', methods=['GET'])
 def db_check() -> Response:
     """
-    Route to check if the database connection and location and users table are functional.
+    Route to check if the database connection and the tables the routes use are functional.
+
+    Uses the cached readiness result, so it costs at most one sqlite_master
+    query per READINESS_CACHE_TTL.
 
     Returns:
         JSON response indicating the database health status.
     Raises:
         404 error if there is an issue with the database.
     """
-    try:
-        app.logger.info("Checking database connection...")
-        check_database_connection()
-        app.logger.info("Database connection is OK.")
-        app.logger.info("Checking if locations table exists...")
-        check_table_exists("locations")
-        app.logger.info("locations table exists.")
-        app.logger.info("Checking if users table exists...")
-        check_table_exists("users")
-        app.logger.info("users table exists.")
-        return make_response(jsonify({'database_status': 'healthy'}), 200)
-    except Exception as e:
-        return make_response(jsonify({'error': str(e)}), 404)
+    database = readiness.check()['checks']['database']
+    if not database['ok']:
+        error = database.get('error') or f"Missing tables: {', '.join(database['missing_tables'])}"
+        return make_response(jsonify({'error': error}), 404)
+    return make_response(jsonify({'database_status': 'healthy', 'pool': get_pool().stats()}), 200)
 
 
 ##########################################################
@@ -80,6 +290,7 @@ def create_location() -> Response:
     Raises:
         400 error if input validation fails.
         500 error if there is an issue creating the location.
+        503 error if the weather API is unavailable and its circuit is open.
     """
     app.logger.info('Creating location')
     try:
@@ -97,10 +308,231 @@ def create_location() -> Response:
 
         app.logger.info("Created location: %s", location)
         return make_response(jsonify({'status': 'success', 'location': location}), 201)
+    except circuit_breaker.CircuitOpenError as e:
+        app.logger.warning("Not creating location, the weather API is unavailable: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 503)
     except Exception as e:
         app.logger.error("Failed to create", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/locations/bulk', methods=['POST'])
+def create_locations_bulk() -> Response:
+    """
+    Route to create many locations in one request.
+
+    Expected JSON Input:
+        - locations (list[str]): The location names.
+
+    Returns:
+        JSON response with a result for each location, in input order.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue creating the locations.
+    """
+    app.logger.info('Creating locations in bulk')
+    try:
+        data = request.get_json()
+        locations = data.get('locations') if data else None
+
+        if not isinstance(locations, list) or not locations:
+            return make_response(jsonify({'error': 'Invalid input, locations must be a non-empty list'}), 400)
+
+        results = location_model.create_locations_bulk(locations)
+        created = sum(1 for result in results if result['status'] == 'created')
+
+        app.logger.info("Bulk created %d of %d locations", created, len(results))
+        return make_response(jsonify({
+            'status': 'success',
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }), 200)
+    except ValueError as e:
+        app.logger.error("Invalid bulk location request: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to bulk create locations: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/locations/search', methods=['GET'])
+def search_locations() -> Response:
+    """
+    Route to find locations by their stored weather.
+
+    Query Parameters:
+        - min_temp, max_temp (float): Temperature range in °C, inclusive.
+        - min_humidity, max_humidity (float): Humidity range in %, inclusive.
+        - condition (str): Weather condition, e.g. Rain.
+        - sort (str): temp, humidity, pressure, wind_speed or observed_at. Defaults to temp.
+        - order (str): asc or desc. Defaults to asc.
+        - limit (int): Maximum number of locations. Defaults to 100.
+
+    Returns:
+        JSON response with the matching locations.
+    Raises:
+        400 error if a parameter is invalid.
+        500 error if there is an issue querying the locations.
+    """
+    try:
+        args = request.args
+        filters = {name: args.get(name, type=float) for name in ('min_temp', 'max_temp', 'min_humidity', 'max_humidity')}
+        limit = args.get('limit', type=int)
+        for name, value in (*filters.items(), ('limit', limit)):
+            if value is None and args.get(name) is not None:
+                raise ValueError(f"Invalid {name}: {args.get(name)}. Must be a number.")
+        order = args.get('order', 'asc').lower()
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"Invalid order: {order}. Expected asc or desc.")
+
+        app.logger.info("Searching locations by weather: %s", dict(args))
+        locations = location_model.search_locations_by_weather(
+            condition=args.get('condition'), sort_by=args.get('sort', 'temp'),
+            descending=order == 'desc', limit=limit if limit is not None else 100, **filters)
+        return make_response(jsonify({'status': 'success', 'locations': locations}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid location search: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to search locations: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/locations/<int:location_id>/history', methods=['GET'])
+def get_weather_history(location_id: int) -> Response:
+    """
+    Route to get the weather history of a location, downsampled for charting.
+
+    Path Parameter:
+        - location_id (int): The ID of the location.
+
+    Query Parameters:
+        - start (int): Start of the window, unix time. Defaults to 24 hours before end.
+        - end (int): End of the window, unix time. Defaults to now.
+        - resolution (str): auto, raw, hour or day. Defaults to auto.
+        - max_points (int): Maximum number of points. Defaults to 500.
+
+    Returns:
+        JSON response with the resolution, bucket width and points.
+    Raises:
+        400 error if a parameter is invalid.
+        500 error if there is an issue reading the history.
+    """
+    try:
+        args = request.args
+        end = args.get('end', type=int)
+        start = args.get('start', type=int)
+        max_points = args.get('max_points', type=int)
+        for name, value in (('start', start), ('end', end), ('max_points', max_points)):
+            if value is None and args.get(name) is not None:
+                raise ValueError(f"Invalid {name}: {args.get(name)}. Must be an integer.")
+        end = end if end is not None else int(time.time())
+        start = start if start is not None else end - 86400
+
+        app.logger.info("Retrieving weather history for location %d", location_id)
+        history = weather_history.get_weather_history(
+            location_id, start, end, resolution=args.get('resolution', 'auto'),
+            max_points=max_points if max_points is not None else weather_history.WEATHER_HISTORY_MAX_POINTS)
+        return make_response(jsonify({'status': 'success', **history}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid weather history request: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to retrieve weather history: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+def _listing_args() -> tuple:
+    # Shared cursor/limit/fields/stream parameters of the listing routes
+    args = request.args
+    limit = args.get('limit', type=int)
+    if limit is None and args.get('limit') is not None:
+        raise ValueError(f"Invalid limit: {args.get('limit')}. Must be an integer.")
+    stream = args.get('stream')
+    if stream not in (None, 'ndjson'):
+        raise ValueError(f"Invalid stream: {stream}. Expected ndjson.")
+    return args.get('cursor') or None, limit, args.get('fields'), stream == 'ndjson'
+
+def _ndjson_response(items) -> Response:
+    # Pull the first row before responding, so a bad cursor or database error is still a proper error response
+    first = list(itertools.islice(items, 1))
+    lines = (serialization.dumps(item) + b"\n" for item in itertools.chain(first, items))
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+@app.route('/api/locations', methods=['GET'])
+def list_locations() -> Response:
+    """
+    Route to list live locations in id order, a page at a time.
+
+    Query Parameters:
+        - cursor (str): next_cursor from the previous page. Omit for the first page.
+        - limit (int): Page size, 1 to 1000. Defaults to 100. When streaming, the
+          maximum number of locations; omit to stream all of them.
+        - fields (str): Comma-separated fields to include, e.g. id,location,temp. Defaults to all.
+        - stream (str): ndjson to stream the locations as newline-delimited JSON instead of a page.
+
+    Returns:
+        JSON response with the locations and next_cursor (null on the last page),
+        or an application/x-ndjson stream of locations.
+    Raises:
+        400 error if a parameter is invalid.
+        500 error if there is an issue listing the locations.
+    """
+    try:
+        cursor, limit, fields, stream = _listing_args()
+        fields = parse_fields(fields, location_model.LOCATION_FIELDS)
+        if stream:
+            app.logger.info("Streaming locations")
+            return _ndjson_response(location_model.iter_locations(cursor, limit, fields))
+
+        app.logger.info("Listing locations")
+        page = location_model.list_locations(cursor, limit if limit is not None else DEFAULT_PAGE_SIZE, fields)
+        return make_response(jsonify({'status': 'success', 'locations': page['items'],
+                                      'next_cursor': page['next_cursor']}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid location listing: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to list locations: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/leaderboard', methods=['GET'])
+def get_leaderboard() -> Response:
+    """
+    Route to get the meal leaderboard, a page at a time.
+
+    Query Parameters:
+        - sort (str): wins or win_pct. Defaults to wins.
+        - cursor (str): next_cursor from the previous page. Omit for the first page.
+        - limit (int): Page size, 1 to 1000. Defaults to 100. When streaming, the
+          maximum number of meals; omit to stream all of them.
+        - fields (str): Comma-separated fields to include, e.g. meal,wins. Defaults to all.
+        - stream (str): ndjson to stream the leaderboard as newline-delimited JSON instead of a page.
+
+    Returns:
+        JSON response with the leaderboard and next_cursor (null on the last page),
+        or an application/x-ndjson stream of leaderboard rows.
+    Raises:
+        400 error if a parameter is invalid.
+        500 error if there is an issue reading the leaderboard.
+    """
+    try:
+        cursor, limit, fields, stream = _listing_args()
+        fields = parse_fields(fields, kitchen_model.LEADERBOARD_FIELDS)
+        sort_by = request.args.get('sort', 'wins')
+        if stream:
+            app.logger.info("Streaming leaderboard sorted by %s", sort_by)
+            return _ndjson_response(kitchen_model.iter_leaderboard(sort_by, cursor, limit, fields))
+
+        app.logger.info("Retrieving leaderboard sorted by %s", sort_by)
+        page = kitchen_model.list_leaderboard(sort_by, cursor, limit if limit is not None else DEFAULT_PAGE_SIZE,
+                                              fields)
+        return make_response(jsonify({'status': 'success', 'leaderboard': page['items'],
+                                      'next_cursor': page['next_cursor']}), 200)
+    except ValueError as e:
+        app.logger.error("Invalid leaderboard request: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 400)
+    except Exception as e:
+        app.logger.error("Failed to retrieve leaderboard: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/clear-locations', methods=['DELETE'])
 def clear_catalog() -> Response:
     """
@@ -146,18 +578,23 @@ def get_location_by_id(location_id: int) -> Response:
         - location_id (int): The ID of the location.
 
     Returns:
-        JSON response with the location details or error message.
+        JSON response with the location details or error message, or 304 Not
+        Modified if the client's ETag or Last-Modified is still current.
     """
     try:
         app.logger.info(f"Retrieving location by ID: {location_id}")
 
-        location = location_model.get_location_by_id(location_id)
-        return make_response(jsonify({'status': 'success', 'location': location}), 200)
+        updated_at = location_model.get_location_updated_at(location_id)
+        return conditional_response(
+            make_etag("location", location_id, int(updated_at * 1000)), updated_at,
+            max_age(updated_at, WEATHER_REFRESH_INTERVAL),
+            lambda: make_response(jsonify({'status': 'success',
+                                           'location': location_model.get_location_by_id(location_id)}), 200))
     except Exception as e:
         app.logger.error(f"Error retrieving location by ID: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
-@app.route('/api/get-weather-for_location/<int:location>', methods=['GET'])
+@app.route('/api/get-weather-for_location/<int:location_id>', methods=['GET'])
 def get_weather_for_location(location_id: int) -> Response:
     """
     Route to get a weather for a specific location
@@ -166,13 +603,19 @@ def get_weather_for_location(location_id: int) -> Response:
         - location_id (id): The ID of the location to get the weather for.
 
     Returns:
-        JSON response with the weather details or error message.
+        JSON response with the weather details or error message, or 304 Not
+        Modified if the client's ETag or Last-Modified is still current.
     """
     try:
         app.logger.info(f"Retrieving weather of all favorite locations")
 
-        weather = location_model.get_weather_for_location(location_id)
-        return make_response(jsonify({'status': 'success', 'weather': weather}), 200)
+        # A poll answered with 304 still counts as a read for refresh priority
+        updated_at = location_model.get_location_updated_at(location_id, touch=True)
+        return conditional_response(
+            make_etag("weather", location_id, int(updated_at * 1000)), updated_at,
+            max_age(updated_at, WEATHER_REFRESH_INTERVAL),
+            lambda: make_response(jsonify({'status': 'success',
+                                           'weather': location_model.get_weather_for_location(location_id)}), 200))
     except Exception as e:
         app.logger.error(f"Error retrieving weather for location: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
@@ -198,6 +641,7 @@ def login() -> Response:
         400 error if input validation fails.
         401 error if invalid password.
         500 error if there is an issue loging in.
+        503 error if the password verification queue is full or the verification times out.
     """
     app.logger.info('Creating new user')
     try:
@@ -219,6 +663,12 @@ def login() -> Response:
             app.logger.info("Failed to login user: %s", username)
             return make_response(jsonify({'status': 'error', 'message': 'Incorrect Password'}), 401)
 
+    except VerificationQueueFull as e:
+        app.logger.warning("Login rejected, password verification is saturated: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 503)
+    except FutureTimeoutError:
+        app.logger.warning("Login timed out waiting for password verification")
+        return make_response(jsonify({'error': 'Password verification timed out'}), 503)
     except Exception as e:
         app.logger.error("Failed to login user: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
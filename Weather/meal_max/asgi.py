@@ -0,0 +1,155 @@
+"""
+ASGI entry point. The location routes that wait on the weather API are
+served by coroutines (meal_max.models.async_location_model); every other
+route is app.py's Flask app, run on a thread pool through a2wsgi.
+
+    uvicorn asgi:app
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py asgi:app
+
+entrypoint.sh uses the second form when SERVER_MODE=asgi.
+"""
+import contextlib
+import logging
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+from app import app as flask_app
+from meal_max.models import async_location_model
+from meal_max.utils import metrics, serialization
+from meal_max.utils.circuit_breaker import CircuitOpenError
+from meal_max.utils.async_http_client import close_async_http_client, peek_async_http_client
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Threads serving the Flask routes; each one handles a single request at a time
+ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", "16"))
+
+
+def _json(data: dict, status: int) -> Response:
+    return Response(serialization.dumps(data), status_code=status, media_type="application/json")
+
+def _record(request: Request, status: int, start: float) -> None:
+    # Same series as the Flask routes; the async routes have no path parameters, so the path is the route
+    if not metrics.METRICS_ENABLED:
+        return
+    labels = (request.url.path, request.method, str(status))
+    metrics.requests_total.inc(labels)
+    if metrics.registry.sampled():
+        metrics.request_latency.observe(labels, time.perf_counter() - start)
+
+async def _json_body(request: Request):
+    try:
+        return serialization.loads(await request.body())
+    except ValueError:
+        return None
+
+
+async def create_location(request: Request) -> Response:
+    """
+    Route to create a location, without holding a thread while the weather is fetched.
+
+    Expected JSON Input:
+        - location (str): The location.
+
+    Returns:
+        JSON response indicating the success of creating a location.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue creating the location.
+        503 error if the weather API is unavailable and its circuit is open.
+    """
+    start = time.perf_counter()
+    try:
+        data = await _json_body(request)
+        location = data.get('location') if isinstance(data, dict) else None
+        if not location:
+            response = _json({'error': 'Invalid input, all fields are required with valid values'}, 400)
+        else:
+            logger.info('Creating location: %s', location)
+            location = await async_location_model.create_location(location)
+            logger.info("Created location: %s", location)
+            response = _json({'status': 'success', 'location': location}, 201)
+    except CircuitOpenError as e:
+        logger.warning("Not creating location, the weather API is unavailable: %s", str(e))
+        response = _json({'error': str(e)}, 503)
+    except Exception as e:
+        logger.error("Failed to create location: %s", str(e))
+        response = _json({'error': str(e)}, 500)
+    _record(request, response.status_code, start)
+    return response
+
+async def create_locations_bulk(request: Request) -> Response:
+    """
+    Route to create many locations in one request, fetching their weather concurrently on the event loop.
+
+    Expected JSON Input:
+        - locations (list[str]): The location names.
+
+    Returns:
+        JSON response with a result for each location, in input order.
+    Raises:
+        400 error if input validation fails.
+        500 error if there is an issue creating the locations.
+    """
+    start = time.perf_counter()
+    try:
+        data = await _json_body(request)
+        locations = data.get('locations') if isinstance(data, dict) else None
+        if not isinstance(locations, list) or not locations:
+            response = _json({'error': 'Invalid input, locations must be a non-empty list'}, 400)
+        else:
+            results = await async_location_model.create_locations_bulk(locations)
+            created = sum(1 for result in results if result['status'] == 'created')
+            logger.info("Bulk created %d of %d locations", created, len(results))
+            response = _json({'status': 'success', 'created': created, 'failed': len(results) - created,
+                              'results': results}, 200)
+    except ValueError as e:
+        logger.error("Invalid bulk location request: %s", str(e))
+        response = _json({'error': str(e)}, 400)
+    except Exception as e:
+        logger.error("Failed to bulk create locations: %s", str(e))
+        response = _json({'error': str(e)}, 500)
+    _record(request, response.status_code, start)
+    return response
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_):
+    yield
+    await close_async_http_client()
+
+
+def _async_upstream_histograms() -> list[str]:
+    client = peek_async_http_client()
+    lines = ["# HELP meal_max_async_upstream_request_duration_seconds Outbound HTTP request attempts "
+             "of the async routes, by host",
+             "# TYPE meal_max_async_upstream_request_duration_seconds histogram"]
+    for host, snapshot in sorted((client.latency_stats() if client else {}).items()):
+        lines.extend(metrics.histogram_lines("meal_max_async_upstream_request_duration_seconds", {'host': host},
+                                             snapshot))
+    return lines
+
+metrics.registry.register_stats("meal_max_async_http", lambda: peek_async_http_client() and
+                                peek_async_http_client().stats(), "Async upstream client")
+metrics.registry.register_stats("meal_max_async_locations", async_location_model.stats, "Async location routes")
+metrics.registry.register_collector(_async_upstream_histograms)
+
+
+app = Starlette(
+    routes=[
+        Route('/api/create_location', create_location, methods=['POST']),
+        Route('/api/locations/bulk', create_locations_bulk, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
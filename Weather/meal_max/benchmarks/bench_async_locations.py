@@ -0,0 +1,109 @@
+"""
+Sync versus async location routes under many concurrent clients.
+
+Serves POST /api/create_location through gunicorn, first from app.py on
+gthread workers, where every request holds a thread while the weather is
+fetched, then from the ASGI app in asgi.py on uvicorn workers, where it
+holds a coroutine. Both fetch from an asyncio stub weather API with
+artificial latency running in its own process. Every client creates
+unique locations so no request is served from the weather cache. Reports
+throughput, latency percentiles, errors, and the peak number of upstream
+requests the stub saw in flight at once.
+
+Unlike run_benchmarks.py this uses the HTTP stub rather than the fake weather
+provider, since the outbound HTTP clients are part of what it measures.
+
+Usage:
+    python benchmarks/bench_async_locations.py --clients 1000 --requests 4000 --upstream-latency-ms 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from benchmarks.run_benchmarks import GunicornServer, percentile
+from benchmarks.stub_servers import AsyncStubWeatherServer
+
+
+async def drive(base_url: str, clients: int, requests_count: int, run_id: str, timeout: float) -> dict:
+    """Sends requests_count location creations from clients concurrent connections."""
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    counter = iter(range(requests_count))
+
+    async def client(http: aiohttp.ClientSession) -> None:
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                async with http.post(f"{base_url}/api/create_location", json={"location": f"{run_id}-{i}"}) as response:
+                    await response.read()
+                    status = str(response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(clients)))
+        wall = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        'throughput_rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'error_rate': round(errors / max(len(latencies), 1), 4),
+        'statuses': statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000, help="concurrent client connections")
+    parser.add_argument("--requests", type=int, default=4000, help="location creations per server")
+    parser.add_argument("--upstream-latency-ms", type=float, default=100.0, help="stub weather API latency")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes, for both servers")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gthread worker")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request, in seconds")
+    parser.add_argument("--servers", default="sync,async", help="comma separated subset of: sync, async")
+    args = parser.parse_args()
+
+    servers = {
+        'sync': ("app:app", "gthread", f"gthread {args.workers} worker(s) x {args.threads} threads"),
+        'async': ("asgi:app", "uvicorn.workers.UvicornWorker", f"uvicorn {args.workers} worker(s)"),
+    }
+    print(f"{args.clients} clients, {args.requests} requests, {args.upstream_latency_ms:.0f} ms upstream latency")
+    with AsyncStubWeatherServer(args.upstream_latency_ms) as upstream:
+        for name in args.servers.split(","):
+            target, worker_class, label = servers[name]
+            with tempfile.TemporaryDirectory() as db_dir:
+                # Refreshing is switched off so only the benchmarked requests reach the stub; the
+                # connection limit is raised so a gthread worker does not stall once every client is connected
+                server = GunicornServer(db_dir, upstream.url, args.workers, args.threads, with_logs=False,
+                                        target=target, worker_class=worker_class,
+                                        extra_env={'WEATHER_REFRESH_ENABLED': "false",
+                                                   'GUNICORN_WORKER_CONNECTIONS': str(2 * args.clients)})
+                try:
+                    upstream.reset_peak()
+                    result = asyncio.run(drive(f"http://127.0.0.1:{server.server_port}", args.clients,
+                                               args.requests, f"{name}-{int(time.time())}", args.timeout))
+                finally:
+                    server.shutdown()
+            print(f"{name:6s} {label:36s} {result['throughput_rps']:8.1f} rps   p50 {result['p50_ms']:8.1f} ms   "
+                  f"p95 {result['p95_ms']:8.1f} ms   p99 {result['p99_ms']:8.1f} ms   "
+                  f"errors {result['error_rate']:.1%}   peak upstream in flight {upstream.peak_in_flight}")
+
+
+if __name__ == "__main__":
+    main()
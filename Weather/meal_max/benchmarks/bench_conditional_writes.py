@@ -0,0 +1,103 @@
+"""
+Conditional-write microbenchmark: SELECT-then-UPDATE versus a single
+UPDATE ... WHERE id = ? AND deleted = FALSE checked with rowcount.
+
+Counts the SQL statements each approach sends to SQLite and times the
+update_meal_stats and delete_meal paths.
+
+Usage:
+    python benchmarks/bench_conditional_writes.py --ops 5000
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+
+def legacy_update_meal_stats(meal_id: int, result: str) -> None:
+    """The pre-change implementation: existence check, then update."""
+    with sql_utils.get_db_connection() as conn:
+        _legacy_update_meal_stats(conn, meal_id, result)
+
+
+def _legacy_update_meal_stats(conn: sqlite3.Connection, meal_id: int, result: str) -> None:
+    cursor = conn.cursor()
+    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+    row = cursor.fetchone()
+    if row is None or row[0]:
+        raise ValueError(f"Meal with ID {meal_id} not found or deleted")
+    if result == 'win':
+        cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
+    else:
+        cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
+    cursor.execute(kitchen_model.LEADERBOARD_UPSERT, (meal_id,))
+    conn.commit()
+
+
+def legacy_delete_meal(meal_id: int) -> None:
+    with sql_utils.get_db_connection() as conn:
+        _legacy_delete_meal(conn, meal_id)
+
+
+def _legacy_delete_meal(conn: sqlite3.Connection, meal_id: int) -> None:
+    cursor = conn.cursor()
+    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+    row = cursor.fetchone()
+    if row is None or row[0]:
+        raise ValueError(f"Meal with ID {meal_id} not found or deleted")
+    cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
+    cursor.execute("DELETE FROM meal_leaderboard WHERE meal_id = ?", (meal_id,))
+    conn.commit()
+
+
+def measure(name: str, conn: sqlite3.Connection, fn, ids: list[int]) -> None:
+    statements = []
+    conn.set_trace_callback(lambda sql: statements.append(sql) if not sql.startswith(("BEGIN", "COMMIT")) else None)
+    start = time.perf_counter()
+    for meal_id in ids:
+        fn(meal_id)
+    elapsed = time.perf_counter() - start
+    conn.set_trace_callback(None)
+    print(f"{name:34s} {len(statements) / len(ids):4.1f} statements/op   "
+          f"{elapsed * 1e6 / len(ids):8.1f} us/op")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # keep per-call log lines out of the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        apply_migrations(db_path)
+        with sqlite3.connect(db_path) as conn:
+            conn.executemany("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES (?, 'Bench', 10.0, 'MED')",
+                             [(f"meal-{i}",) for i in range(2 * args.ops)])
+
+        pool = sql_utils.ConnectionPool(db_path, size=1, pre_ping=False, pragmas=sql_utils.DB_PRAGMAS)
+        sql_utils._pool = pool
+        with pool.connection() as conn:
+            pass  # the pool hands this same connection to kitchen_model below
+
+        first, second = list(range(1, args.ops + 1)), list(range(args.ops + 1, 2 * args.ops + 1))
+        for _ in range(2):  # the second round runs on warm pages
+            measure("update_meal_stats (select+update)", conn, lambda i: legacy_update_meal_stats(i, "win"), first)
+            measure("update_meal_stats (conditional)", conn, lambda i: kitchen_model.update_meal_stats(i, "win"), first)
+        measure("delete_meal (select+update)", conn, legacy_delete_meal, first)
+        measure("delete_meal (conditional)", conn, kitchen_model.delete_meal, second)
+
+        sql_utils.reset_pool()
+
+
+if __name__ == "__main__":
+    main()
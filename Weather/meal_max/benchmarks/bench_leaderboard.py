@@ -0,0 +1,106 @@
+"""
+Leaderboard benchmark: full-table scan and sort versus the materialized,
+index-ordered meal_leaderboard table.
+
+Usage:
+    python benchmarks/bench_leaderboard.py --meals 1000000 --top 10
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.models import kitchen_model
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+
+# The pre-materialization implementation of get_leaderboard
+LEGACY_QUERY = """
+    SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
+    FROM meals WHERE deleted = false AND battles > 0
+"""
+
+
+def legacy_get_leaderboard(conn: sqlite3.Connection, sort_by: str, top: int) -> list[dict]:
+    rows = conn.execute(LEGACY_QUERY + f" ORDER BY {sort_by} DESC").fetchall()
+    leaderboard = [
+        {'id': row[0], 'meal': row[1], 'cuisine': row[2], 'price': row[3], 'difficulty': row[4],
+         'battles': row[5], 'wins': row[6], 'win_pct': round(row[7] * 100, 1)}
+        for row in rows
+    ]
+    return leaderboard[:top]
+
+
+def populate(db_path: str, meals: int, seed: int) -> None:
+    rng = random.Random(seed)
+    with sqlite3.connect(db_path) as conn:
+        def rows():
+            for i in range(meals):
+                battles = rng.randint(0, 500)
+                yield (f"meal-{i}", "Bench", 10.0, "MED", battles, rng.randint(0, battles), rng.random() < 0.01)
+        conn.executemany(
+            "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows())
+        conn.execute("""
+            INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+            SELECT id, battles, wins, wins * 1.0 / battles FROM meals WHERE deleted = FALSE AND battles > 0
+        """)
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'median_ms': statistics.median(samples), 'min_ms': min(samples), 'max_ms': max(samples)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meals", type=int, default=1_000_000)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--updates", type=int, default=1000, help="stats writes to time")
+    parser.add_argument("--seed", type=int, default=411)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # keep per-call log lines out of the timings
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        apply_migrations(db_path)
+        print(f"Populating {args.meals:,} meals...")
+        populate(db_path, args.meals, args.seed)
+
+        sql_utils._pool = sql_utils.ConnectionPool(db_path, size=1, pragmas=sql_utils.DB_PRAGMAS)
+        legacy_conn = sqlite3.connect(db_path)
+
+        for sort_by in ("wins", "win_pct"):
+            legacy = timed(lambda: legacy_get_leaderboard(legacy_conn, sort_by, args.top), args.repeat)
+            materialized = timed(lambda: kitchen_model.get_leaderboard(sort_by, limit=args.top), args.repeat)
+            print(f"top {args.top} by {sort_by:8s} legacy scan+sort: {legacy['median_ms']:10.2f} ms   "
+                  f"materialized: {materialized['median_ms']:8.3f} ms   "
+                  f"speedup: {legacy['median_ms'] / materialized['median_ms']:,.0f}x")
+
+        ids = [row[0] for row in legacy_conn.execute(
+            "SELECT id FROM meals WHERE deleted = FALSE LIMIT ?", (args.updates,))]
+        start = time.perf_counter()
+        for meal_id in ids:
+            kitchen_model.update_meal_stats(meal_id, random.choice(("win", "loss")))
+        per_update = (time.perf_counter() - start) * 1000 / max(len(ids), 1)
+        print(f"update_meal_stats incl. leaderboard maintenance: {per_update:.3f} ms/write over {len(ids)} writes")
+
+        legacy_conn.close()
+        sql_utils.reset_pool()
+
+
+if __name__ == "__main__":
+    main()
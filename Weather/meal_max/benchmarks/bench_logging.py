@@ -0,0 +1,110 @@
+"""
+Logging overhead on the calling (request) thread.
+
+Compares the previous configure_logger() setup, where every call added another
+synchronous StreamHandler, with the shared queue-based pipeline and with
+level gating. Output goes to a temporary file so the write cost is real.
+
+Usage:
+    python benchmarks/bench_logging.py --calls 20000 --stacked-handlers 3
+    python benchmarks/bench_logging.py --calls 2000 --sink-delay-ms 0.1
+"""
+import argparse
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.utils.logger import _DroppingQueueHandler
+
+
+FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+class SlowSink:
+    """File wrapper whose writes block, like stderr on a full pipe to a log collector."""
+
+    def __init__(self, fh, delay: float):
+        self.fh = fh
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return self.fh.write(text)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+
+def fresh_logger(name: str) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def time_calls(logger: logging.Logger, calls: int) -> float:
+    """Returns microseconds per logger.info call on this thread."""
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info("Location successfully added to the database: %s", i)
+    return (time.perf_counter() - start) * 1e6 / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--stacked-handlers", type=int, default=3,
+                        help="handlers the old configure_logger() had piled onto one logger")
+    parser.add_argument("--sink-delay-ms", type=float, default=0.0,
+                        help="simulated blocking time of each write to stderr")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = open(os.path.join(tmp, "log.txt"), "w")
+        sink = SlowSink(log_file, args.sink_delay_ms / 1000) if args.sink_delay_ms else log_file
+
+        legacy = fresh_logger("bench.legacy")
+        for _ in range(args.stacked_handlers):
+            handler = logging.StreamHandler(sink)
+            handler.setFormatter(logging.Formatter(FORMAT))
+            legacy.addHandler(handler)
+
+        single = fresh_logger("bench.single")
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter(FORMAT))
+        single.addHandler(handler)
+
+        queued = fresh_logger("bench.queued")
+        stream_handler = logging.StreamHandler(sink)
+        stream_handler.setFormatter(logging.Formatter(FORMAT))
+        log_queue: queue.Queue = queue.Queue(maxsize=args.calls + 1)
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        queued.addHandler(_DroppingQueueHandler(log_queue))
+
+        gated = fresh_logger("bench.gated")
+        gated.addHandler(_DroppingQueueHandler(log_queue))
+        gated.setLevel(logging.WARNING)
+
+        rows = [
+            (f"sync, {args.stacked_handlers} stacked handlers (before)", time_calls(legacy, args.calls)),
+            ("sync, 1 handler", time_calls(single, args.calls)),
+            ("queue handler + background writer", time_calls(queued, args.calls)),
+            ("level-gated (INFO below WARNING)", time_calls(gated, args.calls)),
+        ]
+        listener.stop()
+        log_file.close()
+
+    for name, micros in rows:
+        print(f"{name:45s} {micros:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
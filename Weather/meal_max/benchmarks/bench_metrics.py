@@ -0,0 +1,92 @@
+"""
+Metrics hook overhead: cost added to each SQL statement and each request by
+the timing hooks, with timing off, sampled and on.
+
+Usage:
+    python benchmarks/bench_metrics.py --statements 200000 --requests 2000 --rounds 5
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from flask import Flask
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.utils import metrics, sql_utils
+from meal_max.utils.metrics import QueryTimer
+
+
+def per_statement(conn: sqlite3.Connection, statements: int) -> float:
+    """Microseconds per point lookup."""
+    start = time.perf_counter()
+    for i in range(statements):
+        conn.execute("SELECT meal FROM meals WHERE id = ?", (i % 1000,)).fetchone()
+    return (time.perf_counter() - start) / statements * 1e6
+
+
+def per_request(app: Flask, requests_count: int) -> float:
+    """Microseconds per request through the Flask test client."""
+    client = app.test_client()
+    for i in range(200):  # warm up
+        client.get(f"/api/items/{i}")
+    start = time.perf_counter()
+    for i in range(requests_count):
+        client.get(f"/api/items/{i}")
+    return (time.perf_counter() - start) / requests_count * 1e6
+
+
+def make_app(with_hooks: bool) -> Flask:
+    app = Flask(__name__)
+    if with_hooks:
+        metrics.init_app(app)
+
+    @app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        return {'id': item_id}
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--statements", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    plain = sqlite3.connect(":memory:")
+    timed = sqlite3.connect(":memory:", factory=sql_utils.TimedConnection)
+    for conn in (plain, timed):
+        conn.execute("CREATE TABLE meals (id INTEGER PRIMARY KEY, meal TEXT)")
+        conn.executemany("INSERT INTO meals VALUES (?, ?)", [(i, f"meal-{i}") for i in range(1000)])
+
+    baseline = per_statement(plain, args.statements)
+    print(f"SQL point lookup, plain sqlite3:     {baseline:6.2f} us")
+    sql_utils.query_timer = None
+    print(f"  TimedCursor, no timer installed:   {per_statement(timed, args.statements) - baseline:+6.2f} us")
+    sql_utils.query_timer = QueryTimer()
+    for rate in (0.0, 0.1, 1.0):
+        metrics.registry.sample_rate = rate
+        print(f"  TimedCursor, sample rate {rate:<4}:      {per_statement(timed, args.statements) - baseline:+6.2f} us")
+    sql_utils.query_timer = None
+
+    # Interleave the configurations and keep each one's best round, to filter out machine noise
+    configs = [("no hooks", False, 1.0), ("hooks, sample rate 0.0", True, 0.0),
+               ("hooks, sample rate 0.1", True, 0.1), ("hooks, sample rate 1.0", True, 1.0)]
+    apps = {label: make_app(with_hooks) for label, with_hooks, _ in configs}
+    best = {label: float("inf") for label, _, _ in configs}
+    for _ in range(args.rounds):
+        for label, _, rate in configs:
+            metrics.registry.sample_rate = rate
+            best[label] = min(best[label], per_request(apps[label], args.requests))
+    baseline = best["no hooks"]
+    print(f"Flask request, no hooks:             {baseline:6.1f} us")
+    for label, _, _ in configs[1:]:
+        print(f"  {label}:            {best[label] - baseline:+6.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Serialization benchmark: cost of encoding large leaderboard and location
+payloads with Flask's default provider versus the fast provider, and what
+gzip (and brotli, when installed) costs and saves on the encoded body.
+
+Usage:
+    python benchmarks/bench_serialization.py --rows 10000 --repeat 20
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.utils import compression, serialization
+from meal_max.utils.compression import Compressor
+from meal_max.utils.serialization import FastJSONProvider
+
+
+def leaderboard(rows: int, rng: random.Random) -> dict:
+    items = []
+    for i in range(rows):
+        battles = rng.randint(1, 500)
+        wins = rng.randint(0, battles)
+        items.append({'id': i + 1, 'meal': f"Meal {i}", 'cuisine': rng.choice(["Italian", "Japanese", "Mexican"]),
+                      'price': round(rng.uniform(5, 40), 2), 'difficulty': rng.choice(["LOW", "MED", "HIGH"]),
+                      'battles': battles, 'wins': wins, 'win_pct': round(wins / battles * 100, 1)})
+    return {'status': 'success', 'leaderboard': items, 'next_cursor': "WzEwMCwgMTAwXQ"}
+
+
+def locations(rows: int, rng: random.Random) -> dict:
+    items = []
+    for i in range(rows):
+        temp = round(rng.uniform(-10, 35), 2)
+        humidity = rng.randint(10, 100)
+        items.append({'id': i + 1, 'location': f"City {i}", 'favorite': rng.random() < 0.1,
+                      'weather': f"Clouds (broken clouds), Temp: {temp}°C, Humidity: {humidity}% ",
+                      'weather_condition': "Clouds", 'weather_description': "broken clouds", 'temp': temp,
+                      'humidity': humidity, 'pressure': rng.randint(990, 1030),
+                      'wind_speed': round(rng.uniform(0, 15), 2), 'observed_at': 1700000000 + i,
+                      'weather_updated_at': 1700000000.0 + i})
+    return {'status': 'success', 'locations': items, 'next_cursor': None}
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=411)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    app = Flask(__name__)
+    providers = [("flask default", DefaultJSONProvider(app))]
+    if serialization.orjson is not None:
+        providers.append(("orjson", FastJSONProvider(app, "orjson")))
+    providers.append(("stdlib compact", FastJSONProvider(app, "json")))
+    compressor = Compressor()
+
+    for name, payload in (("leaderboard", leaderboard(args.rows, rng)), ("locations", locations(args.rows, rng))):
+        print(f"{name} ({args.rows:,} rows)")
+        baseline = None
+        with app.test_request_context():
+            for label, provider in providers:
+                body = provider.response(payload).get_data()
+                median = timed(lambda: provider.response(payload), args.repeat)
+                baseline = baseline or median
+                print(f"  {label:15s} {median:8.2f} ms  {len(body) / 1024:8.0f} KiB  {baseline / median:5.1f}x")
+        for encoding in ("gzip", "br") if compression.brotli is not None else ("gzip",):
+            compressed = compressor.compress(body, encoding)
+            median = timed(lambda: compressor.compress(body, encoding), args.repeat)
+            print(f"  + {encoding:13s} {median:8.2f} ms  {len(compressed) / 1024:8.0f} KiB  "
+                  f"{len(body) / len(compressed):5.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
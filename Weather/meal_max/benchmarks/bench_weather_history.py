@@ -0,0 +1,101 @@
+"""
+Weather history benchmark: ingest rate, downsampled query latency per
+resolution, and the longest write transaction taken by retention pruning.
+
+Usage:
+    python benchmarks/bench_weather_history.py --cities 2000 --days 10 --interval-minutes 10
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from meal_max.models import weather_history
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+
+
+DAY = 86400
+
+
+def populate(db_path: str, cities: int, days: int, interval: int, end: int, seed: int) -> tuple[int, float]:
+    """Ingests the history one refresh batch at a time, the way the refresher writes it."""
+    rng = random.Random(seed)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany("INSERT INTO locations (locations, weather) VALUES (?, '')",
+                         [(f"city-{i}",) for i in range(cities)])
+    conn = sqlite3.connect(db_path)
+    rows = 0
+    start = time.perf_counter()
+    for ts in range(end - days * DAY, end, interval):
+        batch = []
+        for location_id in range(1, cities + 1):
+            data = {'main': {'temp': rng.uniform(-10, 35), 'humidity': rng.randint(10, 100), 'pressure': 1010},
+                    'wind': {'speed': rng.uniform(0, 15)}, 'weather': [{'id': 800}], 'dt': ts}
+            batch.append(weather_history.observation_row(location_id, data, ts))
+        for i in range(0, len(batch), 500):
+            rows += weather_history.insert_observations(conn.cursor(), batch[i:i + 500])
+            conn.commit()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return rows, elapsed
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=10)
+    parser.add_argument("--interval-minutes", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=411)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    end = int(time.time()) // DAY * DAY
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        apply_migrations(db_path)
+        print(f"Ingesting {args.days} days of {args.interval_minutes}-minute observations for {args.cities:,} cities...")
+        rows, elapsed = populate(db_path, args.cities, args.days, args.interval_minutes * 60, end, args.seed)
+        print(f"ingest incl. roll-ups: {rows / elapsed:,.0f} observations/s ({rows:,} rows)")
+        size = os.path.getsize(db_path)
+        print(f"database size: {size / 1024 / 1024:,.1f} MiB ({size / rows:.0f} bytes per observation incl. roll-ups)")
+
+        sql_utils._pool = sql_utils.ConnectionPool(db_path, size=1, pragmas=sql_utils.DB_PRAGMAS)
+        location_id = args.cities // 2
+        for label, window, resolution in (("24 hours", DAY, "raw"), ("7 days", 7 * DAY, "hour"),
+                                          (f"{args.days} days", args.days * DAY, "day")):
+            history = weather_history.get_weather_history(location_id, end - window, end, resolution=resolution)
+            median = timed(lambda: weather_history.get_weather_history(
+                location_id, end - window, end, resolution=resolution), args.repeat)
+            print(f"history {label:9s} at {resolution:4s} resolution: {len(history['points']):4d} points "
+                  f"in {median:7.3f} ms")
+
+        start = time.perf_counter()
+        deleted = weather_history.prune_history(now=end, batch_size=100)
+        total = time.perf_counter() - start
+        batches = -(-args.cities // 100)
+        print(f"prune to {weather_history.WEATHER_HISTORY_RAW_RETENTION // DAY} days raw: "
+              f"{deleted['weather_observations']:,} rows in {total:.2f} s over {batches} transactions "
+              f"(~{total / batches * 1000:.1f} ms each)")
+        sql_utils.reset_pool()
+
+
+if __name__ == "__main__":
+    main()
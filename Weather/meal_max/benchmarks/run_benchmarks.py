@@ -0,0 +1,338 @@
+"""
+Endpoint benchmark suite.
+
+Starts app.py on a local WSGI server (the in-process development server, or
+gunicorn with --server gunicorn) with a temporary SQLite database, drives
+each route at the requested concurrency, and writes throughput and
+p50/p95/p99 latency per route to a JSON file. With --baseline the run fails
+(exit status 1) when a route regresses beyond --threshold.
+
+Weather comes from the offline fake provider (WEATHER_PROVIDER=fake) with
+--upstream-latency-ms of latency. --provider http-stub serves it from a
+local OpenWeatherMap-compatible HTTP server instead, which also exercises
+the outbound HTTP client.
+
+Usage:
+    python benchmarks/run_benchmarks.py --requests 500 --concurrency 16
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --threshold 0.25
+    python benchmarks/run_benchmarks.py --server gunicorn --workers 4 --threads 4
+    python benchmarks/run_benchmarks.py --provider http-stub
+"""
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import itertools
+import json
+import logging
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, PROJECT_DIR)
+
+from benchmarks.stub_servers import StubWeatherServer
+
+
+PASSWORD = "bench-password"
+
+
+@dataclass
+class Context:
+    base_url: str
+    run_id: str
+    location_ids: list[int] = field(default_factory=list)
+    deletable_ids: list[int] = field(default_factory=list)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: Callable[[Context, int], str]
+    body: Optional[Callable[[Context, int], dict]] = None
+    setup: Optional[Callable[[Context, int], None]] = None
+
+
+def _bulk_create(ctx: Context, prefix: str, count: int) -> list[int]:
+    ids = []
+    for start in range(0, count, 500):
+        names = [f"{prefix}-{ctx.run_id}-{i}" for i in range(start, min(start + 500, count))]
+        response = requests.post(f"{ctx.base_url}/api/locations/bulk", json={"locations": names})
+        response.raise_for_status()
+        ids.extend(result["id"] for result in response.json()["results"] if result["status"] == "created")
+    return ids
+
+
+def _setup_reads(ctx: Context, requests_count: int) -> None:
+    if not ctx.location_ids:
+        ctx.location_ids = _bulk_create(ctx, "read", 200)
+
+
+def _setup_deletes(ctx: Context, requests_count: int) -> None:
+    ctx.deletable_ids = _bulk_create(ctx, "delete", requests_count)
+
+
+def _setup_login(ctx: Context, requests_count: int) -> None:
+    requests.post(f"{ctx.base_url}/api/create-account",
+                  json={"username": f"login-{ctx.run_id}", "password": PASSWORD})
+
+
+SCENARIOS = [
+    Scenario("health", "GET", lambda ctx, i: "/api/health"),
+    Scenario("db_check", "GET", lambda ctx, i: "/api/db-check"),
+    Scenario("create_location", "POST", lambda ctx, i: "/api/create_location",
+             body=lambda ctx, i: {"location": f"city-{ctx.run_id}-{i}"}),
+    Scenario("locations_bulk", "POST", lambda ctx, i: "/api/locations/bulk",
+             body=lambda ctx, i: {"locations": [f"bulk-{ctx.run_id}-{i}-{j}" for j in range(50)]}),
+    Scenario("get_location_by_id", "GET",
+             lambda ctx, i: f"/api/get-location-by-id/{ctx.location_ids[i % len(ctx.location_ids)]}",
+             setup=_setup_reads),
+    Scenario("get_weather_for_location", "GET",
+             lambda ctx, i: f"/api/get-weather-for_location/{ctx.location_ids[i % len(ctx.location_ids)]}",
+             setup=_setup_reads),
+    Scenario("delete_location", "DELETE", lambda ctx, i: f"/api/delete-location/{ctx.deletable_ids[i]}",
+             setup=_setup_deletes),
+    Scenario("create_account", "POST", lambda ctx, i: "/api/create-account",
+             body=lambda ctx, i: {"username": f"user-{ctx.run_id}-{i}", "password": PASSWORD}),
+    Scenario("login", "POST", lambda ctx, i: "/api/login",
+             body=lambda ctx, i: {"username": f"login-{ctx.run_id}", "password": PASSWORD},
+             setup=_setup_login),
+    Scenario("update_password", "POST", lambda ctx, i: "/api/update-password",
+             body=lambda ctx, i: {"username": f"login-{ctx.run_id}", "password": PASSWORD},
+             setup=_setup_login),
+]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def run_scenario(scenario: Scenario, ctx: Context, requests_count: int, concurrency: int) -> dict:
+    """Sends requests_count requests for one route from concurrency client threads."""
+    if scenario.setup:
+        scenario.setup(ctx, requests_count)
+
+    counter = itertools.count()
+    counter_lock = threading.Lock()
+    local = threading.local()
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    results_lock = threading.Lock()
+
+    def worker() -> None:
+        local.session = requests.Session()
+        while True:
+            with counter_lock:
+                i = next(counter)
+            if i >= requests_count:
+                break
+            url = ctx.base_url + scenario.path(ctx, i)
+            body = scenario.body(ctx, i) if scenario.body else None
+            start = time.perf_counter()
+            try:
+                status = str(local.session.request(scenario.method, url, json=body).status_code)
+            except requests.exceptions.RequestException as e:
+                status = type(e).__name__
+            elapsed = (time.perf_counter() - start) * 1000
+            with results_lock:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(latencies[-1], 3) if latencies else 0.0,
+        'error_rate': round(errors / max(len(latencies), 1), 4),
+        'statuses': statuses,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Returns a description of every route that regressed beyond threshold."""
+    regressions = []
+    for name, current in results['routes'].items():
+        base = baseline.get('routes', {}).get(name)
+        if not base:
+            continue
+        if current['p95_ms'] > base['p95_ms'] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} ms vs baseline {base['p95_ms']:.2f} ms")
+        if current['throughput_rps'] < base['throughput_rps'] * (1 - threshold):
+            regressions.append(f"{name}: throughput {current['throughput_rps']:.1f} rps "
+                               f"vs baseline {base['throughput_rps']:.1f} rps")
+        if current['error_rate'] > base['error_rate'] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']:.2%} vs baseline {base['error_rate']:.2%}")
+    return regressions
+
+
+def configure_env(db_dir: str, weather_url: Optional[str], upstream_latency_ms: float = 0.0) -> None:
+    """Points the app at a temporary database and at weather_url, or at the fake provider if it is None."""
+    os.environ["DB_PATH"] = os.path.join(db_dir, "bench.db")
+    if weather_url is None:
+        os.environ["WEATHER_PROVIDER"] = "fake"
+        os.environ["FAKE_WEATHER_LATENCY_MS"] = str(upstream_latency_ms)
+    else:
+        os.environ["WEATHER_PROVIDER"] = "openweathermap"
+        os.environ["api_key"] = "bench"
+        os.environ["WEATHER_API_URL"] = weather_url
+
+
+def start_app(db_dir: str, weather_url: Optional[str], upstream_latency_ms: float = 0.0):
+    """Configures the environment, imports app.py and serves it on an ephemeral port."""
+    configure_env(db_dir, weather_url, upstream_latency_ms)
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from app import app
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class GunicornServer:
+    """Runs app.py (or another target, e.g. the ASGI app) under gunicorn.conf.py in a subprocess on a free port."""
+
+    def __init__(self, db_dir: str, weather_url: Optional[str], workers: int, threads: int, with_logs: bool,
+                 target: str = "app:app", worker_class: str = "gthread", extra_env: Optional[dict] = None,
+                 upstream_latency_ms: float = 0.0):
+        configure_env(db_dir, weather_url, upstream_latency_ms)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.server_port = sock.getsockname()[1]
+        env = dict(os.environ, GUNICORN_WORKERS=str(workers), GUNICORN_THREADS=str(threads),
+                   GUNICORN_BIND=f"127.0.0.1:{self.server_port}", GUNICORN_LOGLEVEL="warning",
+                   GUNICORN_WORKER_CLASS=worker_class, **(extra_env or {}))
+        if not with_logs:
+            env["LOG_LEVEL"] = "WARNING"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", os.path.join(PROJECT_DIR, "gunicorn.conf.py"), target],
+            cwd=PROJECT_DIR, env=env)
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                requests.get(f"http://127.0.0.1:{self.server_port}/api/health", timeout=1)
+                return
+            except requests.ConnectionError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("gunicorn did not start")
+                time.sleep(0.1)
+
+    def shutdown(self) -> None:
+        self.process.terminate()
+        self.process.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent client threads per route")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0, help="weather provider latency")
+    parser.add_argument("--provider", choices=("fake", "http-stub"), default="fake",
+                        help="offline fake weather provider, or the OpenWeatherMap provider against a local stub")
+    parser.add_argument("--routes", help="comma separated subset of: " + ", ".join(s.name for s in SCENARIOS))
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "results", "latest.json"))
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", help="also write the results to this path")
+    parser.add_argument("--with-logs", action="store_true", help="keep INFO logging enabled")
+    parser.add_argument("--server", choices=("dev", "gunicorn"), default="dev",
+                        help="in-process development server or gunicorn worker processes")
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    args = parser.parse_args()
+
+    if not args.with_logs:
+        logging.disable(logging.INFO)
+
+    scenarios = SCENARIOS
+    if args.routes:
+        wanted = set(args.routes.split(","))
+        unknown = wanted - {s.name for s in SCENARIOS}
+        if unknown:
+            parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in SCENARIOS if s.name in wanted]
+
+    stub = StubWeatherServer(args.upstream_latency_ms) if args.provider == "http-stub" else contextlib.nullcontext()
+    with tempfile.TemporaryDirectory() as db_dir, stub as upstream:
+        weather_url = upstream.url if upstream else None
+        if args.server == "gunicorn":
+            server = GunicornServer(db_dir, weather_url, args.workers, args.threads, args.with_logs,
+                                    upstream_latency_ms=args.upstream_latency_ms)
+        else:
+            server = start_app(db_dir, weather_url, args.upstream_latency_ms)
+        ctx = Context(base_url=f"http://127.0.0.1:{server.server_port}", run_id=str(int(time.time())))
+
+        results = {
+            'config': {
+                'requests': args.requests,
+                'concurrency': args.concurrency,
+                'upstream_latency_ms': args.upstream_latency_ms,
+                'provider': args.provider,
+                'server': args.server,
+                'workers': args.workers if args.server == "gunicorn" else 1,
+                'threads': args.threads if args.server == "gunicorn" else None,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'routes': {},
+        }
+        for scenario in scenarios:
+            result = run_scenario(scenario, ctx, args.requests, args.concurrency)
+            results['routes'][scenario.name] = result
+            print(f"{scenario.name:26s} {result['throughput_rps']:9.1f} rps   p50 {result['p50_ms']:8.2f} ms   "
+                  f"p95 {result['p95_ms']:8.2f} ms   p99 {result['p99_ms']:8.2f} ms   "
+                  f"errors {result['error_rate']:.1%}")
+        server.shutdown()
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        if regressions:
+            print("Regressions beyond threshold:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("No regressions beyond threshold.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
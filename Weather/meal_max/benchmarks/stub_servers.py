@@ -0,0 +1,154 @@
+"""
+Local stand-ins for the upstream APIs, used by the benchmarks.
+"""
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import multiprocessing
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+import zlib
+
+
+def _weather_body(location: str) -> bytes:
+    # Deterministic weather derived from the location name
+    seed = zlib.crc32(location.encode())
+    return json.dumps({
+        "name": location,
+        "weather": [{"main": "Clear", "description": "clear sky"}],
+        "main": {"temp": round(-10 + seed % 450 / 10, 1), "humidity": seed % 100},
+        "dt": int(time.time()),
+    }).encode()
+
+
+class _WeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        location = query.get("q", [""])[0]
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+        body = _weather_body(location)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubWeatherServer:
+    """
+    OpenWeatherMap-compatible /data/2.5/weather endpoint with artificial latency.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.server = ThreadingHTTPServer((host, port), _WeatherHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency_ms / 1000
+        self.server.requests = 0
+        self.server.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/data/2.5/weather"
+
+    @property
+    def requests(self) -> int:
+        return self.server.requests
+
+    def __enter__(self) -> "StubWeatherServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _serve_async(latency: float, port, requests, peak) -> None:
+    in_flight = 0
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        nonlocal in_flight
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                target = head.split(b" ", 2)[1].decode()
+                in_flight += 1
+                if in_flight > peak.value:
+                    peak.value = in_flight
+                try:
+                    if latency:
+                        await asyncio.sleep(latency)
+                finally:
+                    in_flight -= 1
+                requests.value += 1
+                body = _weather_body(parse_qs(urlsplit(target).query).get("q", [""])[0])
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main() -> None:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096)
+        port.value = server.sockets[0].getsockname()[1]
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+class AsyncStubWeatherServer:
+    """
+    The same endpoint served by an asyncio loop in a separate process.
+
+    A pending request costs a coroutine rather than a thread, so the stub can
+    hold thousands of slow requests open at once without competing with the
+    load generator for the GIL. Tracks the peak number of requests in flight.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self._port = multiprocessing.Value("i", 0)
+        self._requests = multiprocessing.Value("l", 0, lock=False)
+        self._peak = multiprocessing.Value("i", 0, lock=False)
+        self._process = multiprocessing.Process(
+            target=_serve_async, args=(latency_ms / 1000, self._port, self._requests, self._peak), daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._port.value}/data/2.5/weather"
+
+    @property
+    def requests(self) -> int:
+        return self._requests.value
+
+    @property
+    def peak_in_flight(self) -> int:
+        return self._peak.value
+
+    def reset_peak(self) -> None:
+        self._peak.value = 0
+
+    def __enter__(self) -> "AsyncStubWeatherServer":
+        self._process.start()
+        deadline = time.monotonic() + 10
+        while not self._port.value:
+            if time.monotonic() > deadline:
+                raise RuntimeError("stub server did not start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._process.terminate()
+        self._process.join()
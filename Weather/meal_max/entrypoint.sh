@@ -5,7 +5,9 @@ if [ -f .env ]; then
     export $(cat .env | xargs)
 fi
 
-# Check if CREATE_DB is true, and run the database creation script if so
+# Check if CREATE_DB is true, and run the database creation script if so.
+# This drops every table; the app applies the idempotent migrations in
+# sql/migrations on startup, so it is only needed to reset the database.
 if [ "$CREATE_DB" = "true" ]; then
     echo "Creating the database..."
     /app/sql/create_db.sh
@@ -13,5 +15,14 @@ else
     echo "Skipping database creation."
 fi
 
-# Start the Python application
-exec python app.py
+# Start the application: gunicorn worker processes in production, uvicorn
+# workers serving asgi.py in asgi mode, the single-process Flask development
+# server otherwise
+if [ "${SERVER_MODE:-production}" = "production" ]; then
+    exec gunicorn -c gunicorn.conf.py app:app
+elif [ "$SERVER_MODE" = "asgi" ]; then
+    export GUNICORN_WORKER_CLASS="${GUNICORN_WORKER_CLASS:-uvicorn.workers.UvicornWorker}"
+    exec gunicorn -c gunicorn.conf.py asgi:app
+else
+    exec python app.py
+fi
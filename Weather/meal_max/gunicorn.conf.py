@@ -0,0 +1,44 @@
+"""
+Gunicorn settings for the production server, used by entrypoint.sh when
+SERVER_MODE=production:
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Every value can be overridden with the GUNICORN_* environment variables.
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+# Worker processes; each one serves requests on a pool of threads
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# gthread serves app:app; uvicorn.workers.UvicornWorker serves the ASGI app in asgi.py (SERVER_MODE=asgi)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+# Open client connections per worker; a gthread worker at this limit stops serving until one closes
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+# Load app.py (and apply migrations) once in the master, then fork, so workers start fast
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+# Recycle each worker after this many requests, staggered by the jitter; 0 disables recycling
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "500"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Request logging goes through the app's own log pipeline
+accesslog = os.getenv("GUNICORN_ACCESSLOG") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def when_ready(server):
+    if preload_app:
+        import app
+        app.prepare_for_fork()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        import app
+        app.init_worker()
@@ -0,0 +1,171 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+import time
+from typing import Any, Callable, Hashable
+
+from meal_max.models import location_model
+from meal_max.models.weather_providers import get_weather_provider
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import DB_POOL_SIZE
+from meal_max.utils.weather_cache import normalize_location
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Threads running SQLite work for the async routes; more than the connection pool would only wait on it
+ASYNC_DB_WORKERS = int(os.getenv("ASYNC_DB_WORKERS", str(DB_POOL_SIZE)))
+
+_db_executor = ThreadPoolExecutor(max_workers=ASYNC_DB_WORKERS, thread_name_prefix="async-db")
+
+# Upstream loads in progress on the event loop, so concurrent misses for a location share one call
+_in_flight: dict[Hashable, asyncio.Task] = {}
+
+
+async def run_db(func: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs a blocking database function on the database thread pool.
+
+    Args:
+        func (Callable): The function, e.g. location_model.store_location.
+        *args: Its arguments.
+
+    Returns:
+        Whatever the function returned.
+    """
+    return await asyncio.get_running_loop().run_in_executor(_db_executor, functools.partial(func, *args))
+
+async def fetch_current_weather(location: str, units: str = location_model.WEATHER_UNITS) -> dict:
+    """
+    Fetches the current weather for a location from the configured weather provider without blocking the event loop.
+
+    Shares location_model.weather_breaker and WEATHER_FETCH_DEADLINE with the synchronous fetch.
+
+    Args:
+        location (str): Name of the location to fetch weather for.
+        units (str): Unit system requested from the API.
+
+    Returns:
+        dict: The observation, in the OpenWeatherMap response format.
+
+    Raises:
+        ValueError: If the provider is not configured, e.g. the API key is missing.
+        CircuitOpenError: If the circuit is open and the provider is not called.
+        Exception: If the API call fails.
+    """
+    location_model.weather_breaker.before_call()
+    try:
+        data = await get_weather_provider().afetch(location, units, deadline=location_model.WEATHER_FETCH_DEADLINE)
+    except BaseException as e:
+        location_model.record_fetch_error(e)
+        raise
+    location_model.weather_breaker.record_success()
+    return data
+
+async def _load_weather(key: Hashable, location: str, units: str) -> dict:
+    data = await fetch_current_weather(location, units)
+    location_model.weather_cache.set(key, data)
+    return data
+
+async def get_current_weather(location: str, units: str = location_model.WEATHER_UNITS) -> dict:
+    """
+    Returns the current weather for a location, served from the shared weather cache when fresh.
+
+    Concurrent misses for the same location and units share a single upstream
+    request. A caller that is cancelled does not cancel the request for the others.
+    If the request fails, a stale cached response is returned instead when there is one.
+
+    Args:
+        location (str): Name of the location to fetch weather for.
+        units (str): Unit system requested from the API.
+
+    Returns:
+        dict: The decoded API response.
+
+    Raises:
+        ValueError: If the API key is not configured.
+        CircuitOpenError: If the circuit is open and nothing is cached.
+        Exception: If the API call fails and nothing is cached.
+    """
+    key = (normalize_location(location), units)
+    cached = location_model.weather_cache.get(key)
+    if cached is not None:
+        return cached
+    task = _in_flight.get(key)
+    if task is None:
+        task = _in_flight[key] = asyncio.ensure_future(_load_weather(key, location, units))
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    try:
+        return await asyncio.shield(task)
+    except ValueError:
+        raise
+    except Exception as e:
+        return location_model.stale_weather(key, location, e)
+
+async def create_location(location: str) -> dict:
+    """
+    Creates a location and fetches the weather for that location from the API.
+
+    Args:
+        location (str): Name of the location to fetch weather for.
+
+    Returns:
+        dict: id, location and current_weather of the new location.
+
+    Raises:
+        ValueError: If the location is invalid, not a string or already exists.
+        Exception: If the API call fails or data parsing encounters an error.
+    """
+    if not isinstance(location, str):
+        raise ValueError(f"Invalid location: {location}. Location must be a string.")
+
+    try:
+        current_data = await get_current_weather(location)
+        return await run_db(location_model.store_location, location, current_data, time.time())
+    except Exception as e:
+        logger.error("Failed to create location %s: %s", location, e)
+        raise
+
+async def create_locations_bulk(locations: list) -> list[dict]:
+    """
+    Creates many locations at once, fetching their weather concurrently on the event loop.
+
+    Concurrency is bounded by the async HTTP client, not by a worker pool.
+    Results are the same as location_model.create_locations_bulk().
+
+    Args:
+        locations (list): Names of the locations to create.
+
+    Returns:
+        list[dict]: One result per input item, in input order.
+
+    Raises:
+        ValueError: If locations is not a list or exceeds BULK_MAX_LOCATIONS.
+        sqlite3.Error: If the batch insert fails.
+    """
+    results, pending = await run_db(location_model.prepare_bulk_locations, locations)
+    names = list(pending)
+    logger.info("Fetching weather for %d locations", len(names))
+
+    async def fetch(name: str) -> tuple:
+        try:
+            return await get_current_weather(name), time.time(), None
+        except Exception as e:
+            return None, time.time(), e
+
+    fetched = dict(zip(names, await asyncio.gather(*(fetch(name) for name in names))))
+    await run_db(location_model.store_bulk_locations, pending, fetched)
+    return results
+
+def stats() -> dict:
+    """
+    Returns the async location path metrics.
+
+    Returns:
+        dict: upstream loads in flight on the event loop, and the size of the database thread pool.
+    """
+    return {'loads_in_flight': len(_in_flight), 'db_workers': ASYNC_DB_WORKERS}
@@ -1,9 +1,12 @@
+from collections import Counter
 from dataclasses import dataclass
 import logging
 import os
 import sqlite3
-from typing import Any
+import threading
+from typing import Any, Iterator, Optional
 
+from meal_max.utils.pagination import DEFAULT_PAGE_SIZE, check_page_size, decode_cursor, encode_cursor, iter_rows
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
@@ -12,6 +15,31 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+# Recomputes the materialized leaderboard row of one meal from its current stats
+LEADERBOARD_UPSERT = """
+    INSERT INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+    SELECT id, battles, wins, wins * 1.0 / battles
+    FROM meals WHERE id = ? AND deleted = FALSE AND battles > 0
+    ON CONFLICT(meal_id) DO UPDATE SET
+        battles = excluded.battles, wins = excluded.wins, win_pct = excluded.win_pct
+"""
+
+# Field name to SQL expression for leaderboard listings
+LEADERBOARD_FIELDS = {
+    'id': "m.id",
+    'meal': "m.meal",
+    'cuisine': "m.cuisine",
+    'price': "m.price",
+    'difficulty': "m.difficulty",
+    'battles': "l.battles",
+    'wins': "l.wins",
+    'win_pct': "l.win_pct",
+}
+
+# SQLite's default limit on host parameters in a single statement is 999
+SQL_PARAM_CHUNK = 500
+
+
 @dataclass
 class Meal:
     id: int
@@ -78,6 +106,7 @@ def clear_meals() -> None:
             create_table_script = fh.read()
         with get_db_connection() as conn:
             cursor = conn.cursor()
+            # The script recreates meal_leaderboard along with meals
             cursor.executescript(create_table_script)
             conn.commit()
 
@@ -87,6 +116,26 @@ def clear_meals() -> None:
         logger.error("Database error while clearing meals: %s", str(e))
         raise e
 
+def _raise_missing_meal(cursor: sqlite3.Cursor, meal_id: int, deleted_message: str) -> None:
+    """
+    Slow path of a conditional write that matched no row: works out whether the
+    meal does not exist or was already soft-deleted.
+
+    Args:
+        cursor(sqlite3.Cursor): the cursor of the current transaction
+        meal_id(int): the identifier of a meal
+        deleted_message(str): log message used when the meal has been deleted
+
+    Raises:
+        ValueError: always, saying whether the meal was not found or has been deleted
+    """
+    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+    if cursor.fetchone() is None:
+        logger.info("Meal with ID %s not found", meal_id)
+        raise ValueError(f"Meal with ID {meal_id} not found")
+    logger.info(deleted_message, meal_id)
+    raise ValueError(f"Meal with ID {meal_id} has been deleted")
+
 def delete_meal(meal_id: int) -> None:
     """
     Deletes a meal using the meal_id
@@ -102,17 +151,11 @@ def delete_meal(meal_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Meal with ID %s has already been deleted", meal_id)
-                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
-                logger.info("Meal with ID %s not found", meal_id)
-                raise ValueError(f"Meal with ID {meal_id} not found")
+            cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ? AND deleted = FALSE", (meal_id,))
+            if cursor.rowcount == 0:
+                _raise_missing_meal(cursor, meal_id, "Meal with ID %s has already been deleted")
 
-            cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
+            cursor.execute("DELETE FROM meal_leaderboard WHERE meal_id = ?", (meal_id,))
             conn.commit()
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
@@ -121,37 +164,49 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
-def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
+def get_leaderboard(sort_by: str="wins", limit: Optional[int]=None, offset: int=0) -> list[dict[str, Any]]:
     """
     Gets the leaderboard of combatants sorted by either wins or win_pct
-    
+
+    Reads the materialized meal_leaderboard table through the index matching
+    sort_by, so the top K rows are returned without sorting the meals table.
+
     Args:
         sort_by(str): sorts combatants by number of wins or by win_pct
-    
+        limit(int): maximum number of rows to return (top K); None returns every row
+        offset(int): number of rows to skip, for pagination
+
     Returns:
-        returns a dictionary containing the combatant's meal_id, meal, cuisine, price, difficulty, battles, wins, and win_pct 
-    
+        returns a list of dictionaries containing the combatant's meal_id, meal, cuisine, price, difficulty, battles, wins, and win_pct
+
     Raises:
         sqlite3.Error: If any database error occurs.
-        ValueError: if an invalid paramter is entered into sort_by
-    """
-    query = """
-        SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
-        FROM meals WHERE deleted = false AND battles > 0
+        ValueError: if an invalid paramter is entered into sort_by, limit or offset
     """
-
     if sort_by == "win_pct":
-        query += " ORDER BY win_pct DESC"
+        order_by = "l.win_pct DESC, l.meal_id"
     elif sort_by == "wins":
-        query += " ORDER BY wins DESC"
+        order_by = "l.wins DESC, l.meal_id"
     else:
         logger.error("Invalid sort_by parameter: %s", sort_by)
         raise ValueError("Invalid sort_by parameter: %s" % sort_by)
 
+    if limit is not None and (not isinstance(limit, int) or limit < 0):
+        raise ValueError(f"Invalid limit: {limit}. Limit must be a non-negative integer.")
+    if not isinstance(offset, int) or offset < 0:
+        raise ValueError(f"Invalid offset: {offset}. Offset must be a non-negative integer.")
+
+    query = f"""
+        SELECT m.id, m.meal, m.cuisine, m.price, m.difficulty, l.battles, l.wins, l.win_pct
+        FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
+        ORDER BY {order_by}
+        LIMIT ? OFFSET ?
+    """
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query)
+            cursor.execute(query, (-1 if limit is None else limit, offset))
             rows = cursor.fetchall()
 
         leaderboard = []
@@ -175,6 +230,90 @@ def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
         logger.error("Database error: %s", str(e))
         raise e
 
+def _iter_leaderboard_rows(sort_by: str, after: Optional[list], limit: Optional[int],
+                           fields: list[str]) -> Iterator[tuple[list, dict[str, Any]]]:
+    if sort_by not in ("wins", "win_pct"):
+        logger.error("Invalid sort_by parameter: %s", sort_by)
+        raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+
+    where = ""
+    params: list = []
+    if after is not None:
+        # Rows after (key, meal_id) in "key DESC, meal_id" order; the first term keeps it an index range
+        where = f"WHERE l.{sort_by} <= ? AND (l.{sort_by} < ? OR l.meal_id > ?)"
+        params = [after[0], after[0], after[1]]
+    query = f"""
+        SELECT l.{sort_by}, l.meal_id, {", ".join(LEADERBOARD_FIELDS[field] for field in fields)}
+        FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id
+        {where}
+        ORDER BY l.{sort_by} DESC, l.meal_id
+        LIMIT ?
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (*params, -1 if limit is None else limit))
+            for row in iter_rows(cursor):
+                item = dict(zip(fields, row[2:]))
+                if 'win_pct' in item:
+                    item['win_pct'] = round(item['win_pct'] * 100, 1)  # Convert to percentage
+                yield [row[0], row[1]], item
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def iter_leaderboard(sort_by: str = "wins", cursor: Optional[str] = None, limit: Optional[int] = None,
+                     fields: Optional[list[str]] = None) -> Iterator[dict[str, Any]]:
+    """
+    Yields leaderboard rows one at a time, straight from the database cursor.
+
+    Rows are fetched in small batches, so memory use does not grow with the
+    size of the leaderboard.
+
+    Args:
+        sort_by (str): "wins" or "win_pct".
+        cursor (str): Continue after the row this cursor points at, from list_leaderboard().
+        limit (int): Maximum number of rows; None yields every remaining row.
+        fields (list[str]): Fields of LEADERBOARD_FIELDS to include; None includes all.
+
+    Yields:
+        dict: A leaderboard row with the requested fields.
+
+    Raises:
+        ValueError: If sort_by or cursor is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    after = decode_cursor(cursor, 2) if cursor else None
+    for _, item in _iter_leaderboard_rows(sort_by, after, limit, fields or list(LEADERBOARD_FIELDS)):
+        yield item
+
+def list_leaderboard(sort_by: str = "wins", cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE,
+                     fields: Optional[list[str]] = None) -> dict[str, Any]:
+    """
+    Returns one page of the leaderboard using keyset pagination.
+
+    Each page continues from the last row of the previous one, so a page
+    costs the same no matter how deep into the leaderboard it is.
+
+    Args:
+        sort_by (str): "wins" or "win_pct".
+        cursor (str): next_cursor of the previous page; None starts at the top.
+        limit (int): Page size.
+        fields (list[str]): Fields of LEADERBOARD_FIELDS to include; None includes all.
+
+    Returns:
+        dict: items, and next_cursor (None on the last page).
+
+    Raises:
+        ValueError: If sort_by, cursor or limit is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    check_page_size(limit)
+    after = decode_cursor(cursor, 2) if cursor else None
+    rows = list(_iter_leaderboard_rows(sort_by, after, limit + 1, fields or list(LEADERBOARD_FIELDS)))
+    next_cursor = encode_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+    return {'items': [item for _, item in rows[:limit]], 'next_cursor': next_cursor}
+
 def get_meal_by_id(meal_id: int) -> Meal:
     """
     Gets a meal by its id
@@ -255,28 +394,224 @@ def update_meal_stats(meal_id: int, result: str) -> None:
         ValueError: if meal with meal_id is not found or has been deleted or if a invalid result is outputed
         TypeError: if any type error occurs
     """
+    if result == 'win':
+        query = "UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ? AND deleted = FALSE"
+    elif result == 'loss':
+        query = "UPDATE meals SET battles = battles + 1 WHERE id = ? AND deleted = FALSE"
+    else:
+        raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Meal with ID %s has been deleted", meal_id)
-                    raise ValueError(f"Meal with ID {meal_id} has been deleted")
-            except TypeError:
-                logger.info("Meal with ID %s not found", meal_id)
-                raise ValueError(f"Meal with ID {meal_id} not found")
+            cursor.execute(query, (meal_id,))
+            if cursor.rowcount == 0:
+                _raise_missing_meal(cursor, meal_id, "Meal with ID %s has been deleted")
 
-            if result == 'win':
-                cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (meal_id,))
-            elif result == 'loss':
-                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (meal_id,))
-            else:
-                raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
+            cursor.execute(LEADERBOARD_UPSERT, (meal_id,))
+            conn.commit()
 
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def update_meal_stats_batch(results: list[tuple[int, str]]) -> list[dict[str, Any]]:
+    """
+    Applies many battle results at once
+
+    Existence and soft-delete state of every meal are checked with one set-based
+    query, results are aggregated per meal, and all stats and leaderboard
+    updates are written in a single transaction. A meal deleted between the
+    check and its update is reported as deleted. Invalid items are reported
+    individually and do not stop the rest of the batch.
+
+    Args:
+        results(list[tuple[int, str]]): (meal_id, result) pairs, where result is 'win' or 'loss'
+
+    Returns:
+        a list with one dictionary per input pair, in input order, containing meal_id, result,
+        status ('applied' or 'error') and, for errors, the error message
+
+    Raises:
+        sqlite3.Error: If any database error occurs. Nothing from the batch is applied.
+    """
+    outcomes = []
+    valid = []
+    for meal_id, result in results:
+        outcome = {'meal_id': meal_id, 'result': result, 'status': 'applied'}
+        outcomes.append(outcome)
+        if result not in ('win', 'loss'):
+            outcome.update(status='error', error=f"Invalid result: {result}. Expected 'win' or 'loss'.")
+        else:
+            valid.append(outcome)
+
+    meal_ids = list({outcome['meal_id'] for outcome in valid})
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            deleted_by_id = {}
+            for i in range(0, len(meal_ids), SQL_PARAM_CHUNK):
+                chunk = meal_ids[i:i + SQL_PARAM_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT id, deleted FROM meals WHERE id IN ({placeholders})", chunk)
+                deleted_by_id.update(cursor.fetchall())
+
+            battles = Counter()
+            wins = Counter()
+            for outcome in valid:
+                meal_id = outcome['meal_id']
+                if meal_id not in deleted_by_id:
+                    outcome.update(status='error', error=f"Meal with ID {meal_id} not found")
+                elif deleted_by_id[meal_id]:
+                    outcome.update(status='error', error=f"Meal with ID {meal_id} has been deleted")
+                else:
+                    battles[meal_id] += 1
+                    if outcome['result'] == 'win':
+                        wins[meal_id] += 1
+
+            # Per meal, so one deleted since the check above is caught by its row count
+            vanished = set()
+            for meal_id, count in battles.items():
+                cursor.execute("UPDATE meals SET battles = battles + ?, wins = wins + ? WHERE id = ? AND deleted = FALSE",
+                               (count, wins[meal_id], meal_id))
+                if cursor.rowcount != 1:
+                    vanished.add(meal_id)
+            for outcome in valid:
+                if outcome['meal_id'] in vanished:
+                    outcome.update(status='error', error=f"Meal with ID {outcome['meal_id']} has been deleted")
+            for meal_id in vanished:
+                del battles[meal_id]
+
+            if battles:
+                cursor.executemany(LEADERBOARD_UPSERT, [(meal_id,) for meal_id in battles])
             conn.commit()
 
+            logger.info("Applied %d battle results to %d meals", sum(battles.values()), len(battles))
+            return outcomes
+
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
         raise e
+
+
+class StatsWriteBuffer:
+    """
+    Write-behind buffer for high-rate battle result streams.
+
+    Results are queued in memory and applied with update_meal_stats_batch()
+    whenever flush_size results are pending or every flush_interval_ms
+    milliseconds, whichever comes first. Results still pending when the
+    process dies are lost, so use update_meal_stats() where every write must
+    be durable before returning.
+    """
+
+    def __init__(self, flush_size: int = 500, flush_interval_ms: int = 100):
+        """
+        Initializes the buffer and starts its background flush thread.
+
+        Args:
+            flush_size(int): number of pending results that triggers a flush
+            flush_interval_ms(int): maximum time a result waits before being flushed
+
+        Raises:
+            ValueError: if flush_size or flush_interval_ms is not positive
+        """
+        if flush_size < 1:
+            raise ValueError(f"Invalid flush_size: {flush_size}. Must be at least 1.")
+        if flush_interval_ms <= 0:
+            raise ValueError(f"Invalid flush_interval_ms: {flush_interval_ms}. Must be positive.")
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: list[tuple[int, str]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.applied = 0
+        self.failed = 0
+        self.flushes = 0
+        self._thread = threading.Thread(target=self._run, name="stats-write-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, meal_id: int, result: str) -> None:
+        """
+        Queues one battle result, flushing in the caller's thread if the buffer is full.
+
+        Args:
+            meal_id(int): the id of a meal
+            result(str): 'win' or 'loss'
+
+        Raises:
+            RuntimeError: if the buffer has been closed
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("StatsWriteBuffer is closed")
+        with self._lock:
+            self._pending.append((meal_id, result))
+            full = len(self._pending) >= self.flush_size
+        if full:
+            self.flush()
+
+    def flush(self) -> list[dict[str, Any]]:
+        """
+        Applies every pending result now.
+
+        Returns:
+            the per-item outcomes from update_meal_stats_batch()
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return []
+            try:
+                outcomes = update_meal_stats_batch(batch)
+            except sqlite3.Error:
+                with self._lock:
+                    self.failed += len(batch)
+                logger.error("Dropped %d buffered battle results after a database error", len(batch))
+                return []
+            except Exception:
+                with self._lock:
+                    self.failed += len(batch)
+                raise
+            errors = [outcome for outcome in outcomes if outcome['status'] == 'error']
+            for outcome in errors:
+                logger.warning("Buffered battle result rejected: %s", outcome['error'])
+            with self._lock:
+                self.flushes += 1
+                self.applied += len(outcomes) - len(errors)
+                self.failed += len(errors)
+            return outcomes
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # Keep the thread alive, or nothing buffered after this would ever be written
+                logger.exception("Background flush of buffered battle results failed")
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the buffer counters.
+
+        Returns:
+            a dictionary with pending, applied, failed and flushes
+        """
+        with self._lock:
+            return {'pending': len(self._pending), 'applied': self.applied,
+                    'failed': self.failed, 'flushes': self.flushes}
+
+    def close(self) -> None:
+        """
+        Stops the background thread and flushes whatever is still pending.
+        """
+        self._stopped.set()
+        self._thread.join()
+        self.flush()
@@ -1,21 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 import logging
 import os
 import sqlite3
-from typing import Any
+import time
+from typing import Hashable, Iterator, Optional
 
-import logging
-from typing import List
+from dotenv import load_dotenv
 
+from meal_max.models.weather_history import RESOLUTIONS, insert_observations, observation_row
+from meal_max.models.weather_providers import WeatherProviderError, get_weather_provider
+from meal_max.utils.circuit_breaker import CircuitBreaker
+from meal_max.utils.export import export_weather
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
-
-import requests
-import json
-from dotenv import load_dotenv
-import os
-
-
+from meal_max.utils.pagination import DEFAULT_PAGE_SIZE, check_page_size, decode_cursor, encode_cursor, iter_rows
+from meal_max.utils.scheduling import RecentAccesses
+from meal_max.utils.weather_cache import WeatherCache, normalize_location
 
 
 load_dotenv()
@@ -23,6 +24,61 @@ logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
+WEATHER_UNITS = "metric"  # Metric units for temperature in Celsius
+
+# Cache of raw OpenWeatherMap responses keyed by (normalized location, units); expired
+# responses are kept for WEATHER_CACHE_STALE_TTL more seconds to stand in while the API fails
+weather_cache = WeatherCache(
+    ttl=float(os.getenv("WEATHER_CACHE_TTL", "300")),
+    max_size=int(os.getenv("WEATHER_CACHE_MAX_SIZE", "1024")),
+    stale_ttl=float(os.getenv("WEATHER_CACHE_STALE_TTL", "3600")),
+)
+
+# Seconds one weather fetch may take, retries included
+WEATHER_FETCH_DEADLINE = float(os.getenv("WEATHER_FETCH_DEADLINE", "5"))
+
+# Fails weather fetches fast while the API is down instead of tying up a worker for every deadline
+weather_breaker = CircuitBreaker(
+    "OpenWeatherMap",
+    failure_threshold=int(os.getenv("WEATHER_BREAKER_FAILURES", "5")),
+    recovery_timeout=float(os.getenv("WEATHER_BREAKER_RECOVERY", "30")),
+    half_open_max_calls=int(os.getenv("WEATHER_BREAKER_HALF_OPEN_CALLS", "1")),
+)
+
+BULK_FETCH_WORKERS = int(os.getenv("BULK_FETCH_WORKERS", "32"))
+BULK_MAX_LOCATIONS = int(os.getenv("BULK_MAX_LOCATIONS", "10000"))
+
+# Locations whose weather was read recently; the background refresher updates these first
+recent_reads = RecentAccesses(max_size=int(os.getenv("WEATHER_RECENT_READS_MAX", "10000")))
+
+# Weather columns written with every observation, in the order _weather_values() returns them
+WEATHER_COLUMNS = ("weather", "weather_condition", "weather_description", "temp", "humidity",
+                   "pressure", "wind_speed", "observed_at", "weather_updated_at")
+
+# Columns search_locations_by_weather() may sort by
+WEATHER_SORT_COLUMNS = ("temp", "humidity", "pressure", "wind_speed", "observed_at")
+WEATHER_SEARCH_MAX_LIMIT = 1000
+
+# Field name to column for location listings
+LOCATION_FIELDS = {
+    'id': "id",
+    'location': "locations",
+    'favorite': "favorite",
+    'weather': "weather",
+    'weather_condition': "weather_condition",
+    'weather_description': "weather_description",
+    'temp': "temp",
+    'humidity': "humidity",
+    'pressure': "pressure",
+    'wind_speed': "wind_speed",
+    'observed_at': "observed_at",
+    'weather_updated_at': "weather_updated_at",
+}
+
+# SQLite's default limit on host parameters in a single statement is 999
+SQL_PARAM_CHUNK = 500
+
+
 @dataclass
 class Location:
     id: int
@@ -35,6 +91,142 @@ class Location:
         """
         self.id = 1
 
+def fetch_current_weather(location: str, units: str = WEATHER_UNITS) -> dict:
+    """
+    Fetches the current weather for a location from the configured weather provider.
+
+    The call goes through weather_breaker and is bounded by WEATHER_FETCH_DEADLINE.
+    Connection errors, timeouts and unavailable responses count as failures of
+    the provider; other errors (e.g. 404 for an unknown city) do not.
+
+    Args:
+        location (str): Name of the location to fetch weather for.
+        units (str): Unit system requested from the API.
+
+    Returns:
+        dict: The observation, in the OpenWeatherMap response format.
+
+    Raises:
+        ValueError: If the provider is not configured, e.g. the API key is missing.
+        CircuitOpenError: If the circuit is open and the provider is not called.
+        Exception: If the API call fails.
+    """
+    weather_breaker.before_call()
+    try:
+        data = get_weather_provider().fetch(location, units, deadline=WEATHER_FETCH_DEADLINE)
+    except BaseException as e:
+        record_fetch_error(e)
+        raise
+    weather_breaker.record_success()
+    return data
+
+def record_fetch_error(error: BaseException) -> None:
+    """
+    Reports a failed weather fetch to weather_breaker.
+
+    Args:
+        error (BaseException): What the provider raised.
+    """
+    if isinstance(error, ValueError) or not isinstance(error, Exception):
+        # Misconfigured or cancelled: the provider was not asked
+        weather_breaker.release()
+    elif isinstance(error, WeatherProviderError) and not error.unavailable:
+        weather_breaker.record_success()
+    else:
+        weather_breaker.record_failure()
+
+def get_current_weather(location: str, units: str = WEATHER_UNITS) -> dict:
+    """
+    Returns the current weather for a location, served from the weather cache when fresh.
+
+    Concurrent misses for the same location and units share a single upstream
+    request. If it fails, a stale cached response is returned instead when
+    there is one.
+
+    Args:
+        location (str): Name of the location to fetch weather for.
+        units (str): Unit system requested from the API.
+
+    Returns:
+        dict: The decoded API response.
+
+    Raises:
+        ValueError: If the API key is not configured.
+        CircuitOpenError: If the circuit is open and nothing is cached.
+        Exception: If the API call fails and nothing is cached.
+    """
+    key = (normalize_location(location), units)
+    try:
+        return weather_cache.get_or_load(key, lambda: fetch_current_weather(location, units))
+    except ValueError:
+        raise
+    except Exception as e:
+        return stale_weather(key, location, e)
+
+def stale_weather(key: Hashable, location: str, error: Exception) -> dict:
+    """
+    Falls back to a stale cached response after a weather fetch failed.
+
+    Args:
+        key (Hashable): The weather cache key.
+        location (str): Name of the location, for the log.
+        error (Exception): Why the fetch failed.
+
+    Returns:
+        dict: The stale API response.
+
+    Raises:
+        Exception: The original error, if nothing is cached for the key.
+    """
+    data = weather_cache.get_stale(key)
+    if data is None:
+        raise error
+    logger.warning("Serving stale weather for %s: %s", location, error)
+    return data
+
+def format_weather(current_data: dict) -> str:
+    """
+    Formats an OpenWeatherMap response into the string stored with a location.
+
+    Args:
+        current_data (dict): The decoded API response.
+
+    Returns:
+        str: A human-readable summary of the current weather.
+    """
+    return (
+        f"{current_data['weather'][0]['main']} ({current_data['weather'][0]['description']}), "
+        f"Temp: {current_data['main']['temp']}°C, Humidity: {current_data['main']['humidity']}% "
+    )
+
+def parse_weather(current_data: dict) -> dict:
+    """
+    Extracts the typed weather fields stored with a location from an OpenWeatherMap response.
+
+    Args:
+        current_data (dict): The decoded API response.
+
+    Returns:
+        dict: weather_condition, weather_description, temp (°C), humidity (%),
+        pressure (hPa), wind_speed (m/s) and observed_at (unix time of the
+        observation). Fields missing from the response are None.
+    """
+    conditions = current_data.get('weather') or [{}]
+    main = current_data.get('main', {})
+    return {
+        'weather_condition': conditions[0].get('main'),
+        'weather_description': conditions[0].get('description'),
+        'temp': main.get('temp'),
+        'humidity': main.get('humidity'),
+        'pressure': main.get('pressure'),
+        'wind_speed': current_data.get('wind', {}).get('speed'),
+        'observed_at': current_data.get('dt'),
+    }
+
+def _weather_values(current_data: dict, fetched_at: float) -> tuple:
+    # Values for WEATHER_COLUMNS; the formatted string is kept for the existing weather endpoint
+    return (format_weather(current_data), *parse_weather(current_data).values(), fetched_at)
+
 def create_location(location: str) -> dict:
     """
     Creates a location and fetches the weather for that location from the API.
@@ -49,72 +241,460 @@ def create_location(location: str) -> dict:
     if not isinstance(location, str):
         raise ValueError(f"Invalid location: {location}. Location must be a string.")
 
-    # Load API key and set base URLs
-    api_key = os.getenv("api_key")
-    if not api_key:
-        raise ValueError("API key not found in environment variables.")
+    try:
+        # Get current weather
+        current_data = get_current_weather(location)
+        return store_location(location, current_data, time.time())
+    except Exception as e:
+        logger.error("Failed to create location %s: %s", location, e)
+        raise
+
+def store_location(location: str, current_data: dict, fetched_at: float) -> dict:
+    """
+    Inserts a location with weather that has already been fetched.
+
+    The database half of create_location(), shared with the async location routes.
+
+    Args:
+        location (str): Name of the location.
+        current_data (dict): The decoded weather API response.
+        fetched_at (float): Unix time the weather was fetched.
 
-    weather_url = "https://api.openweathermap.org/data/2.5/weather"
+    Returns:
+        dict: id, location and current_weather of the new location.
 
-    params = {
-        "q": location,
-        "appid": api_key,
-        "units": "metric"  # Metric units for temperature in Celsius
+    Raises:
+        ValueError: If a location with that name already exists.
+        sqlite3.Error: If any other database error occurs.
+    """
+    weather_result = {
+        "id": -1,
+        "location": location,
+        "current_weather": format_weather(current_data)
     }
 
     try:
-        # Get current weather
-        current_response = requests.get(weather_url, params=params)
-        if current_response.status_code != 200:
-            raise Exception(f"Failed to fetch current weather: {current_response.status_code}, {current_response.text}")
-
-        current_data = current_response.json()
-        current_weather = (
-            f"{current_data['weather'][0]['main']} ({current_data['weather'][0]['description']}), "
-            f"Temp: {current_data['main']['temp']}°C, Humidity: {current_data['main']['humidity']}% "
-        )
-        # Combine and write to JSON file
-        weather_result = {
-            "id": -1,
-            "location": location,
-            "current_weather": current_weather
-        }
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                INSERT INTO locations(locations, {", ".join(WEATHER_COLUMNS)})
+                VALUES (?, {", ".join("?" * len(WEATHER_COLUMNS))})
+            """, (weather_result["location"], *_weather_values(current_data, fetched_at)))
+            weather_result["id"] = cursor.lastrowid
+            insert_observations(cursor, list(filter(None, [
+                observation_row(weather_result["id"], current_data, fetched_at)])))
+            conn.commit()
 
-        try:
-            with get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO locations(locations, weather)
-                    VALUES (?, ?)
-                """, (weather_result["location"], weather_result["current_weather"]))
-                conn.commit()
-                
-                cursor = conn.cursor()
-                cursor.execute("SELECT id FROM locations WHERE locations = '{location}';")
-                tmp = cursor.fetchone()
-                weather_result["id"]=tmp[0]
-                
-                logger.info("Location successfully added to the database: %s", location)
-                
-        except sqlite3.IntegrityError:
-            logger.error("Duplicate location name: %s", location)
-            raise ValueError(f"Location with name '{location}' already exists")
-
-        except sqlite3.Error as e:
-            logger.error("Database error: %s", str(e))
-            raise e
-
-        with open("weather_data.json", "w") as json_file:
-            json.dump(weather_result, json_file, indent=4)
-
-        print("Weather data successfully written to 'weather_data.json'")
+            logger.info("Location successfully added to the database: %s", location)
 
-    except Exception as e:
-        print(f"An error occurred while fetching weather data: {e}")
-        raise
+    except sqlite3.IntegrityError:
+        logger.error("Duplicate location name: %s", location)
+        raise ValueError(f"Location with name '{location}' already exists")
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
 
+    # Opt-in export (WEATHER_EXPORT_PATH), written by a background thread
+    export_weather(dict(weather_result, fetched_at=fetched_at))
     return weather_result
 
+def _chunks(items: list, size: int = SQL_PARAM_CHUNK):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def create_locations_bulk(locations: list) -> list[dict]:
+    """
+    Creates many locations at once.
+
+    Weather for every new location is fetched concurrently on a bounded worker
+    pool, then all successful rows are inserted in a single transaction.
+    Failures are reported per item and do not abort the rest of the batch.
+
+    Args:
+        locations (list): Names of the locations to create.
+
+    Returns:
+        list[dict]: One result per input item, in input order. Successful items
+        have status "created" with id and current_weather; failed items have
+        status "error" with an error message.
+
+    Raises:
+        ValueError: If locations is not a list or exceeds BULK_MAX_LOCATIONS.
+        sqlite3.Error: If the batch insert fails.
+    """
+    results, pending = prepare_bulk_locations(locations)
+    names = list(pending)
+    logger.info("Fetching weather for %d locations with %d workers", len(names), BULK_FETCH_WORKERS)
+
+    def fetch(name: str):
+        try:
+            return get_current_weather(name), None
+        except Exception as e:
+            return None, e
+
+    fetched: dict[str, tuple] = {}
+    if names:
+        with ThreadPoolExecutor(max_workers=min(BULK_FETCH_WORKERS, len(names))) as executor:
+            for name, (current_data, error) in zip(names, executor.map(fetch, names)):
+                fetched[name] = (current_data, time.time(), error)
+
+    store_bulk_locations(pending, fetched)
+    return results
+
+def prepare_bulk_locations(locations: list) -> tuple[list[dict], dict[str, dict]]:
+    """
+    Validates a bulk request and drops the names that already exist.
+
+    Args:
+        locations (list): Names of the locations to create.
+
+    Returns:
+        tuple: The per-item results, in input order, and the results of the
+        names still to be fetched and inserted, keyed by name. Rejected items
+        already have status "error".
+
+    Raises:
+        ValueError: If locations is not a list or exceeds BULK_MAX_LOCATIONS.
+        sqlite3.Error: If the existing names cannot be looked up.
+    """
+    if not isinstance(locations, list):
+        raise ValueError("Invalid locations: expected a list of location names.")
+    if len(locations) > BULK_MAX_LOCATIONS:
+        raise ValueError(f"Too many locations: {len(locations)}. At most {BULK_MAX_LOCATIONS} are allowed per request.")
+
+    results: list[dict] = []
+    pending: dict[str, dict] = {}
+    for location in locations:
+        result = {"location": location}
+        results.append(result)
+        if not isinstance(location, str) or not location.strip():
+            result.update(status="error", error=f"Invalid location: {location}. Location must be a non-empty string.")
+        elif location in pending:
+            result.update(status="error", error=f"Duplicate location in request: '{location}'")
+        else:
+            pending[location] = result
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            for chunk in _chunks(list(pending)):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"SELECT locations FROM locations WHERE locations IN ({placeholders})", chunk)
+                for (existing,) in cursor.fetchall():
+                    pending.pop(existing).update(status="error", error=f"Location with name '{existing}' already exists")
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+    return results, pending
+
+def store_bulk_locations(pending: dict[str, dict], fetched: dict[str, tuple]) -> None:
+    """
+    Inserts the fetched locations of a bulk request in one transaction and fills in their results.
+
+    Args:
+        pending (dict): Results still to be completed, keyed by name, from prepare_bulk_locations().
+        fetched (dict): (weather response, fetched_at, error) per name; failed
+            fetches have no response and the exception as error.
+
+    Raises:
+        sqlite3.Error: If the batch insert fails.
+    """
+    rows = []
+    weather: dict[str, tuple[dict, float]] = {}
+    for name, (current_data, fetched_at, error) in fetched.items():
+        if error is not None:
+            logger.error("Failed to fetch weather for %s: %s", name, error)
+            pending.pop(name).update(status="error", error=str(error))
+        else:
+            weather[name] = (current_data, fetched_at)
+            values = _weather_values(current_data, fetched_at)
+            pending[name]["current_weather"] = values[0]
+            rows.append((name, *values))
+
+    if not rows:
+        return
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            observations = []
+            created = 0
+            # Row by row, so a name another writer inserted since prepare_bulk_locations() is not claimed as ours
+            for row in rows:
+                name = row[0]
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO locations(locations, {", ".join(WEATHER_COLUMNS)})
+                    VALUES (?, {", ".join("?" * len(WEATHER_COLUMNS))})
+                """, row)
+                if cursor.rowcount != 1:
+                    pending[name].pop("current_weather")
+                    pending[name].update(status="error", error=f"Location with name '{name}' already exists")
+                    continue
+                created += 1
+                pending[name].update(status="created", id=cursor.lastrowid)
+                observations.append(observation_row(cursor.lastrowid, *weather[name]))
+            insert_observations(cursor, list(filter(None, observations)))
+            conn.commit()
+
+            for name, (_, fetched_at) in weather.items():
+                if pending[name]["status"] == "created":
+                    export_weather(dict(pending[name], fetched_at=fetched_at))
+
+            logger.info("Bulk inserted %d of %d locations", created, len(rows))
+
+    except sqlite3.Error as e:
+        logger.error("Database error during bulk insert: %s", str(e))
+        raise e
+
+def _iter_location_rows(after_id: int, limit: Optional[int], fields: list[str]) -> Iterator[tuple[int, dict]]:
+    query = f"""
+        SELECT id, {", ".join(LOCATION_FIELDS[field] for field in fields)}
+        FROM locations
+        WHERE deleted = FALSE AND id > ?
+        ORDER BY id
+        LIMIT ?
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (after_id, -1 if limit is None else limit))
+            for row in iter_rows(cursor):
+                yield row[0], dict(zip(fields, row[1:]))
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def iter_locations(cursor: Optional[str] = None, limit: Optional[int] = None,
+                   fields: Optional[list[str]] = None) -> Iterator[dict]:
+    """
+    Yields live locations in id order, one at a time, straight from the database cursor.
+
+    Rows are fetched in small batches, so memory use does not grow with the
+    number of locations.
+
+    Args:
+        cursor (str): Continue after the location this cursor points at, from list_locations().
+        limit (int): Maximum number of locations; None yields every remaining location.
+        fields (list[str]): Fields of LOCATION_FIELDS to include; None includes all.
+
+    Yields:
+        dict: A location with the requested fields.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    after_id = decode_cursor(cursor, 1)[0] if cursor else 0
+    for _, item in _iter_location_rows(after_id, limit, fields or list(LOCATION_FIELDS)):
+        yield item
+
+def list_locations(cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE, fields: Optional[list[str]] = None) -> dict:
+    """
+    Returns one page of live locations in id order using keyset pagination.
+
+    Each page continues from the id of the last location of the previous one
+    on the (deleted, id) index, so deep pages cost the same as the first.
+
+    Args:
+        cursor (str): next_cursor of the previous page; None starts at the beginning.
+        limit (int): Page size.
+        fields (list[str]): Fields of LOCATION_FIELDS to include; None includes all.
+
+    Returns:
+        dict: items, and next_cursor (None on the last page).
+
+    Raises:
+        ValueError: If the cursor or limit is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    check_page_size(limit)
+    after_id = decode_cursor(cursor, 1)[0] if cursor else 0
+    rows = list(_iter_location_rows(after_id, limit + 1, fields or list(LOCATION_FIELDS)))
+    next_cursor = encode_cursor([rows[limit - 1][0]]) if len(rows) > limit else None
+    return {'items': [item for _, item in rows[:limit]], 'next_cursor': next_cursor}
+
+def get_locations_due_for_refresh(updated_before: float, limit: int, priority_ids: list = ()) -> list[tuple[int, str]]:
+    """
+    Selects live locations whose weather was last fetched before a cutoff.
+
+    Due locations among priority_ids come first, in the order given, followed
+    by the remaining due locations with the stalest weather first.
+
+    Args:
+        updated_before (float): Unix time; locations fetched before this are due.
+        limit (int): Maximum number of locations returned.
+        priority_ids (list): Location IDs to return first if they are due.
+
+    Returns:
+        list[tuple[int, str]]: (id, location name) pairs.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    due: dict[int, str] = {}
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            priority_ids = list(priority_ids)[:limit]
+            for chunk in _chunks(priority_ids):
+                placeholders = ",".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT id, locations FROM locations
+                    WHERE id IN ({placeholders}) AND deleted = FALSE AND weather_updated_at < ?
+                """, (*chunk, updated_before))
+                found = dict(cursor.fetchall())
+                due.update((location_id, found[location_id]) for location_id in chunk if location_id in found)
+
+            cursor.execute("""
+                SELECT id, locations FROM locations
+                WHERE deleted = FALSE AND weather_updated_at < ?
+                ORDER BY weather_updated_at
+                LIMIT ?
+            """, (updated_before, limit))
+            for location_id, name in cursor.fetchall():
+                if len(due) >= limit:
+                    break
+                due.setdefault(location_id, name)
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+    return list(due.items())
+
+def get_oldest_weather_update() -> Optional[float]:
+    """
+    Gets when the stalest stored weather of any live location was written.
+
+    Answered from the (deleted, weather_updated_at) index without touching
+    the table, so it is cheap enough for health probes.
+
+    Returns:
+        float or None: Unix time of the oldest weather write, or None if there are no live locations.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(weather_updated_at) FROM locations WHERE deleted = FALSE")
+            return cursor.fetchone()[0]
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def update_weather_batch(rows: list[tuple[int, dict, float]]) -> int:
+    """
+    Writes refreshed weather for many locations in one transaction.
+
+    Each observation is also appended to the weather history. Locations
+    deleted since they were selected are left untouched.
+
+    Args:
+        rows (list[tuple[int, dict, float]]): (id, decoded API response, fetched at unix time) triples.
+
+    Returns:
+        int: The number of locations updated.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    if not rows:
+        return 0
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(f"""
+                UPDATE locations SET {", ".join(f"{column} = ?" for column in WEATHER_COLUMNS)}
+                WHERE id = ? AND deleted = FALSE
+            """, [(*_weather_values(current_data, fetched_at), location_id)
+                  for location_id, current_data, fetched_at in rows])
+            updated = cursor.rowcount
+            insert_observations(cursor, list(filter(None, (observation_row(*row) for row in rows))))
+            conn.commit()
+            return updated
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+def search_locations_by_weather(min_temp: Optional[float] = None, max_temp: Optional[float] = None,
+                                min_humidity: Optional[float] = None, max_humidity: Optional[float] = None,
+                                condition: Optional[str] = None, sort_by: str = "temp",
+                                descending: bool = False, limit: int = 100) -> list[dict]:
+    """
+    Finds live locations by their stored weather, e.g. every location warmer than 30°C.
+
+    Range filters and sorting run in SQLite on the indexed weather columns.
+    Locations without structured weather yet never match a range filter.
+
+    Args:
+        min_temp (float): Lowest temperature in °C, inclusive.
+        max_temp (float): Highest temperature in °C, inclusive.
+        min_humidity (float): Lowest humidity in %, inclusive.
+        max_humidity (float): Highest humidity in %, inclusive.
+        condition (str): Weather condition, e.g. "Rain" (case-insensitive).
+        sort_by (str): One of WEATHER_SORT_COLUMNS.
+        descending (bool): Whether to sort from highest to lowest.
+        limit (int): Maximum number of locations returned.
+
+    Returns:
+        list[dict]: id, location and the typed weather fields of each match.
+
+    Raises:
+        ValueError: If sort_by or limit is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    if sort_by not in WEATHER_SORT_COLUMNS:
+        raise ValueError(f"Invalid sort_by: {sort_by}. Expected one of {', '.join(WEATHER_SORT_COLUMNS)}.")
+    if not 1 <= limit <= WEATHER_SEARCH_MAX_LIMIT:
+        raise ValueError(f"Invalid limit: {limit}. Limit must be between 1 and {WEATHER_SEARCH_MAX_LIMIT}.")
+
+    clauses = ["deleted = FALSE"]
+    params: list = []
+    for column, operator, value in (("temp", ">=", min_temp), ("temp", "<=", max_temp),
+                                    ("humidity", ">=", min_humidity), ("humidity", "<=", max_humidity)):
+        if value is not None:
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+    if condition is not None:
+        clauses.append("weather_condition = ? COLLATE NOCASE")
+        params.append(condition)
+    # NULLs sort first in SQLite; keep locations without data out of sorted results
+    clauses.append(f"{sort_by} IS NOT NULL")
+
+    # Breaking ties by id in the same direction lets the (deleted, column) index serve the whole ORDER BY
+    direction = "DESC" if descending else "ASC"
+    query = f"""
+        SELECT id, locations, weather_condition, weather_description, temp, humidity,
+               pressure, wind_speed, observed_at, weather_updated_at
+        FROM locations
+        WHERE {" AND ".join(clauses)}
+        ORDER BY {sort_by} {direction}, id {direction}
+        LIMIT ?
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (*params, limit))
+            return [
+                {
+                    'id': row[0],
+                    'location': row[1],
+                    'weather_condition': row[2],
+                    'weather_description': row[3],
+                    'temp': row[4],
+                    'humidity': row[5],
+                    'pressure': row[6],
+                    'wind_speed': row[7],
+                    'observed_at': row[8],
+                    'weather_updated_at': row[9],
+                }
+                for row in cursor.fetchall()
+            ]
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
 def delete_location(location_id: int) -> None:
     """
     Deletes a location using the location_id
@@ -130,17 +710,15 @@ def delete_location(location_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT deleted FROM locations WHERE id = ?", (location_id,))
-            try:
-                deleted = cursor.fetchone()[0]
-                if deleted:
-                    logger.info("Location with ID %s has already been deleted", location_id)
-                    raise ValueError(f"Location with ID {location_id} has been deleted")
-            except TypeError:
-                logger.info("Location with ID %s not found", location_id)
-                raise ValueError(f"Location with ID {location_id} not found")
-
-            cursor.execute("UPDATE location SET deleted = TRUE WHERE id = ?", (location_id,))
+            cursor.execute("UPDATE locations SET deleted = TRUE WHERE id = ? AND deleted = FALSE", (location_id,))
+            if cursor.rowcount == 0:
+                # Slow path: the conditional update matched nothing, find out why
+                cursor.execute("SELECT deleted FROM locations WHERE id = ?", (location_id,))
+                if cursor.fetchone() is None:
+                    logger.info("Location with ID %s not found", location_id)
+                    raise ValueError(f"Location with ID {location_id} not found")
+                logger.info("Location with ID %s has already been deleted", location_id)
+                raise ValueError(f"Location with ID {location_id} has been deleted")
             conn.commit()
 
             logger.info("Location with ID %s marked as deleted.", location_id)
@@ -151,17 +729,22 @@ def delete_location(location_id: int) -> None:
 
 def clear_locations() -> None:
     """
-    Recreates the locations table, effectively deleting all locations.
+    Deletes every location and its weather history, and restarts location ids.
+
+    Rows are deleted instead of recreating the table, so the columns added by
+    the migrations in sql/migrations are kept.
 
     Raises:
         sqlite3.Error: If any database error occurs.
     """
     try:
-        with open(os.getenv("SQL_CREATE_TABLE_PATH", "/app/sql/create_location_table.sql"), "r") as fh:
-            create_table_script = fh.read()
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.executescript(create_table_script)
+            cursor.execute("DELETE FROM locations")
+            # History refers to location ids, which restart below
+            for table, _ in RESOLUTIONS.values():
+                cursor.execute(f"DELETE FROM {table}")
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'locations'")
             conn.commit()
 
             logger.info("Location cleared successfully.")
@@ -186,13 +769,14 @@ def get_weather_for_location(location_id:int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, locations, weather, deleted FROM location WHERE id = ?", (location_id,))
+            cursor.execute("SELECT id, locations, weather, deleted FROM locations WHERE id = ?", (location_id,))
             row = cursor.fetchone()
 
             if row:
                 if row[3]:
                     logger.info("Location with ID %s has been deleted", location_id)
                     raise ValueError(f"Location with ID {location_id} has been deleted")
+                recent_reads.touch(location_id)
                 return row[2]
             else:
                 logger.info("Location with ID %s not found", location_id)
@@ -202,6 +786,43 @@ def get_weather_for_location(location_id:int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
     
+def get_location_updated_at(location_id: int, touch: bool = False) -> float:
+    """
+    Gets when a location's stored weather was last written, for use as its version.
+
+    A primary key lookup of one column, so conditional requests can be
+    answered without reading the rest of the row.
+
+    Args:
+        location_id (int): The ID of the location.
+        touch (bool): Record the lookup as a read of the location's weather, for refresh priority.
+
+    Returns:
+        float: Unix time of the last weather write, or 0 if never recorded.
+
+    Raises:
+        ValueError: If the location is not found or has been deleted.
+        sqlite3.Error: If any database error occurs.
+    """
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT deleted, weather_updated_at FROM locations WHERE id = ?", (location_id,))
+            row = cursor.fetchone()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    if not row:
+        logger.info("Location with ID %s not found", location_id)
+        raise ValueError(f"Location with ID {location_id} not found")
+    if row[0]:
+        logger.info("Location with ID %s has been deleted", location_id)
+        raise ValueError(f"Location with ID {location_id} has been deleted")
+    if touch:
+        recent_reads.touch(location_id)
+    return row[1]
+
 def get_location_by_id(location_id: int) -> None:
     """
     Gets a location by its id
@@ -219,7 +840,7 @@ def get_location_by_id(location_id: int) -> None:
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT id, locations, weather, deleted FROM location WHERE id = ?", (location_id,))
+            cursor.execute("SELECT id, locations, weather, deleted FROM locations WHERE id = ?", (location_id,))
             row = cursor.fetchone()
 
             if row:
@@ -1,4 +1,3 @@
-import hashlib
 import logging
 import os
 
@@ -6,6 +5,7 @@ from sqlalchemy.exc import IntegrityError
 
 from meal_max.db import db
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.password_hashing import PASSWORD_VERIFY_TIMEOUT, get_hasher, verification_pool
 
 
 logger = logging.getLogger(__name__)
@@ -20,21 +20,21 @@ class Users(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     salt = db.Column(db.String(32), nullable=False)  # 16-byte salt in hex
-    password = db.Column(db.String(64), nullable=False)  # SHA-256 hash in hex
+    password = db.Column(db.String(255), nullable=False)  # versioned hash, e.g. scrypt$n$r$p$salt$hash
 
     @classmethod
     def _generate_hashed_password(cls, password: str) -> tuple[str, str]:
         """
-        Generates a salted, hashed password.
+        Generates a salted, hashed password with the configured hasher.
 
         Args:
             password (str): The password to hash.
 
         Returns:
-            tuple: A tuple containing the salt and hashed password.
+            tuple: A tuple containing the salt and the encoded hashed password.
         """
         salt = os.urandom(16).hex()
-        hashed_password = hashlib.sha256((password + salt).encode()).hexdigest()
+        hashed_password = get_hasher().hash(password, salt)
         return salt, hashed_password
 
     @classmethod
@@ -69,6 +69,11 @@ class Users(db.Model):
         """
         Check if a given password matches the stored password for a user.
 
+        Verification runs on the bounded password verification pool and is
+        abandoned after PASSWORD_VERIFY_TIMEOUT seconds. After a
+        successful check, a hash made with an older algorithm or cost is
+        replaced with one from the current hasher.
+
         Args:
             username (str): The username of the user.
             password (str): The password to check.
@@ -78,13 +83,21 @@ class Users(db.Model):
 
         Raises:
             ValueError: If the user does not exist.
+            VerificationQueueFull: If the verification queue is full.
+            concurrent.futures.TimeoutError: If the verification did not finish in time.
         """
         user = cls.query.filter_by(username=username).first()
         if not user:
             logger.info("User %s not found", username)
             raise ValueError(f"User {username} not found")
-        hashed_password = hashlib.sha256((password + user.salt).encode()).hexdigest()
-        return hashed_password == user.password
+        if not verification_pool.verify(password, user.password, user.salt, timeout=PASSWORD_VERIFY_TIMEOUT):
+            return False
+
+        if get_hasher().needs_rehash(user.password):
+            user.salt, user.password = cls._generate_hashed_password(password)
+            db.session.commit()
+            logger.info("Upgraded password hash for user: %s", username)
+        return True
 
     @classmethod
     def delete_user(cls, username: str) -> None:
@@ -0,0 +1,239 @@
+import logging
+import math
+import os
+import sqlite3
+import time
+from typing import Optional
+
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.sql_utils import get_db_connection
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Seconds each table keeps rows for; 0 keeps them forever
+WEATHER_HISTORY_RAW_RETENTION = int(os.getenv("WEATHER_HISTORY_RAW_RETENTION", str(7 * 86400)))
+WEATHER_HISTORY_HOURLY_RETENTION = int(os.getenv("WEATHER_HISTORY_HOURLY_RETENTION", str(90 * 86400)))
+WEATHER_HISTORY_DAILY_RETENTION = int(os.getenv("WEATHER_HISTORY_DAILY_RETENTION", "0"))
+# Locations pruned per transaction, so each write lock is held briefly
+WEATHER_HISTORY_PRUNE_BATCH = int(os.getenv("WEATHER_HISTORY_PRUNE_BATCH", "100"))
+# Seconds between retention runs by the background refresher
+WEATHER_HISTORY_PRUNE_INTERVAL = float(os.getenv("WEATHER_HISTORY_PRUNE_INTERVAL", "3600"))
+WEATHER_HISTORY_MAX_POINTS = int(os.getenv("WEATHER_HISTORY_MAX_POINTS", "500"))
+
+# Resolution name to (table, bucket width in seconds)
+RESOLUTIONS = {
+    "raw": ("weather_observations", 1),
+    "hour": ("weather_hourly", 3600),
+    "day": ("weather_daily", 86400),
+}
+
+ROLLUP_UPSERT = """
+    INSERT INTO {table} (location_id, bucket, samples, temp_sum, temp_min, temp_max, humidity_sum)
+    VALUES (?, ?, 1, ?, ?, ?, ?)
+    ON CONFLICT(location_id, bucket) DO UPDATE SET
+        samples = samples + 1,
+        temp_sum = temp_sum + excluded.temp_sum,
+        temp_min = MIN(temp_min, excluded.temp_min),
+        temp_max = MAX(temp_max, excluded.temp_max),
+        humidity_sum = humidity_sum + excluded.humidity_sum
+"""
+
+
+def observation_row(location_id: int, current_data: dict, fetched_at: float) -> Optional[tuple]:
+    """
+    Builds a weather_observations row from an OpenWeatherMap response.
+
+    Args:
+        location_id (int): The location the observation belongs to.
+        current_data (dict): The decoded API response.
+        fetched_at (float): Unix time of the fetch, used if the response has no observation time.
+
+    Returns:
+        tuple or None: (location_id, ts, temp, humidity, pressure, wind_speed, condition_code),
+        or None if the response has no temperature or humidity.
+    """
+    main = current_data.get('main', {})
+    if main.get('temp') is None or main.get('humidity') is None:
+        return None
+    conditions = current_data.get('weather') or [{}]
+    return (
+        location_id,
+        int(current_data.get('dt') or fetched_at),
+        main['temp'],
+        main['humidity'],
+        main.get('pressure'),
+        current_data.get('wind', {}).get('speed'),
+        conditions[0].get('id'),
+    )
+
+def insert_observations(cursor: sqlite3.Cursor, rows: list[tuple]) -> int:
+    """
+    Appends observations and folds them into the hourly and daily roll-ups.
+
+    Runs on the caller's cursor so history is written in the caller's
+    transaction. An observation already stored for the same location and
+    timestamp (the upstream often serves the same reading for several
+    minutes) is skipped and not counted twice in the roll-ups.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the caller's connection.
+        rows (list[tuple]): Rows built by observation_row().
+
+    Returns:
+        int: The number of new observations stored.
+    """
+    rollups = []
+    for row in rows:
+        cursor.execute("""
+            INSERT OR IGNORE INTO weather_observations
+                (location_id, ts, temp, humidity, pressure, wind_speed, condition_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, row)
+        if cursor.rowcount:
+            location_id, ts, temp, humidity = row[:4]
+            rollups.append((location_id, ts, temp, humidity))
+
+    for table, width in (("weather_hourly", 3600), ("weather_daily", 86400)):
+        cursor.executemany(ROLLUP_UPSERT.format(table=table), [
+            (location_id, ts - ts % width, temp, temp, temp, humidity)
+            for location_id, ts, temp, humidity in rollups
+        ])
+    return len(rollups)
+
+def prune_history(now: Optional[float] = None, batch_size: int = WEATHER_HISTORY_PRUNE_BATCH) -> dict:
+    """
+    Deletes history older than each table's retention period.
+
+    Rows are deleted location by location, ``batch_size`` locations per
+    transaction. Each delete is a range scan on the (location_id, ts) key, so
+    every transaction is short and readers and the refresher are never locked
+    out for long.
+
+    Args:
+        now (float): Current unix time, injectable for tests.
+        batch_size (int): Locations pruned per transaction.
+
+    Returns:
+        dict: Rows deleted per table.
+
+    Raises:
+        sqlite3.Error: If any database error occurs.
+    """
+    now = time.time() if now is None else now
+    policies = [
+        ("weather_observations", "ts", WEATHER_HISTORY_RAW_RETENTION),
+        ("weather_hourly", "bucket", WEATHER_HISTORY_HOURLY_RETENTION),
+        ("weather_daily", "bucket", WEATHER_HISTORY_DAILY_RETENTION),
+    ]
+    policies = [(table, column, int(now - retention)) for table, column, retention in policies if retention > 0]
+    deleted = {table: 0 for table, _, _ in policies}
+    if not policies:
+        return deleted
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Deleted locations keep their ids, so locations lists every id history may refer to
+            cursor.execute("SELECT id FROM locations ORDER BY id")
+            location_ids = [row[0] for row in cursor.fetchall()]
+            for start in range(0, len(location_ids), batch_size):
+                for location_id in location_ids[start:start + batch_size]:
+                    for table, column, cutoff in policies:
+                        cursor.execute(f"DELETE FROM {table} WHERE location_id = ? AND {column} < ?",
+                                       (location_id, cutoff))
+                        deleted[table] += cursor.rowcount
+                conn.commit()
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    logger.info("Pruned weather history: %s", deleted)
+    return deleted
+
+def _choose_resolution(start: int, end: int, max_points: int, now: float) -> str:
+    # The finest resolution that still holds data for the whole window and needs no more downsampling than the next one
+    step = (end - start) / max_points
+    if step < 3600 and (not WEATHER_HISTORY_RAW_RETENTION or start >= now - WEATHER_HISTORY_RAW_RETENTION):
+        return "raw"
+    if step < 86400 and (not WEATHER_HISTORY_HOURLY_RETENTION or start >= now - WEATHER_HISTORY_HOURLY_RETENTION):
+        return "hour"
+    return "day"
+
+def get_weather_history(location_id: int, start: int, end: int, resolution: str = "auto",
+                        max_points: int = WEATHER_HISTORY_MAX_POINTS) -> dict:
+    """
+    Returns a location's weather over a time window, downsampled to at most max_points points.
+
+    Points are read from the raw observations or the hourly or daily
+    roll-ups and merged into equal buckets in SQL, so the work done is bounded
+    by the rows in the window of the chosen table, never the whole history.
+
+    With hour or day resolution, start is rounded down to the start of its
+    hour or UTC day, so the first point covers that whole bucket.
+
+    Args:
+        location_id (int): The location.
+        start (int): Start of the window, unix time, inclusive.
+        end (int): End of the window, unix time, exclusive.
+        resolution (str): "raw", "hour", "day", or "auto" to pick the finest
+            one that is retained for the whole window.
+        max_points (int): Maximum number of points returned.
+
+    Returns:
+        dict: resolution and step (bucket width in seconds) used, and points,
+        each with ts (bucket start), samples, temp_avg, temp_min, temp_max and humidity_avg.
+
+    Raises:
+        ValueError: If the window, resolution or max_points is invalid.
+        sqlite3.Error: If any database error occurs.
+    """
+    if end <= start:
+        raise ValueError(f"Invalid window: start {start} must be before end {end}.")
+    if max_points < 1:
+        raise ValueError(f"Invalid max_points: {max_points}. Must be at least 1.")
+    if resolution == "auto":
+        resolution = _choose_resolution(start, end, max_points, time.time())
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Invalid resolution: {resolution}. Expected auto, {', '.join(RESOLUTIONS)}.")
+
+    table, width = RESOLUTIONS[resolution]
+    # A roll-up row is keyed by the start of its bucket, so the bucket holding start begins before it
+    start -= start % width
+    step = max(width, math.ceil((end - start) / max_points / width) * width)
+    if resolution == "raw":
+        column = "ts"
+        aggregates = "COUNT(*), AVG(temp), MIN(temp), MAX(temp), AVG(humidity)"
+    else:
+        column = "bucket"
+        aggregates = ("SUM(samples), SUM(temp_sum) / SUM(samples), MIN(temp_min), MAX(temp_max), "
+                      "1.0 * SUM(humidity_sum) / SUM(samples)")
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT {column} - ({column} - ?) % ? AS point, {aggregates}
+                FROM {table}
+                WHERE location_id = ? AND {column} >= ? AND {column} < ?
+                GROUP BY point
+                ORDER BY point
+            """, (start, step, location_id, start, end))
+            points = [
+                {
+                    'ts': row[0],
+                    'samples': row[1],
+                    'temp_avg': row[2],
+                    'temp_min': row[3],
+                    'temp_max': row[4],
+                    'humidity_avg': row[5],
+                }
+                for row in cursor.fetchall()
+            ]
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+    return {'location_id': location_id, 'resolution': resolution, 'step': step, 'points': points}
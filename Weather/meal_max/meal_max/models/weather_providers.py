@@ -0,0 +1,320 @@
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Iterable, Optional
+import zlib
+
+from meal_max.utils.async_http_client import get_async_http_client
+from meal_max.utils.http_client import RETRY_STATUSES, get_http_client
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.weather_cache import normalize_location
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# openweathermap (default) or fake, the offline provider for benchmarks and load tests
+WEATHER_PROVIDER = os.getenv("WEATHER_PROVIDER", "openweathermap")
+
+
+class WeatherProviderError(Exception):
+    """
+    A weather provider answered, but not with the weather.
+
+    ``unavailable`` tells whether the provider itself is failing (e.g. a 503),
+    as opposed to rejecting the request (e.g. a 404 for an unknown city).
+    """
+
+    def __init__(self, message: str, unavailable: bool = False):
+        super().__init__(message)
+        self.unavailable = unavailable
+
+
+class WeatherProvider(ABC):
+    """
+    Source of current weather observations.
+
+    ``fetch`` and ``afetch`` return the observation in the OpenWeatherMap
+    response format, which format_weather() and parse_weather() read:
+    ``weather[0].main/description``, ``main.temp/humidity/pressure``,
+    ``wind.speed`` and ``dt``.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        """
+        Fetches the current weather for a location.
+
+        Args:
+            location (str): Name of the location.
+            units (str): Unit system, e.g. metric.
+            deadline (float, optional): Seconds the call may take, retries included.
+
+        Returns:
+            dict: The observation.
+
+        Raises:
+            ValueError: If the provider is not configured.
+            WeatherProviderError: If the provider answered with an error.
+            Exception: If the provider could not be reached.
+        """
+
+    @abstractmethod
+    async def afetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        """
+        Fetches the current weather for a location without blocking the event loop. See ``fetch``.
+        """
+
+    def stats(self) -> Optional[dict]:
+        """
+        Returns provider specific counters, or None if it keeps none.
+        """
+        return None
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """
+    The OpenWeatherMap current weather API, called through the shared HTTP clients.
+    """
+
+    name = "openweathermap"
+
+    def __init__(self, url: str = "https://api.openweathermap.org/data/2.5/weather"):
+        """
+        Args:
+            url (str): The /data/2.5/weather endpoint.
+        """
+        self.url = url
+
+    def _params(self, location: str, units: str) -> dict:
+        # Read per call so the key can be supplied after import
+        api_key = os.getenv("api_key")
+        if not api_key:
+            raise ValueError("API key not found in environment variables.")
+        return {
+            "q": location,
+            "appid": api_key,
+            "units": units
+        }
+
+    def fetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        params = self._params(location, units)
+        logger.info("Fetching weather for %s from OpenWeatherMap", location)
+        current_response = get_http_client().get(self.url, params=params, deadline=deadline)
+        if current_response.status_code != 200:
+            raise WeatherProviderError(
+                f"Failed to fetch current weather: {current_response.status_code}, {current_response.text}",
+                unavailable=current_response.status_code in RETRY_STATUSES)
+        return current_response.json()
+
+    async def afetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        params = self._params(location, units)
+        logger.info("Fetching weather for %s from OpenWeatherMap", location)
+        current_response = await get_async_http_client().get(self.url, params=params, deadline=deadline)
+        if current_response.status != 200:
+            raise WeatherProviderError(
+                f"Failed to fetch current weather: {current_response.status}, {await current_response.text()}",
+                unavailable=current_response.status in RETRY_STATUSES)
+        return await current_response.json(content_type=None)
+
+
+class FakeWeatherProvider(WeatherProvider):
+    """
+    Offline provider with deterministic weather and injectable latency and errors.
+
+    The weather of a location is derived from a hash of its normalized name,
+    so every run and every process returns the same values. Each call waits
+    ``latency_ms`` plus up to ``jitter_ms``, then fails with a 503-style
+    error with probability ``error_rate``. Locations in ``unknown_locations``
+    fail like a 404. Jitter and errors come from a generator seeded with
+    ``seed``, so a single-threaded run is reproducible. A call past its
+    deadline times out like the real API.
+    """
+
+    name = "fake"
+
+    def __init__(self,
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 error_rate: float = 0.0,
+                 unknown_locations: Iterable[str] = (),
+                 seed: int = 0):
+        """
+        Args:
+            latency_ms (float): Delay of every call.
+            jitter_ms (float): Maximum random delay added to latency_ms.
+            error_rate (float): Fraction of calls failing as unavailable, 0 to 1.
+            unknown_locations (Iterable[str]): Locations answered with "city not found".
+            seed (int): Seed of the jitter and error generator.
+
+        Raises:
+            ValueError: If a delay is negative or error_rate is outside 0 to 1.
+        """
+        if latency_ms < 0 or jitter_ms < 0:
+            raise ValueError(f"Invalid latency: {latency_ms} ms + {jitter_ms} ms jitter. Must be >= 0.")
+        if not 0 <= error_rate <= 1:
+            raise ValueError(f"Invalid error_rate: {error_rate}. Must be between 0 and 1.")
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.unknown_locations = {normalize_location(location) for location in unknown_locations}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def observation(self, location: str, units: str = "metric") -> dict:
+        """
+        Returns the weather the fake reports for a location.
+
+        Args:
+            location (str): Name of the location.
+            units (str): metric for °C and m/s, imperial for °F and mph, anything else for K and m/s.
+
+        Returns:
+            dict: The observation, in the OpenWeatherMap response format.
+        """
+        seed = zlib.crc32(normalize_location(location).encode())
+        celsius = round(-10 + seed % 450 / 10, 1)
+        wind = round(seed % 150 / 10, 1)
+        if units == "imperial":
+            temp, wind = round(celsius * 9 / 5 + 32, 1), round(wind * 2.237, 1)
+        elif units == "metric":
+            temp = celsius
+        else:
+            temp = round(celsius + 273.15, 2)
+        conditions = (("Clear", "clear sky"), ("Clouds", "few clouds"), ("Rain", "light rain"),
+                      ("Snow", "light snow"), ("Mist", "mist"))
+        condition, description = conditions[seed % len(conditions)]
+        return {
+            'name': location,
+            'weather': [{'main': condition, 'description': description}],
+            'main': {'temp': temp, 'humidity': seed % 101, 'pressure': 980 + seed % 60},
+            'wind': {'speed': wind},
+            'dt': int(time.time()),
+        }
+
+    def _start(self, deadline: Optional[float]) -> tuple[float, str]:
+        # Draws this call's delay and outcome (ok, unavailable or timeout) and counts it in flight
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            outcome = "unavailable" if self.error_rate and self._random.random() < self.error_rate else "ok"
+        if deadline is not None and delay > deadline:
+            return deadline, "timeout"
+        return delay, outcome
+
+    def _end(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _result(self, location: str, units: str, outcome: str) -> dict:
+        if outcome == "ok" and normalize_location(location) in self.unknown_locations:
+            outcome = "unknown"
+        if outcome != "ok":
+            with self._lock:
+                self.errors += 1
+        if outcome == "timeout":
+            raise TimeoutError(f"Fake weather for {location} exceeded its deadline")
+        if outcome == "unavailable":
+            raise WeatherProviderError("Failed to fetch current weather: 503, injected failure", unavailable=True)
+        if outcome == "unknown":
+            raise WeatherProviderError("Failed to fetch current weather: 404, city not found")
+        return self.observation(location, units)
+
+    def fetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        delay, outcome = self._start(deadline)
+        try:
+            if delay:
+                time.sleep(delay)
+        finally:
+            self._end()
+        return self._result(location, units, outcome)
+
+    async def afetch(self, location: str, units: str, deadline: Optional[float] = None) -> dict:
+        delay, outcome = self._start(deadline)
+        try:
+            if delay:
+                await asyncio.sleep(delay)
+        finally:
+            self._end()
+        return self._result(location, units, outcome)
+
+    def stats(self) -> dict:
+        """
+        Returns the fake's counters.
+
+        Returns:
+            dict: requests, errors (injected, timed out or unknown location), in_flight and peak_in_flight.
+        """
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors,
+                    'in_flight': self.in_flight, 'peak_in_flight': self.peak_in_flight}
+
+
+def create_weather_provider(name: str) -> WeatherProvider:
+    """
+    Builds a provider by name, configured from the environment.
+
+    Args:
+        name (str): openweathermap or fake.
+
+    Returns:
+        WeatherProvider: The provider.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    if name == "openweathermap":
+        return OpenWeatherMapProvider(os.getenv("WEATHER_API_URL", "https://api.openweathermap.org/data/2.5/weather"))
+    if name == "fake":
+        return FakeWeatherProvider(
+            latency_ms=float(os.getenv("FAKE_WEATHER_LATENCY_MS", "0")),
+            jitter_ms=float(os.getenv("FAKE_WEATHER_JITTER_MS", "0")),
+            error_rate=float(os.getenv("FAKE_WEATHER_ERROR_RATE", "0")),
+            unknown_locations=filter(None, os.getenv("FAKE_WEATHER_UNKNOWN_LOCATIONS", "").split(",")),
+            seed=int(os.getenv("FAKE_WEATHER_SEED", "0")),
+        )
+    raise ValueError(f"Invalid weather provider: {name}. Must be openweathermap or fake.")
+
+
+_provider: Optional[WeatherProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_weather_provider() -> WeatherProvider:
+    """
+    Returns the weather provider of this process, chosen by WEATHER_PROVIDER on first use.
+
+    Returns:
+        WeatherProvider: The shared provider.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = create_weather_provider(WEATHER_PROVIDER)
+                logger.info("Using the %s weather provider", _provider.name)
+    return _provider
+
+def set_weather_provider(provider: Optional[WeatherProvider]) -> None:
+    """
+    Replaces the shared provider, e.g. with a FakeWeatherProvider in tests. None restores the configured one.
+
+    Args:
+        provider (WeatherProvider, optional): The provider to use.
+    """
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,230 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from meal_max.models import location_model, weather_history
+from meal_max.utils.logger import configure_logger
+from meal_max.utils.scheduling import TokenBucket
+from meal_max.utils.weather_cache import normalize_location
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+WEATHER_REFRESH_ENABLED = os.getenv("WEATHER_REFRESH_ENABLED", "true").lower() == "true"
+# Weather older than this many seconds is refetched
+WEATHER_REFRESH_INTERVAL = float(os.getenv("WEATHER_REFRESH_INTERVAL", "600"))
+# Seconds between refresh cycles
+WEATHER_REFRESH_CHECK_INTERVAL = float(os.getenv("WEATHER_REFRESH_CHECK_INTERVAL", "30"))
+WEATHER_REFRESH_CONCURRENCY = int(os.getenv("WEATHER_REFRESH_CONCURRENCY", "8"))
+# Upstream calls per second and burst size; the OpenWeatherMap free plan allows 60 calls a minute
+WEATHER_REFRESH_RATE = float(os.getenv("WEATHER_REFRESH_RATE", "1"))
+WEATHER_REFRESH_BURST = float(os.getenv("WEATHER_REFRESH_BURST", "10"))
+WEATHER_REFRESH_BATCH_SIZE = int(os.getenv("WEATHER_REFRESH_BATCH_SIZE", "50"))
+# Locations considered per cycle, so recent reads are re-prioritized often
+WEATHER_REFRESH_CYCLE_LIMIT = int(os.getenv("WEATHER_REFRESH_CYCLE_LIMIT", "100"))
+# Locations read within this many seconds are refreshed first
+WEATHER_REFRESH_HOT_WINDOW = float(os.getenv("WEATHER_REFRESH_HOT_WINDOW", "3600"))
+
+
+class WeatherRefresher:
+    """
+    Background refresher for the weather stored with each location.
+
+    Every ``check_interval`` seconds a cycle selects up to ``cycle_limit`` live
+    locations whose weather is older than ``interval``, recently read ones
+    first, and refetches them on ``concurrency`` worker threads. Upstream calls
+    are paced by a token bucket, and results are written back ``batch_size``
+    rows per transaction. Request handlers only ever read the stored weather,
+    so they never wait on the weather API. The same thread prunes the weather
+    history every ``prune_interval`` seconds.
+    """
+
+    def __init__(self, interval: float = 600.0, check_interval: float = 30.0, concurrency: int = 8,
+                 rate: float = 1.0, burst: float = 10.0, batch_size: int = 50, cycle_limit: int = 100,
+                 hot_window: float = 3600.0, prune_interval: float = 3600.0):
+        """
+        Initializes the refresher. Nothing runs until start() or run_once() is called.
+
+        Args:
+            interval (float): Age in seconds after which weather is refetched.
+            check_interval (float): Seconds between cycles.
+            concurrency (int): Maximum concurrent upstream calls.
+            rate (float): Upstream calls per second.
+            burst (float): Upstream calls allowed back to back.
+            batch_size (int): Rows written per transaction.
+            cycle_limit (int): Maximum locations refreshed per cycle.
+            hot_window (float): Seconds a read keeps a location prioritized.
+            prune_interval (float): Seconds between weather history retention runs; 0 disables pruning.
+
+        Raises:
+            ValueError: If concurrency, batch_size or cycle_limit is less than 1.
+        """
+        for name, value in (("concurrency", concurrency), ("batch_size", batch_size), ("cycle_limit", cycle_limit)):
+            if value < 1:
+                raise ValueError(f"Invalid {name}: {value}. Must be at least 1.")
+        self.interval = interval
+        self.check_interval = check_interval
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.cycle_limit = cycle_limit
+        self.hot_window = hot_window
+        self.prune_interval = prune_interval
+        self._next_prune = 0.0
+        self.rate_limiter = TokenBucket(rate, burst)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.last_cycle_at: Optional[float] = None
+        self.last_cycle_seconds = 0.0
+        self.last_error: Optional[str] = None
+
+    def _fetch(self, location_id: int, name: str) -> Optional[tuple[int, dict, float]]:
+        # Wait for quota in short slices so stop() is not held up by the rate limiter
+        while not self.rate_limiter.acquire(timeout=0.5):
+            if self._stop.is_set():
+                return None
+        data = location_model.fetch_current_weather(name)
+        # Keep the request-path cache warm with the same response
+        location_model.weather_cache.set((normalize_location(name), location_model.WEATHER_UNITS), data)
+        return location_id, data, time.time()
+
+    def run_once(self) -> dict:
+        """
+        Runs one refresh cycle.
+
+        Returns:
+            dict: due (locations selected), refreshed, failed and written counts for the cycle.
+
+        Raises:
+            sqlite3.Error: If selecting or writing locations fails.
+        """
+        start = time.monotonic()
+        hot = location_model.recent_reads.recent(self.hot_window)
+        due = location_model.get_locations_due_for_refresh(time.time() - self.interval, self.cycle_limit, hot)
+        refreshed = failed = written = 0
+        batch: list[tuple[int, dict, float]] = []
+
+        if due:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(due)),
+                                    thread_name_prefix="weather-refresh") as executor:
+                futures = {executor.submit(self._fetch, location_id, name): name for location_id, name in due}
+                for future in as_completed(futures):
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        failed += 1
+                        logger.warning("Failed to refresh weather for %s: %s", futures[future], e)
+                        continue
+                    if row is None:
+                        continue
+                    refreshed += 1
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        written += location_model.update_weather_batch(batch)
+                        batch = []
+            written += location_model.update_weather_batch(batch)
+
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self.cycles += 1
+            self.refreshed += refreshed
+            self.failed += failed
+            self.last_cycle_at = time.time()
+            self.last_cycle_seconds = elapsed
+        if due:
+            logger.info("Refreshed weather for %d of %d due locations in %.2fs", refreshed, len(due), elapsed)
+        return {'due': len(due), 'refreshed': refreshed, 'failed': failed, 'written': written}
+
+    def _prune_if_due(self) -> None:
+        if not self.prune_interval or time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + self.prune_interval
+        try:
+            weather_history.prune_history()
+        except Exception as e:
+            logger.error("Weather history pruning failed: %s", e)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                with self._lock:
+                    self.last_error = None
+            except Exception as e:
+                logger.error("Weather refresh cycle failed: %s", e)
+                with self._lock:
+                    self.last_error = str(e)
+            self._prune_if_due()
+            self._stop.wait(self.check_interval)
+
+    def start(self) -> None:
+        """
+        Starts the background thread if it is not already running.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="weather-refresher", daemon=True)
+            self._thread.start()
+        logger.info("Weather refresher started (interval %.0fs, %.1f calls/s, %d workers)",
+                    self.interval, self.rate_limiter.rate, self.concurrency)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stops the background thread after its current fetches finish.
+
+        Args:
+            timeout (float): Seconds to wait for the thread; None waits indefinitely.
+        """
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self) -> dict:
+        """
+        Returns the refresher metrics.
+
+        Returns:
+            dict: running flag, cycle/refreshed/failed counters, when the last
+            cycle finished (unix time) and how long it took, the last cycle
+            error, and the rate limiter metrics.
+        """
+        with self._lock:
+            return {
+                'running': self.running,
+                'cycles': self.cycles,
+                'refreshed': self.refreshed,
+                'failed': self.failed,
+                'last_cycle_at': self.last_cycle_at,
+                'last_cycle_seconds': self.last_cycle_seconds,
+                'last_error': self.last_error,
+                'rate_limiter': self.rate_limiter.stats(),
+            }
+
+
+weather_refresher = WeatherRefresher(
+    interval=WEATHER_REFRESH_INTERVAL,
+    check_interval=WEATHER_REFRESH_CHECK_INTERVAL,
+    concurrency=WEATHER_REFRESH_CONCURRENCY,
+    rate=WEATHER_REFRESH_RATE,
+    burst=WEATHER_REFRESH_BURST,
+    batch_size=WEATHER_REFRESH_BATCH_SIZE,
+    cycle_limit=WEATHER_REFRESH_CYCLE_LIMIT,
+    hot_window=WEATHER_REFRESH_HOT_WINDOW,
+    prune_interval=weather_history.WEATHER_HISTORY_PRUNE_INTERVAL,
+)
@@ -0,0 +1,64 @@
+from contextlib import contextmanager
+import sqlite3
+
+from flask import Flask
+import pytest
+
+from meal_max.db import db
+from meal_max.models import location_model
+from meal_max.models.weather_providers import FakeWeatherProvider, set_weather_provider
+from meal_max.utils.migrations import apply_migrations
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """A minimal Flask app bound to an in-memory SQLite database."""
+    # Keep hashing cheap in tests; the cost parameters are exercised separately
+    monkeypatch.setenv("PASSWORD_SCRYPT_N", "1024")
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///:memory:"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def session(app):
+    """The SQLAlchemy session of the test app."""
+    return db.session
+
+
+@pytest.fixture
+def sqlite_db(mocker, tmp_path):
+    """Back location_model and weather_history with a real SQLite database built like create_db.sh: schema script, then migrations."""
+    db_path = tmp_path / "locations.db"
+    with open("sql/create_location_table.sql") as fh:
+        schema = fh.read()
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(schema)
+    apply_migrations(str(db_path))
+
+    @contextmanager
+    def real_get_db_connection():
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    mocker.patch("meal_max.models.location_model.get_db_connection", real_get_db_connection)
+    mocker.patch("meal_max.models.weather_history.get_db_connection", real_get_db_connection)
+    return db_path
+
+
+@pytest.fixture
+def fake_weather():
+    """Serve weather from an offline FakeWeatherProvider that does not know Atlantis, with an empty weather cache."""
+    provider = FakeWeatherProvider(latency_ms=10, unknown_locations=["Atlantis"])
+    set_weather_provider(provider)
+    location_model.weather_cache.clear()
+    yield provider
+    set_weather_provider(None)
+    location_model.weather_cache.clear()
@@ -0,0 +1,90 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+import pytest
+
+from meal_max.utils.async_http_client import AsyncHttpClient
+
+
+async def serve(statuses: list, delay: float = 0.0):
+    """Starts a stub server answering with the given statuses, then 200; tracks peak concurrency."""
+    state = {'hits': 0, 'in_flight': 0, 'peak': 0}
+
+    async def handler(request):
+        state['hits'] += 1
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        await asyncio.sleep(delay)
+        state['in_flight'] -= 1
+        return web.json_response({'q': request.query.get('q')}, status=statuses.pop(0) if statuses else 200)
+
+    app = web.Application()
+    app.router.add_get("/weather", handler)
+    server = TestServer(app)
+    await server.start_server()
+    return server, state
+
+
+def test_retries_retryable_status():
+    """Test that a 503 is retried and the final response body is readable after release."""
+    async def main():
+        server, state = await serve([503])
+        client = AsyncHttpClient(max_retries=2, backoff_factor=0.001)
+        try:
+            response = await client.get(str(server.make_url("/weather")), params={'q': "Oslo"})
+            return response.status, await response.json(), state['hits'], client.latency_stats()
+        finally:
+            await client.aclose()
+            await server.close()
+
+    status, body, hits, latency = asyncio.run(main())
+    assert (status, body, hits) == (200, {'q': "Oslo"}, 2)
+    assert list(latency.values())[0]['count'] == 2
+
+
+def test_gives_up_after_max_retries():
+    """Test that the last retryable response is returned once retries are exhausted."""
+    async def main():
+        server, state = await serve([503, 503, 503])
+        client = AsyncHttpClient(max_retries=1, backoff_factor=0.001)
+        try:
+            response = await client.get(str(server.make_url("/weather")))
+            return response.status, state['hits']
+        finally:
+            await client.aclose()
+            await server.close()
+
+    assert asyncio.run(main()) == (503, 2)
+
+
+def test_concurrency_is_bounded():
+    """Test that no more than max_in_flight requests reach the upstream at once."""
+    async def main():
+        server, state = await serve([], delay=0.05)
+        client = AsyncHttpClient(max_in_flight=3)
+        try:
+            url = str(server.make_url("/weather"))
+            pending = [asyncio.ensure_future(client.get(url)) for _ in range(12)]
+            await asyncio.sleep(0.02)
+            stats = client.stats()
+            responses = await asyncio.gather(*pending)
+            return [response.status for response in responses], state['peak'], stats, client.stats()
+        finally:
+            await client.aclose()
+            await server.close()
+
+    statuses, peak, during, after = asyncio.run(main())
+    assert statuses == [200] * 12
+    assert peak == 3
+    assert during == {'max_in_flight': 3, 'in_flight': 3, 'waiting': 9}
+    assert after['in_flight'] == after['waiting'] == 0
+
+
+def test_invalid_max_in_flight():
+    """Test that at least one request must be allowed in flight."""
+    async def main():
+        AsyncHttpClient(max_in_flight=0)
+
+    with pytest.raises(ValueError, match="max_in_flight"):
+        asyncio.run(main())
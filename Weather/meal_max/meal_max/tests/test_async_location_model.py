@@ -0,0 +1,88 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from meal_max.models import async_location_model, location_model
+from meal_max.utils.weather_cache import WeatherCache
+
+
+def observation(temp):
+    return {
+        'weather': [{'main': "Clear", 'description': "clear sky"}],
+        'main': {'temp': temp, 'humidity': 40, 'pressure': 1012},
+        'wind': {'speed': 3.5},
+        'dt': 1700000000,
+    }
+
+
+@pytest.fixture
+def upstream(mocker, fake_weather):
+    """Record the fake provider's calls."""
+    return mocker.spy(fake_weather, "afetch")
+
+
+def fetched(spy):
+    return [call.args[0] for call in spy.call_args_list]
+
+
+def test_concurrent_misses_share_one_fetch(upstream):
+    """Test that concurrent lookups of one location make one upstream call and fill the shared cache."""
+    async def main():
+        return await asyncio.gather(*(async_location_model.get_current_weather(name)
+                                      for name in ["Oslo", " oslo", "OSLO ", "Lima"]))
+
+    results = asyncio.run(main())
+
+    assert sorted(fetched(upstream)) == ["Lima", "Oslo"]
+    assert results[0] is results[1] is results[2]
+    assert location_model.weather_cache.get(("oslo", "metric")) is results[0]
+    assert async_location_model.stats()['loads_in_flight'] == 0
+
+
+def test_stale_weather_served_when_fetch_fails(upstream, monkeypatch):
+    """Test that an expired cached response stands in when the upstream call fails."""
+    now = [0.0]
+    monkeypatch.setattr(location_model, "weather_cache",
+                        WeatherCache(ttl=60, max_size=10, stale_ttl=600, clock=lambda: now[0]))
+    location_model.weather_cache.set(("atlantis", "metric"), observation(12))
+    now[0] = 120
+
+    result = asyncio.run(async_location_model.get_current_weather("Atlantis"))
+
+    assert fetched(upstream) == ["Atlantis"]
+    assert result["main"]["temp"] == 12
+    now[0] = 700
+    with pytest.raises(Exception, match="city not found"):
+        asyncio.run(async_location_model.get_current_weather("Atlantis"))
+
+
+def test_create_location(sqlite_db, upstream, fake_weather):
+    """Test that a location is fetched asynchronously and stored like the sync path does."""
+    result = asyncio.run(async_location_model.create_location("Boston"))
+    temp = fake_weather.observation("Boston")["main"]["temp"]
+
+    assert result["location"] == "Boston"
+    assert f"Temp: {temp}°C" in result["current_weather"]
+    with sqlite3.connect(sqlite_db) as conn:
+        assert conn.execute("SELECT id, temp FROM locations WHERE locations = 'Boston'").fetchone() == (result["id"], temp)
+
+    with pytest.raises(ValueError, match="already exists"):
+        asyncio.run(async_location_model.create_location("Boston"))
+
+
+def test_create_locations_bulk(sqlite_db, upstream):
+    """Test that a bulk import reports the same per-item results as the sync path."""
+    results = asyncio.run(async_location_model.create_locations_bulk(["Boston", "Atlantis", "Boston", "", "Paris"]))
+
+    assert [result["status"] for result in results] == ["created", "error", "error", "error", "created"]
+    assert "city not found" in results[1]["error"]
+    with sqlite3.connect(sqlite_db) as conn:
+        rows = dict(conn.execute("SELECT locations, id FROM locations").fetchall())
+    assert rows == {"Boston": results[0]["id"], "Paris": results[4]["id"]}
+
+
+def test_create_locations_bulk_invalid_input(sqlite_db):
+    """Test that a non-list payload is rejected."""
+    with pytest.raises(ValueError, match="expected a list"):
+        asyncio.run(async_location_model.create_locations_bulk("Boston"))
@@ -0,0 +1,105 @@
+import pytest
+
+from meal_max.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("weather", failure_threshold=3, recovery_timeout=10, half_open_max_calls=1, clock=clock)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """Test that the circuit opens at the threshold and then rejects calls."""
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    fail(breaker, 2)
+    assert breaker.state == "closed"
+
+    fail(breaker, 1)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError, match=r"weather is unavailable \(circuit open\), retry in 10.0s"):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+
+
+def test_half_open_probe_closes_circuit(breaker, clock):
+    """Test that after the recovery timeout one probe is admitted and its success closes the circuit."""
+    fail(breaker, 3)
+    clock.now = 10
+
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens_circuit(breaker, clock):
+    """Test that a failed probe reopens the circuit for another recovery timeout."""
+    fail(breaker, 3)
+    clock.now = 10
+    fail(breaker, 1)
+
+    assert breaker.state == "open"
+    clock.now = 19
+    with pytest.raises(CircuitOpenError, match="retry in 1.0s"):
+        breaker.before_call()
+    clock.now = 20
+    breaker.before_call()
+
+
+def test_transitions_are_counted(breaker, clock):
+    """Test that every state change is counted by its from and to states."""
+    fail(breaker, 3)
+    clock.now = 10
+    fail(breaker, 1)
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+
+    assert breaker.transitions() == {('closed', 'open'): 1, ('open', 'half_open'): 2,
+                                     ('half_open', 'open'): 1, ('half_open', 'closed'): 1}
+    assert breaker.stats() == {'state': "closed", 'open': False, 'consecutive_failures': 0,
+                               'successes': 1, 'failures': 4, 'rejected': 0}
+
+
+def test_reset_closes_circuit(breaker):
+    """Test that reset() closes an open circuit."""
+    fail(breaker, 3)
+    breaker.reset()
+
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_invalid_configuration():
+    """Test that impossible settings are rejected."""
+    with pytest.raises(ValueError, match="failure_threshold"):
+        CircuitBreaker("weather", failure_threshold=0)
+    with pytest.raises(ValueError, match="half_open_max_calls"):
+        CircuitBreaker("weather", half_open_max_calls=0)
+    with pytest.raises(ValueError, match="recovery_timeout"):
+        CircuitBreaker("weather", recovery_timeout=-1)
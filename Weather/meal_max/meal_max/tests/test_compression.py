@@ -0,0 +1,57 @@
+import gzip
+
+from flask import Flask, jsonify
+import pytest
+
+from meal_max.utils.compression import Compressor
+
+
+@pytest.fixture
+def client():
+    """A Flask app with a large and a small JSON route, compressed above 1 KiB."""
+    app = Flask(__name__)
+    compressor = Compressor(min_size=1024)
+    app.after_request(compressor)
+
+    @app.route('/large')
+    def large():
+        response = jsonify({'locations': [{'id': i, 'location': f"City {i}"} for i in range(200)]})
+        response.set_etag("v1")
+        return response
+
+    @app.route('/small')
+    def small():
+        return jsonify({'status': 'healthy'})
+
+    client = app.test_client()
+    client.compressor = compressor
+    return client
+
+
+def test_large_response_is_gzipped(client):
+    """Test that a large body is gzipped for a client that accepts it."""
+    plain = client.get('/large')
+    response = client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+
+    assert response.headers['Content-Encoding'] == "gzip"
+    assert response.headers['Vary'] == "Accept-Encoding"
+    assert response.headers['ETag'] == 'W/"v1"'
+    assert gzip.decompress(response.data) == plain.data
+    assert int(response.headers['Content-Length']) == len(response.data) < len(plain.data) / 4
+    assert client.compressor.stats()['compressed'] == 1
+
+
+def test_no_compression_without_accept_encoding(client):
+    """Test that clients that do not ask for compression get the identity encoding."""
+    for headers in ({}, {'Accept-Encoding': 'gzip;q=0, identity'}):
+        response = client.get('/large', headers=headers)
+        assert 'Content-Encoding' not in response.headers
+        assert response.headers['ETag'] == '"v1"'
+
+
+def test_small_response_is_not_compressed(client):
+    """Test that bodies under the threshold are sent as is."""
+    response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in response.headers
+    assert response.json == {'status': 'healthy'}
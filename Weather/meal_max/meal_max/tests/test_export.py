@@ -0,0 +1,115 @@
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from meal_max.utils import export
+from meal_max.utils.export import JsonlExporter
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh]
+
+
+@pytest.fixture
+def export_path(tmp_path):
+    return str(tmp_path / "exports" / "weather.jsonl")
+
+
+def test_records_are_appended_in_batches(export_path):
+    """Test that queued records are written as JSON lines in batches."""
+    exporter = JsonlExporter(export_path, batch_size=10, flush_interval=0.05)
+    for i in range(25):
+        assert exporter.export({'id': i, 'location': f"City {i}"}) is True
+    exporter.close(timeout=5)
+
+    assert [record['id'] for record in read_lines(export_path)] == list(range(25))
+    stats = exporter.stats()
+    assert stats['exported'] == 25
+    assert stats['batches'] >= 3
+    assert stats['dropped'] == 0
+
+
+def test_full_queue_drops_records(export_path, mocker):
+    """Test that memory is bounded: records beyond the queue size are dropped, not buffered."""
+    exporter = JsonlExporter(export_path, queue_size=5, batch_size=1)
+    # Hold the writer on its first batch so the queue fills up
+    unblock = threading.Event()
+    mocker.patch.object(exporter, "_write", side_effect=lambda batch: unblock.wait(5))
+    exporter.export({'id': 0})
+    deadline = time.monotonic() + 5
+    while exporter.stats()['queued'] and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+    accepted = [exporter.export({'id': i}) for i in range(1, 8)]
+
+    assert accepted.count(False) == 2
+    assert exporter.stats()['dropped'] == 2
+    unblock.set()
+    exporter.close(timeout=5)
+
+
+def test_close_is_bounded_when_writer_is_stuck(export_path, mocker):
+    """Test that close() returns after its timeout even when the queue is full and the writer hangs."""
+    exporter = JsonlExporter(export_path, queue_size=2, batch_size=1)
+    unblock = threading.Event()
+    mocker.patch.object(exporter, "_write", side_effect=lambda batch: unblock.wait(5))
+    exporter.export({'id': 0})
+    deadline = time.monotonic() + 5
+    while exporter.stats()['queued'] and time.monotonic() < deadline:
+        time.sleep(0.001)
+    exporter.export({'id': 1})
+    exporter.export({'id': 2})
+
+    start = time.monotonic()
+    exporter.close(timeout=0.1)
+
+    assert time.monotonic() - start < 2
+    assert exporter.stats()['dropped'] == 2
+    unblock.set()
+
+
+def test_rotation_compresses_and_limits_backups(export_path):
+    """Test that a full file is rotated to a gzip backup and old backups are removed."""
+    exporter = JsonlExporter(export_path, max_bytes=200, backup_count=2, compress=True,
+                             batch_size=5, flush_interval=0)
+    for i in range(40):
+        exporter.export({'id': i, 'padding': "x" * 20})
+    exporter.close(timeout=5)
+
+    with gzip.open(export_path + ".1.gz", "rt") as fh:
+        newest_backup = [json.loads(line) for line in fh]
+    assert newest_backup
+    assert os.path.exists(export_path + ".2.gz")
+    assert not os.path.exists(export_path + ".3.gz")
+    assert exporter.stats()['rotations'] >= 3
+
+
+def test_export_disabled_by_default(mocker):
+    """Test that nothing is started when no export path is configured."""
+    mocker.patch.object(export, "WEATHER_EXPORT_PATH", "")
+
+    assert export.get_weather_exporter() is None
+    export.export_weather({'id': 1})
+
+
+def test_create_location_exports_when_enabled(sqlite_db, export_path, mocker):
+    """Test that created locations are exported through the shared exporter."""
+    from meal_max.models.location_model import create_locations_bulk
+
+    mocker.patch.object(export, "WEATHER_EXPORT_PATH", export_path)
+    mocker.patch.object(export, "WEATHER_EXPORT_FLUSH_INTERVAL", 0)
+    mocker.patch.object(export, "_weather_exporter", None)
+    mocker.patch("meal_max.models.location_model.get_current_weather", return_value={
+        'weather': [{'main': 'Clear', 'description': 'clear sky'}], 'main': {'temp': 25, 'humidity': 60}})
+
+    create_locations_bulk(["Boston", "Paris"])
+    export.get_weather_exporter().close(timeout=5)
+
+    records = read_lines(export_path)
+    assert sorted(record['location'] for record in records) == ["Boston", "Paris"]
+    assert all(record['status'] == "created" and record['fetched_at'] for record in records)
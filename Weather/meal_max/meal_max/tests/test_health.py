@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from meal_max.utils.health import ReadinessProbe, staleness
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_result_is_cached_for_ttl(clock):
+    """Test that probes within the TTL reuse the result without running the checks."""
+    calls = []
+    probe = ReadinessProbe(ttl=5, clock=clock)
+    probe.add_check("database", lambda: calls.append(1) or (True, {}))
+
+    assert probe.check()['status'] == "ready"
+    probe.check()
+    clock.now = 4.9
+    probe.check()
+    assert len(calls) == 1
+
+    clock.now = 5.0
+    probe.check()
+    assert len(calls) == 2
+    assert probe.stats() == {'ready': True, 'evaluations': 2, 'cached': 2, 'failures': 0}
+
+
+def test_critical_failure_is_unready_and_non_critical_is_degraded(clock):
+    """Test how failing checks map to the status."""
+    probe = ReadinessProbe(ttl=0, clock=clock)
+    state = {'database': True, 'weather': False}
+    probe.add_check("database", lambda: (state['database'], {}))
+    probe.add_check("weather", lambda: (state['weather'], {'age': 9000}), critical=False)
+
+    result = probe.check()
+    assert result['status'] == "degraded"
+    assert result['checks']['weather'] == {'ok': False, 'age': 9000}
+
+    state['database'] = False
+    assert probe.check()['status'] == "unready"
+    assert probe.stats()['ready'] is False
+    assert probe.stats()['failures'] == 1
+
+
+def test_check_exception_is_a_failure(clock):
+    """Test that a check raising is reported with its error instead of failing the probe."""
+    def broken():
+        raise RuntimeError("database is locked")
+
+    probe = ReadinessProbe(ttl=0, clock=clock)
+    probe.add_check("database", broken)
+
+    result = probe.check()
+    assert result['status'] == "unready"
+    assert result['checks']['database'] == {'ok': False, 'error': "database is locked"}
+
+
+def test_concurrent_probes_share_one_evaluation():
+    """Test that probes arriving while the checks run wait for that evaluation."""
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.05)
+        return True, {}
+
+    probe = ReadinessProbe(ttl=5)
+    probe.add_check("database", slow)
+    threads = [threading.Thread(target=probe.check) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert probe.stats()['cached'] == 7
+
+
+def test_clear_forces_evaluation(clock):
+    """Test that clear() drops the cached result."""
+    calls = []
+    probe = ReadinessProbe(ttl=60, clock=clock)
+    probe.add_check("database", lambda: calls.append(1) or (True, {}))
+    probe.check()
+    probe.clear()
+    assert probe.stats()['ready'] is None
+
+    probe.check()
+    assert len(calls) == 2
+
+
+def test_staleness():
+    """Test the age comparison used by the weather and refresher checks."""
+    assert staleness(None, 60) == (True, {'age': None, 'limit': 60})
+    assert staleness(1000, 60, now=1030) == (True, {'age': 30, 'limit': 60})
+    assert staleness(1000, 60, now=1061)[0] is False
@@ -0,0 +1,97 @@
+from flask import Flask, jsonify
+import pytest
+
+from meal_max.utils import http_cache
+from meal_max.utils.http_cache import ConditionalStats, conditional_response, make_etag, max_age
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A Flask app with one conditional route whose version and body builds can be inspected."""
+    monkeypatch.setattr(http_cache, "conditional_stats", ConditionalStats())
+    app = Flask(__name__)
+    state = {'updated_at': 1700000000.0, 'builds': 0}
+
+    @app.route('/item')
+    def item():
+        def build():
+            state['builds'] += 1
+            return jsonify({'status': 'success'})
+        updated_at = state['updated_at']
+        return conditional_response(make_etag("item", 1, int(updated_at)), updated_at, 300, build)
+
+    client = app.test_client()
+    client.state = state
+    return client
+
+
+def test_full_response_carries_validators(client):
+    """Test that a plain GET is served in full with ETag, Last-Modified and Cache-Control."""
+    response = client.get('/item')
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"item-1-1700000000"'
+    assert response.headers['Last-Modified'] == 'Tue, 14 Nov 2023 22:13:20 GMT'
+    assert response.headers['Cache-Control'] == 'public, max-age=300'
+
+
+def test_matching_etag_is_not_modified_without_building(client):
+    """Test that a current If-None-Match gets a 304 and the body is never built."""
+    etag = client.get('/item').headers['ETag']
+
+    response = client.get('/item', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert client.state['builds'] == 1
+    assert http_cache.conditional_stats.stats() == {'requests': 2, 'conditional': 1, 'not_modified': 1}
+
+
+def test_if_modified_since(client):
+    """Test Last-Modified revalidation before and after the row changes."""
+    last_modified = client.get('/item').headers['Last-Modified']
+
+    assert client.get('/item', headers={'If-Modified-Since': last_modified}).status_code == 304
+    client.state['updated_at'] += 60
+    assert client.get('/item', headers={'If-Modified-Since': last_modified}).status_code == 200
+
+
+def test_write_in_current_second_has_no_date_validator(client, monkeypatch):
+    """Test that Last-Modified is withheld while another write could still get the same whole-second date."""
+    monkeypatch.setattr(http_cache.time, "time", lambda: 1700000000.9)
+    client.state['updated_at'] = 1700000000.2
+    response = client.get('/item')
+    assert 'Last-Modified' not in response.headers
+
+    client.state['updated_at'] = 1700000000.7
+    response = client.get('/item', headers={'If-Modified-Since': 'Tue, 14 Nov 2023 22:13:20 GMT'})
+    assert response.status_code == 200
+
+
+def test_etag_takes_precedence_over_date(client):
+    """Test that a stale If-None-Match is served in full even if If-Modified-Since is current."""
+    first = client.get('/item')
+
+    response = client.get('/item', headers={'If-None-Match': '"item-1-0"',
+                                            'If-Modified-Since': first.headers['Last-Modified']})
+
+    assert response.status_code == 200
+
+
+def test_changed_version_is_served_in_full(client):
+    """Test that a stale ETag gets the new representation."""
+    etag = client.get('/item').headers['ETag']
+    client.state['updated_at'] += 1
+
+    response = client.get('/item', headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_max_age_follows_refresh_interval():
+    """Test that max-age is the time left until the data is due for refresh."""
+    assert max_age(1000.0, 600, now=1100.0) == 500
+    assert max_age(1000.0, 600, now=2000.0) == 0
+    assert max_age(1000.0, 600, now=900.0) == 600
+    assert max_age(0, 600) == 0
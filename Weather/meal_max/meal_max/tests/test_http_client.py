@@ -0,0 +1,143 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
+
+import pytest
+import requests
+
+from meal_max.utils import http_client
+from meal_max.utils.http_client import HttpClient, LatencyHistogram, get_http_client, reset_http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        server = self.server
+        server.client_ports.add(self.client_address[1])
+        server.hits += 1
+        if self.path == "/slow":
+            time.sleep(0.5)
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b"ok"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.client_ports = set()
+    server.hits = 0
+    server.statuses = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    client = HttpClient(max_retries=2, backoff_factor=0.001, read_timeout=2)
+    yield client
+    client.close()
+
+
+def url(server, path="/"):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+##########################################################
+# Connection reuse
+##########################################################
+
+def test_connections_are_kept_alive(stub_server, client):
+    """Test that sequential requests reuse one pooled connection."""
+    for _ in range(5):
+        assert client.get(url(stub_server)).text == "ok"
+
+    assert stub_server.hits == 5
+    assert len(stub_server.client_ports) == 1
+
+
+##########################################################
+# Retries and timeouts
+##########################################################
+
+def test_retryable_status_is_retried(stub_server, client):
+    """Test that a 503 is retried until the upstream recovers."""
+    stub_server.statuses = [503, 503]
+
+    response = client.get(url(stub_server))
+
+    assert response.status_code == 200
+    assert stub_server.hits == 3
+
+def test_retries_exhausted_returns_last_response(stub_server, client):
+    """Test that the last response is returned once retries run out."""
+    stub_server.statuses = [503, 503, 503]
+
+    assert client.get(url(stub_server)).status_code == 503
+    assert stub_server.hits == 3
+
+def test_read_timeout_raises(stub_server):
+    """Test that a slow upstream raises a timeout after the configured retries."""
+    client = HttpClient(read_timeout=0.1, max_retries=0)
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get(url(stub_server, "/slow"))
+    client.close()
+
+def test_deadline_bounds_retries(stub_server):
+    """Test that the deadline cuts the attempt timeout and stops retrying once it has passed."""
+    client = HttpClient(read_timeout=2, max_retries=5, backoff_factor=0.001)
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get(url(stub_server, "/slow"), deadline=0.3)
+    client.close()
+
+    assert time.monotonic() - start < 0.5
+    assert stub_server.hits == 1
+
+
+##########################################################
+# Latency histograms
+##########################################################
+
+def test_latency_recorded_per_host(stub_server, client):
+    """Test that every attempt is recorded in the host's histogram."""
+    stub_server.statuses = [502]
+    client.get(url(stub_server))
+
+    stats = client.latency_stats()
+    host = f"127.0.0.1:{stub_server.server_address[1]}"
+    assert stats[host]["count"] == 2
+    assert stats[host]["buckets"]["+Inf"] == 2
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket counts include every smaller bucket."""
+    histogram = LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5):
+        histogram.observe(seconds)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+    assert snapshot["sum"] == pytest.approx(5.55)
+
+
+def test_reset_http_client_creates_a_new_client(monkeypatch):
+    """Test that a reset (e.g. after fork) makes the next caller build a fresh client."""
+    monkeypatch.setattr(http_client, "_client", None)
+    first = get_http_client()
+
+    assert get_http_client() is first
+    reset_http_client()
+    second = get_http_client()
+    assert second is not first
+    second.close()
+    first.close()
@@ -0,0 +1,218 @@
+from collections import Counter
+import sqlite3
+import time
+
+import pytest
+
+from meal_max.models import kitchen_model
+from meal_max.models.kitchen_model import (
+    StatsWriteBuffer,
+    create_meal,
+    delete_meal,
+    get_leaderboard,
+    iter_leaderboard,
+    list_leaderboard,
+    update_meal_stats,
+    update_meal_stats_batch
+)
+from meal_max.utils import sql_utils
+from meal_max.utils.migrations import apply_migrations
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Point the shared pool at a freshly migrated temporary database."""
+    path = str(tmp_path / "meals.db")
+    apply_migrations(path)
+    pool = ConnectionPool(path, size=2)
+    monkeypatch.setattr(sql_utils, "_pool", pool)
+    yield path
+    pool.close()
+
+
+@pytest.fixture
+def meals(db_path):
+    """Create three meals and return their ids by name."""
+    for name in ("Pizza", "Sushi", "Tacos"):
+        create_meal(name, "Test", 10.0, "MED")
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute("SELECT meal, id FROM meals"))
+
+
+def record(meal_id, wins, losses):
+    for _ in range(wins):
+        update_meal_stats(meal_id, "win")
+    for _ in range(losses):
+        update_meal_stats(meal_id, "loss")
+
+
+##########################################################
+# Leaderboard
+##########################################################
+
+def test_leaderboard_sorted_by_wins(meals):
+    """Test that the leaderboard orders meals by wins and skips meals without battles."""
+    record(meals["Pizza"], wins=1, losses=0)
+    record(meals["Sushi"], wins=3, losses=3)
+
+    leaderboard = get_leaderboard()
+
+    assert [meal["meal"] for meal in leaderboard] == ["Sushi", "Pizza"]
+    assert leaderboard[0]["battles"] == 6
+    assert leaderboard[0]["win_pct"] == 50.0
+
+def test_leaderboard_sorted_by_win_pct(meals):
+    """Test that the leaderboard can be ordered by win percentage."""
+    record(meals["Pizza"], wins=1, losses=0)
+    record(meals["Sushi"], wins=3, losses=3)
+
+    assert [meal["meal"] for meal in get_leaderboard("win_pct")] == ["Pizza", "Sushi"]
+
+def test_leaderboard_top_k_and_offset(meals):
+    """Test that limit and offset page through the leaderboard."""
+    record(meals["Pizza"], wins=3, losses=0)
+    record(meals["Sushi"], wins=2, losses=0)
+    record(meals["Tacos"], wins=1, losses=0)
+
+    assert [meal["meal"] for meal in get_leaderboard(limit=2)] == ["Pizza", "Sushi"]
+    assert [meal["meal"] for meal in get_leaderboard(limit=2, offset=2)] == ["Tacos"]
+
+def test_leaderboard_drops_deleted_meal(meals):
+    """Test that deleting a meal removes it from the leaderboard."""
+    record(meals["Pizza"], wins=1, losses=0)
+    delete_meal(meals["Pizza"])
+
+    assert get_leaderboard() == []
+
+def test_leaderboard_matches_meals_table(meals, db_path):
+    """Test that the materialized rows agree with a full recomputation."""
+    record(meals["Pizza"], wins=2, losses=1)
+    record(meals["Tacos"], wins=0, losses=2)
+
+    with sqlite3.connect(db_path) as conn:
+        expected = conn.execute("""
+            SELECT id, battles, wins, wins * 1.0 / battles FROM meals
+            WHERE deleted = false AND battles > 0 ORDER BY id
+        """).fetchall()
+        actual = conn.execute("SELECT * FROM meal_leaderboard ORDER BY meal_id").fetchall()
+    assert actual == expected
+
+def test_leaderboard_invalid_parameters(db_path):
+    """Test that invalid sort and paging parameters are rejected."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter"):
+        get_leaderboard("losses")
+    with pytest.raises(ValueError, match="Invalid limit"):
+        get_leaderboard(limit=-1)
+
+def test_list_leaderboard_pages_through_ties(meals):
+    """Test that keyset pages walk the leaderboard once, breaking ties by meal id."""
+    record(meals["Pizza"], wins=1, losses=0)
+    record(meals["Sushi"], wins=2, losses=0)
+    record(meals["Tacos"], wins=1, losses=1)
+
+    page = list_leaderboard(limit=2, fields=["meal", "wins"])
+    assert page['items'] == [{'meal': "Sushi", 'wins': 2}, {'meal': "Pizza", 'wins': 1}]
+
+    page = list_leaderboard(cursor=page['next_cursor'], limit=2, fields=["meal", "win_pct"])
+    assert page['items'] == [{'meal': "Tacos", 'win_pct': 50.0}]
+    assert page['next_cursor'] is None
+
+def test_iter_leaderboard_by_win_pct(meals):
+    """Test streaming the leaderboard by win percentage from a cursor."""
+    record(meals["Pizza"], wins=1, losses=0)
+    record(meals["Sushi"], wins=2, losses=2)
+    record(meals["Tacos"], wins=0, losses=1)
+
+    cursor = list_leaderboard("win_pct", limit=1)['next_cursor']
+
+    assert [row['meal'] for row in iter_leaderboard("win_pct", cursor)] == ["Sushi", "Tacos"]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        list_leaderboard(cursor=cursor[:-2] + "!!")
+
+
+##########################################################
+# Batched stats
+##########################################################
+
+def test_update_meal_stats_batch(meals, db_path):
+    """Test that a batch aggregates results per meal and reports each item."""
+    delete_meal(meals["Tacos"])
+
+    outcomes = update_meal_stats_batch([
+        (meals["Pizza"], "win"),
+        (meals["Pizza"], "loss"),
+        (meals["Sushi"], "win"),
+        (meals["Tacos"], "win"),
+        (999, "win"),
+        (meals["Sushi"], "draw"),
+    ])
+
+    assert [outcome["status"] for outcome in outcomes] == ["applied", "applied", "applied", "error", "error", "error"]
+    assert outcomes[3]["error"] == f"Meal with ID {meals['Tacos']} has been deleted"
+    assert outcomes[4]["error"] == "Meal with ID 999 not found"
+    assert "Invalid result: draw" in outcomes[5]["error"]
+
+    with sqlite3.connect(db_path) as conn:
+        stats = {row[0]: row[1:] for row in conn.execute("SELECT meal, battles, wins FROM meals")}
+    assert stats["Pizza"] == (2, 1)
+    assert stats["Sushi"] == (1, 1)
+    assert [meal["meal"] for meal in get_leaderboard("win_pct")] == ["Sushi", "Pizza"]
+
+def test_update_meal_stats_batch_meal_deleted_during_batch(meals, db_path, monkeypatch):
+    """Test that a meal deleted after the existence check is reported as deleted, not applied."""
+    def delete_then_count():
+        # Runs right after the existence check, before any update
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meals["Sushi"],))
+        return Counter()
+    monkeypatch.setattr(kitchen_model, "Counter", delete_then_count)
+
+    outcomes = update_meal_stats_batch([(meals["Pizza"], "win"), (meals["Sushi"], "win")])
+
+    assert [outcome["status"] for outcome in outcomes] == ["applied", "error"]
+    assert outcomes[1]["error"] == f"Meal with ID {meals['Sushi']} has been deleted"
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT battles FROM meals WHERE id = ?", (meals["Sushi"],)).fetchone() == (0,)
+        assert conn.execute("SELECT meal_id FROM meal_leaderboard").fetchall() == [(meals["Pizza"],)]
+
+def test_stats_write_buffer_flushes_on_size(meals):
+    """Test that the buffer flushes as soon as flush_size results are pending."""
+    buffer = StatsWriteBuffer(flush_size=3, flush_interval_ms=60_000)
+    for _ in range(3):
+        buffer.add(meals["Pizza"], "win")
+
+    assert buffer.pending == 0
+    assert get_leaderboard()[0]["wins"] == 3
+    buffer.close()
+
+def test_stats_write_buffer_flushes_on_interval(meals):
+    """Test that the background thread flushes a partial batch after the interval."""
+    buffer = StatsWriteBuffer(flush_size=100, flush_interval_ms=10)
+    buffer.add(meals["Pizza"], "win")
+    buffer.add(999, "win")
+
+    deadline = time.monotonic() + 2
+    while buffer.stats()["flushes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+
+    assert buffer.stats() == {"pending": 0, "applied": 1, "failed": 1, "flushes": 1}
+    with pytest.raises(RuntimeError, match="closed"):
+        buffer.add(meals["Pizza"], "win")
+
+def test_stats_write_buffer_survives_unexpected_errors(meals, caplog):
+    """Test that a flush failing with a non-database error is logged and later results are still written."""
+    buffer = StatsWriteBuffer(flush_size=100, flush_interval_ms=10)
+    buffer.add([meals["Pizza"]], "win")  # an unhashable id makes the batch raise TypeError
+
+    deadline = time.monotonic() + 2
+    while buffer.stats()["failed"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.add(meals["Pizza"], "win")
+    while buffer.stats()["applied"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.close()
+
+    assert buffer.stats()["applied"] == 1 and buffer.stats()["failed"] == 1
+    assert "Background flush of buffered battle results failed" in caplog.text
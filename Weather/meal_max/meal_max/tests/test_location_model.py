@@ -2,16 +2,31 @@ import pytest
 from unittest.mock import patch, MagicMock
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from meal_max.utils.weather_cache import WeatherCache
 from contextlib import contextmanager
 
+from meal_max.models import location_model
+from meal_max.models.weather_providers import FakeWeatherProvider
 from meal_max.models.location_model import (
     Location,
     create_location,
+    create_locations_bulk,
+    format_weather,
     clear_locations, 
     delete_location, 
     get_weather_for_location,
-    get_location_by_id
-    
+    get_location_by_id,
+    get_current_weather,
+    get_location_updated_at,
+    get_oldest_weather_update,
+    iter_locations,
+    list_locations,
+    parse_weather,
+    prepare_bulk_locations,
+    recent_reads,
+    search_locations_by_weather,
+    store_bulk_locations,
 )
 import requests
 import sqlite3
@@ -38,14 +53,20 @@ def mock_cursor(mocker):
     return mock_cursor  # Return the mock cursor so we can set expectations per test
 
 
+@pytest.fixture
+def mock_db_connection(mock_cursor):
+    """The mocked cursor, under the name the tests below use."""
+    return mock_cursor
+
+
 @pytest.fixture
 def mock_requests():
-    """Mock the requests.get function."""
-    with patch('requests.get') as mock_get:
+    """Mock the shared HTTP client's get function."""
+    with patch('meal_max.utils.http_client.HttpClient.get') as mock_get:
         yield mock_get
 
 
-def test_create_location(mock_requests, mock_cursor):
+def test_create_location(mock_requests, mock_cursor, tmp_path, monkeypatch):
     """Test create_location function."""
     # Mock the weather API response
     mock_weather_data = {
@@ -54,22 +75,23 @@ def test_create_location(mock_requests, mock_cursor):
     }
     mock_requests.return_value.status_code = 200
     mock_requests.return_value.json.return_value = mock_weather_data
-
-
-    location = Location()
+    mock_cursor.lastrowid = 7
+    monkeypatch.chdir(tmp_path)
 
     # Call the function to test
     result = create_location("Test City")
 
     # Verify that the result is correct
-    assert result['location'] == 'Test City'
-    assert "Temp: 25°C" in result['current_weather']
+    assert result == {'id': 7, 'location': 'Test City',
+                      'current_weather': 'Clear (clear sky), Temp: 25°C, Humidity: 60% '}
 
     # Verify the database interaction
-    mock_db_connection.execute.assert_called_with("""
-        INSERT INTO locations(locations, weather)
-        VALUES (?, ?)
-    """, ('Test City', 'Clear (clear sky), Temp: 25°C, Humidity: 60%'))
+    sql, params = mock_cursor.execute.call_args_list[0].args
+    assert "INSERT INTO locations(locations, weather" in sql
+    assert params[:2] == ('Test City', 'Clear (clear sky), Temp: 25°C, Humidity: 60% ')
+
+    # Nothing is written to the working directory on the request path
+    assert list(tmp_path.iterdir()) == []
 
 
 def test_create_location_invalid_location(mock_db_connection):
@@ -82,24 +104,34 @@ def test_create_location_invalid_location(mock_db_connection):
 
 def test_delete_location(mock_db_connection):
     """Test delete_location function."""
-    mock_db_connection.fetchone.return_value = (False,)
+    mock_db_connection.rowcount = 1
     mock_db_connection.execute.return_value = None
 
     # Call delete_location
     delete_location(1)
 
-    # Verify the correct SQL query was executed
-    mock_db_connection.execute.assert_called_with("UPDATE location SET deleted = TRUE WHERE id = ?", (1,))
+    # Verify a single conditional update was executed
+    mock_db_connection.execute.assert_called_once_with("UPDATE locations SET deleted = TRUE WHERE id = ? AND deleted = FALSE", (1,))
 
 
 def test_delete_location_not_found(mock_db_connection):
     """Test delete_location when location is not found."""
+    mock_db_connection.rowcount = 0
     mock_db_connection.fetchone.return_value = None
 
     with pytest.raises(ValueError, match="Location with ID 1 not found"):
         delete_location(1)
 
 
+def test_delete_location_already_deleted(mock_db_connection):
+    """Test delete_location when the location has already been deleted."""
+    mock_db_connection.rowcount = 0
+    mock_db_connection.fetchone.return_value = (True,)
+
+    with pytest.raises(ValueError, match="Location with ID 1 has been deleted"):
+        delete_location(1)
+
+
 def test_get_weather_for_location(mock_db_connection):
     """Test get_weather_for_location function."""
     mock_db_connection.fetchone.return_value = (1, 'Test City', 'Clear (clear sky), Temp: 25°C, Humidity: 60%', False)
@@ -135,4 +167,308 @@ def test_get_location_by_id_not_found(mock_db_connection):
     mock_db_connection.fetchone.return_value = None
 
     with pytest.raises(ValueError, match="Location with ID 1 not found"):
-        get_location_by_id(1)
\ No newline at end of file
+        get_location_by_id(1)
+
+##########################################################
+# Bulk import
+##########################################################
+
+@pytest.fixture
+def mock_weather(mocker, fake_weather):
+    """Record the offline provider's calls."""
+    return mocker.spy(fake_weather, "fetch")
+
+
+def test_create_locations_bulk(sqlite_db, mock_weather):
+    """Test that a bulk import reports a result per item in input order."""
+    results = create_locations_bulk(["Boston", "Atlantis", "Boston", "", "Paris"])
+
+    assert [result["status"] for result in results] == ["created", "error", "error", "error", "created"]
+    assert "city not found" in results[1]["error"]
+    assert "Duplicate location in request" in results[2]["error"]
+    assert results[0]["current_weather"] == format_weather(FakeWeatherProvider().observation("Boston"))
+
+    with sqlite3.connect(sqlite_db) as conn:
+        rows = dict(conn.execute("SELECT locations, id FROM locations").fetchall())
+    assert rows == {"Boston": results[0]["id"], "Paris": results[4]["id"]}
+
+
+def test_create_locations_bulk_existing(sqlite_db, mock_weather):
+    """Test that locations already in the database are reported and not refetched."""
+    create_locations_bulk(["Boston"])
+    mock_weather.reset_mock()
+
+    results = create_locations_bulk(["Boston", "Paris"])
+
+    assert results[0] == {"location": "Boston", "status": "error", "error": "Location with name 'Boston' already exists"}
+    assert results[1]["status"] == "created"
+    assert [call.args[0] for call in mock_weather.call_args_list] == ["Paris"]
+
+
+def test_create_locations_bulk_concurrent_insert(sqlite_db, fake_weather):
+    """Test that a name another writer inserted after validation is reported as existing, not created."""
+    results, pending = prepare_bulk_locations(["Boston", "Paris"])
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.execute("INSERT INTO locations(locations, weather) VALUES ('Paris', 'Clear')")
+        other_id = conn.execute("SELECT id FROM locations WHERE locations = 'Paris'").fetchone()[0]
+
+    store_bulk_locations(pending, {name: (fake_weather.observation(name), 0.0, None) for name in pending})
+
+    assert results[0]["status"] == "created" and results[0]["id"] != other_id
+    assert results[1] == {"location": "Paris", "status": "error", "error": "Location with name 'Paris' already exists"}
+
+
+def test_clear_locations_keeps_migrated_columns(sqlite_db, fake_weather):
+    """Test that clearing deletes locations and their history but keeps the schema and restarts ids."""
+    create_locations_bulk(["Boston", "Paris"])
+
+    clear_locations()
+
+    with sqlite3.connect(sqlite_db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM weather_observations").fetchone()[0] == 0
+    results = create_locations_bulk(["Oslo"])
+    assert results[0]["id"] == 1
+    assert search_locations_by_weather(min_temp=-100)[0]["location"] == "Oslo"
+
+
+def test_create_locations_bulk_invalid_input():
+    """Test that a non-list payload is rejected."""
+    with pytest.raises(ValueError, match="expected a list"):
+        create_locations_bulk("Boston")
+
+
+##########################################################
+# Upstream failures
+##########################################################
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """A fresh weather circuit breaker and a weather cache with a controllable clock."""
+    monkeypatch.setenv("api_key", "test")
+    clock = FakeClock()
+    breaker = CircuitBreaker("OpenWeatherMap", failure_threshold=2, recovery_timeout=60)
+    monkeypatch.setattr(location_model, "weather_breaker", breaker)
+    monkeypatch.setattr(location_model, "weather_cache", WeatherCache(ttl=60, max_size=10, stale_ttl=600, clock=clock))
+    return breaker, clock
+
+
+def test_breaker_fails_fast_after_upstream_errors(mock_requests, upstream):
+    """Test that repeated 503s open the circuit and later lookups do not call the API."""
+    mock_requests.return_value.status_code = 503
+    for _ in range(2):
+        with pytest.raises(Exception, match="Failed to fetch current weather: 503"):
+            get_current_weather("Boston")
+    mock_requests.reset_mock()
+
+    with pytest.raises(CircuitOpenError, match="OpenWeatherMap is unavailable"):
+        get_current_weather("Boston")
+    mock_requests.assert_not_called()
+
+
+def test_unknown_city_does_not_open_breaker(mock_requests, upstream):
+    """Test that a 404 is an answer from a healthy API, not a failure."""
+    breaker, _ = upstream
+    mock_requests.return_value.status_code = 404
+    for _ in range(3):
+        with pytest.raises(Exception, match="404"):
+            get_current_weather("Atlantis")
+
+    assert breaker.state == "closed"
+
+
+def test_provider_outage_opens_breaker(fake_weather, upstream):
+    """Test that unavailable errors from the configured provider open the circuit."""
+    breaker, _ = upstream
+    fake_weather.error_rate = 1
+    for _ in range(2):
+        with pytest.raises(Exception, match="503, injected failure"):
+            get_current_weather("Boston")
+
+    with pytest.raises(CircuitOpenError):
+        get_current_weather("Boston")
+    assert fake_weather.stats()['requests'] == 2
+    assert breaker.transitions() == {('closed', 'open'): 1}
+
+
+def test_missing_api_key_is_not_an_outage(mock_requests, upstream, monkeypatch):
+    """Test that a configuration error neither reaches the API nor opens the circuit."""
+    breaker, _ = upstream
+    monkeypatch.delenv("api_key")
+    for _ in range(3):
+        with pytest.raises(ValueError, match="API key not found"):
+            get_current_weather("Boston")
+
+    mock_requests.assert_not_called()
+    assert breaker.stats()['failures'] == 0
+
+
+def test_stale_weather_served_when_upstream_fails(mock_requests, upstream):
+    """Test that an expired cached response stands in when the API is down, and a deadline is passed."""
+    _, clock = upstream
+    mock_requests.return_value.status_code = 200
+    mock_requests.return_value.json.return_value = observation("Clear", 20, 40)
+    get_current_weather("Boston")
+    assert mock_requests.call_args.kwargs["deadline"] == location_model.WEATHER_FETCH_DEADLINE
+
+    clock.now = 120
+    mock_requests.side_effect = requests.exceptions.ConnectionError("refused")
+    assert get_current_weather("boston")["main"]["temp"] == 20
+    with pytest.raises(requests.exceptions.ConnectionError):
+        get_current_weather("Paris")
+
+
+##########################################################
+# Structured weather
+##########################################################
+
+def observation(condition, temp, humidity):
+    return {
+        'weather': [{'main': condition, 'description': condition.lower()}],
+        'main': {'temp': temp, 'humidity': humidity, 'pressure': 1012},
+        'wind': {'speed': 3.5},
+        'dt': 1700000000,
+    }
+
+
+def test_parse_weather():
+    """Test that the typed fields are extracted from an API response."""
+    assert parse_weather(observation("Rain", 9.5, 80)) == {
+        'weather_condition': 'Rain',
+        'weather_description': 'rain',
+        'temp': 9.5,
+        'humidity': 80,
+        'pressure': 1012,
+        'wind_speed': 3.5,
+        'observed_at': 1700000000,
+    }
+    assert parse_weather({})['temp'] is None
+
+
+@pytest.fixture
+def weather_db(sqlite_db, mocker):
+    cities = {"Cairo": ("Clear", 35, 20), "Dubai": ("Clear", 41, 45), "Oslo": ("Snow", -3, 85),
+              "Lima": ("Clouds", 19, 80), "Delhi": ("Haze", 33, 60)}
+    mocker.patch("meal_max.models.location_model.get_current_weather",
+                 side_effect=lambda name, units="metric": observation(*cities[name]))
+    create_locations_bulk(list(cities))
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.execute("UPDATE locations SET deleted = TRUE WHERE locations = 'Delhi'")
+    return sqlite_db
+
+
+def test_bulk_create_stores_typed_weather(weather_db):
+    """Test that new locations get typed weather columns next to the formatted string."""
+    with sqlite3.connect(weather_db) as conn:
+        row = conn.execute("SELECT weather, weather_condition, temp, humidity, wind_speed, weather_updated_at "
+                           "FROM locations WHERE locations = 'Oslo'").fetchone()
+    assert row[:5] == ("Snow (snow), Temp: -3°C, Humidity: 85% ", "Snow", -3, 85, 3.5)
+    assert row[5] > 0
+
+
+def test_search_locations_by_temperature(weather_db):
+    """Test that a temperature range query returns live matches in temperature order."""
+    results = search_locations_by_weather(min_temp=30)
+
+    assert [result['location'] for result in results] == ["Cairo", "Dubai"]
+    assert results[0]['temp'] == 35
+
+    results = search_locations_by_weather(min_temp=0, max_temp=36, sort_by="humidity", descending=True)
+    assert [result['location'] for result in results] == ["Lima", "Cairo"]
+
+
+def test_search_locations_by_condition(weather_db):
+    """Test filtering on the weather condition, case-insensitively, with a limit."""
+    results = search_locations_by_weather(condition="clear", min_humidity=30, limit=5)
+
+    assert [result['location'] for result in results] == ["Dubai"]
+
+
+def test_search_locations_uses_index(weather_db):
+    """Test that a temperature range query is answered from the temperature index."""
+    with sqlite3.connect(weather_db) as conn:
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM locations WHERE deleted = FALSE AND temp >= 30 "
+            "AND temp IS NOT NULL ORDER BY temp DESC, id DESC LIMIT 100"))
+    assert "idx_locations_deleted_temp" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_search_locations_invalid_sort():
+    """Test that only indexed weather columns can be sorted on."""
+    with pytest.raises(ValueError, match="Invalid sort_by: locations"):
+        search_locations_by_weather(sort_by="locations")
+
+
+##########################################################
+# Listing
+##########################################################
+
+def test_list_locations_pages(weather_db):
+    """Test that keyset pages cover every live location once, in id order."""
+    page = list_locations(limit=2, fields=["id", "location"])
+    assert [item['location'] for item in page['items']] == ["Cairo", "Dubai"]
+    assert set(page['items'][0]) == {"id", "location"}
+
+    page = list_locations(cursor=page['next_cursor'], limit=2, fields=["location"])
+    assert page['items'] == [{'location': "Oslo"}, {'location': "Lima"}]
+    assert page['next_cursor'] is None
+
+
+def test_iter_locations_streams_from_cursor(weather_db):
+    """Test that streaming continues from a page cursor and honours the limit."""
+    cursor = list_locations(limit=1)['next_cursor']
+
+    assert [item['temp'] for item in iter_locations(cursor, fields=["temp"])] == [41, -3, 19]
+    assert len(list(iter_locations(limit=2))) == 2
+
+
+def test_list_locations_invalid_cursor(weather_db):
+    """Test that a tampered cursor is rejected."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        list_locations(cursor="not-a-cursor")
+
+
+def test_list_locations_uses_index(weather_db):
+    """Test that a deep page is a range scan on the (deleted, id) index without a sort."""
+    with sqlite3.connect(weather_db) as conn:
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id, locations FROM locations "
+            "WHERE deleted = FALSE AND id > 1000 ORDER BY id LIMIT 101"))
+    assert "idx_locations_deleted" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_get_location_updated_at(weather_db):
+    """Test that the version lookup returns the weather write time and rejects deleted locations."""
+    with sqlite3.connect(weather_db) as conn:
+        ids = dict(conn.execute("SELECT locations, id FROM locations"))
+        conn.execute("UPDATE locations SET weather_updated_at = 1700000000.5 WHERE id = ?", (ids["Oslo"],))
+
+    assert get_location_updated_at(ids["Oslo"], touch=True) == 1700000000.5
+    assert ids["Oslo"] in recent_reads.recent(60)
+    with pytest.raises(ValueError, match="has been deleted"):
+        get_location_updated_at(ids["Delhi"])
+    with pytest.raises(ValueError, match="not found"):
+        get_location_updated_at(999)
+
+
+def test_get_oldest_weather_update_ignores_deleted(weather_db):
+    """Test that the stalest weather write is found among live locations only."""
+    with sqlite3.connect(weather_db) as conn:
+        conn.execute("UPDATE locations SET weather_updated_at = 100 WHERE locations = 'Delhi'")
+        conn.execute("UPDATE locations SET weather_updated_at = 200 WHERE locations = 'Lima'")
+
+    assert get_oldest_weather_update() == 200
+
+    with sqlite3.connect(weather_db) as conn:
+        conn.execute("UPDATE locations SET deleted = TRUE")
+    assert get_oldest_weather_update() is None
@@ -0,0 +1,89 @@
+import json
+import logging
+
+from meal_max.utils.logger import (
+    JsonFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+    _level_for,
+    _parse_levels,
+    configure_logger,
+    setup_logging
+)
+
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, name="meal_max.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+##########################################################
+# Idempotent setup
+##########################################################
+
+def test_configure_logger_is_idempotent():
+    """Test that repeated configuration never stacks handlers."""
+    external = logging.getLogger("test_logger_external")
+    for _ in range(3):
+        configure_logger(external)
+        configure_logger(logging.getLogger("meal_max.test_logger"))
+
+    handler = setup_logging()
+    assert external.handlers.count(handler) == 1
+    assert logging.getLogger("meal_max").handlers.count(handler) == 1
+    assert handler not in logging.getLogger("meal_max.test_logger").handlers
+
+def test_parse_levels_most_specific_wins():
+    """Test that per-logger levels apply to the most specific configured prefix."""
+    levels = _parse_levels("meal_max.utils=WARNING, meal_max.utils.sql_utils=error")
+
+    assert _level_for("meal_max.utils.sql_utils", levels) == "ERROR"
+    assert _level_for("meal_max.utils.http_client", levels) == "WARNING"
+
+
+##########################################################
+# Formatting and filters
+##########################################################
+
+def test_json_formatter():
+    """Test that records are rendered as one JSON object per line."""
+    entry = json.loads(JsonFormatter().format(make_record()))
+
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "meal_max.test"
+
+def test_rate_limit_filter_per_call_site():
+    """Test that a call site is throttled without affecting other call sites."""
+    rate_limit = RateLimitFilter(rate=0.001, burst=2)
+
+    assert [rate_limit.filter(make_record()) for _ in range(4)] == [True, True, False, False]
+    assert rate_limit.filter(make_record(msg="other %s")) is True
+    assert rate_limit.suppressed == 2
+
+def test_rate_limit_filter_keys_preformatted_messages_by_line():
+    """Test that messages formatted by the caller share their call site's bucket."""
+    rate_limit = RateLimitFilter(rate=0.001, burst=2)
+
+    allowed = [rate_limit.filter(make_record(msg=f"location {i} failed", args=())) for i in range(4)]
+
+    assert allowed == [True, True, False, False]
+    assert len(rate_limit._buckets) == 1
+
+def test_rate_limit_filter_bounds_call_sites():
+    """Test that only the most recently used call sites are remembered."""
+    rate_limit = RateLimitFilter(rate=0.001, burst=1, max_sites=2)
+
+    for template in ("a %s", "b %s", "c %s"):
+        rate_limit.filter(make_record(msg=template))
+
+    assert len(rate_limit._buckets) == 2
+    assert rate_limit.filter(make_record(msg="a %s")) is True
+    assert rate_limit.filter(make_record(msg="c %s")) is False
+
+def test_sampling_filter_keeps_warnings():
+    """Test that sampling never drops warnings or errors."""
+    sampling = SamplingFilter(rate=0.0)
+
+    assert sampling.filter(make_record(level=logging.INFO)) is False
+    assert sampling.filter(make_record(level=logging.WARNING)) is True
+    assert sampling.dropped == 1
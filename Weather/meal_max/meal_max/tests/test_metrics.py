@@ -0,0 +1,111 @@
+import sqlite3
+
+from flask import Flask
+import pytest
+
+from meal_max.utils import metrics, sql_utils
+from meal_max.utils.metrics import MetricsRegistry, QueryTimer, statement_label
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """A fresh registry with the request and query families, installed as the module registry."""
+    registry = MetricsRegistry()
+    monkeypatch.setattr(metrics, "registry", registry)
+    monkeypatch.setattr(metrics, "request_latency", registry.histogram(
+        "meal_max_http_request_duration_seconds", "Requests", ("route", "method", "status")))
+    monkeypatch.setattr(metrics, "requests_total", registry.counter(
+        "meal_max_http_requests_total", "Requests", ("route", "method", "status")))
+    monkeypatch.setattr(metrics, "query_latency", registry.histogram(
+        "meal_max_sql_query_duration_seconds", "Queries", ("statement",), metrics.QUERY_BUCKETS))
+    monkeypatch.setattr(sql_utils, "query_timer", None)
+    return registry
+
+
+@pytest.fixture
+def client(registry, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_ENABLED", True)
+    app = Flask(__name__)
+    metrics.init_app(app)
+
+    @app.route('/api/items/<int:item_id>')
+    def item(item_id):
+        return {'id': item_id}
+
+    @app.route('/api/metrics')
+    def scrape():
+        return metrics.render_metrics()
+
+    return app.test_client()
+
+
+def test_request_latency_by_route_and_status(client):
+    """Test that requests are timed per route template, method and status."""
+    client.get('/api/items/1')
+    client.get('/api/items/2')
+    client.get('/missing')
+
+    response = client.get('/api/metrics')
+    text = response.data.decode()
+
+    assert response.content_type == metrics.CONTENT_TYPE
+    assert 'meal_max_http_requests_total{route="/api/items/<int:item_id>",method="GET",status="200"} 2' in text
+    assert 'meal_max_http_request_duration_seconds_count{route="<unmatched>",method="GET",status="404"} 1' in text
+    assert ('meal_max_http_request_duration_seconds_bucket{route="/api/items/<int:item_id>",method="GET",'
+            'status="200",le="+Inf"} 2') in text
+
+
+def test_sampling_off_keeps_counters_only(client, registry):
+    """Test that with sampling off nothing is timed but requests are still counted."""
+    registry.sample_rate = 0
+
+    client.get('/api/items/1')
+    text = registry.render()
+
+    assert 'meal_max_http_requests_total{route="/api/items/<int:item_id>",method="GET",status="200"} 1' in text
+    assert "meal_max_http_request_duration_seconds_count" not in text
+    assert "meal_max_metrics_sample_rate 0" in text
+
+
+def test_query_timing_per_statement(registry, monkeypatch):
+    """Test that statements on pooled connections are timed under a verb and table label."""
+    monkeypatch.setattr(sql_utils, "query_timer", QueryTimer())
+    conn = sqlite3.connect(":memory:", factory=sql_utils.TimedConnection)
+    conn.execute("CREATE TABLE meals (id INTEGER, meal TEXT)")
+    conn.cursor().executemany("INSERT INTO meals VALUES (?, ?)", [(1, "Pizza"), (2, "Sushi")])
+    conn.execute("SELECT meal FROM meals WHERE id = ?", (1,)).fetchall()
+    conn.close()
+
+    text = registry.render()
+
+    for label in ("CREATE meals", "INSERT meals", "SELECT meals"):
+        assert f'meal_max_sql_query_duration_seconds_count{{statement="{label}"}} 1' in text
+
+
+def test_statement_label():
+    """Test that statements collapse to their verb and first table."""
+    assert statement_label("UPDATE locations SET favorite = TRUE WHERE id = ?") == "UPDATE locations"
+    assert statement_label("\n  SELECT l.wins FROM meal_leaderboard l JOIN meals m ON m.id = l.meal_id") \
+        == "SELECT meal_leaderboard"
+    assert statement_label("PRAGMA journal_mode = WAL;") == "PRAGMA"
+
+
+def test_register_stats(registry):
+    """Test that stats dicts become gauges and counters, skipping values that are not numbers."""
+    registry.register_stats("meal_max_test", lambda: {'open': 2, 'running': True, 'hits': 7,
+                                                      'last_error': None, 'nested': {'a': 1}},
+                            "Test component", counters=("hits",))
+    registry.register_stats("meal_max_disabled", lambda: None, "Disabled component")
+
+    lines = registry.render().splitlines()
+
+    assert "meal_max_test_open 2" in lines
+    assert "meal_max_test_running 1" in lines
+    assert "# TYPE meal_max_test_hits_total counter" in lines
+    assert "meal_max_test_hits_total 7" in lines
+    assert not any("last_error" in line or "nested" in line or "disabled" in line for line in lines)
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines in label values are escaped."""
+    assert metrics._format_labels({'statement': 'a"b\\c\nd'}) == '{statement="a\\"b\\\\c\\nd"}'
@@ -0,0 +1,140 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils.migrations import apply_migrations, current_version, list_migrations, split_statements
+from meal_max.utils.sql_utils import ConnectionPool
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+def load_schema_scripts(db_path):
+    """Build the tables the way sql/create_db.sh does."""
+    with sqlite3.connect(db_path) as conn:
+        for script in ("sql/create_user_table.sql", "sql/create_location_table.sql"):
+            with open(script) as fh:
+                conn.executescript(fh.read())
+
+
+def column_names(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def index_names(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+##########################################################
+# Migrations
+##########################################################
+
+def test_apply_migrations_creates_schema_and_indexes(db_path):
+    """Test that a fresh database gets the tables and hot-query indexes."""
+    applied = apply_migrations(db_path)
+
+    assert applied == [version for version, _, _ in list_migrations()]
+    assert current_version(db_path) == applied[-1]
+    assert {"idx_meals_deleted_battles_wins", "idx_locations_deleted"} <= index_names(db_path)
+
+def test_apply_migrations_is_idempotent(db_path):
+    """Test that a second run applies nothing and keeps existing data."""
+    apply_migrations(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO locations (locations, weather) VALUES ('Boston', 'Clear')")
+
+    assert apply_migrations(db_path) == []
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0] == 1
+
+def test_apply_migrations_after_schema_scripts(db_path):
+    """Test that migrations apply to a database built by the schema scripts, as with CREATE_DB=true."""
+    load_schema_scripts(db_path)
+
+    assert apply_migrations(db_path) == [version for version, _, _ in list_migrations()]
+    assert "weather_updated_at" in column_names(db_path, "locations")
+    assert "idx_locations_deleted_weather_updated" in index_names(db_path)
+
+def test_structured_weather_migration_backfills_script_rows(db_path):
+    """Test that rows created before the typed columns get the columns and are made due for a refresh."""
+    load_schema_scripts(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO locations (locations, weather) VALUES ('Boston', 'Clear')")
+
+    apply_migrations(db_path)
+
+    assert {"weather_condition", "temp", "humidity", "observed_at"} <= column_names(db_path, "locations")
+    assert {"idx_locations_deleted_temp", "idx_locations_deleted_humidity"} <= index_names(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT temp, weather_updated_at FROM locations").fetchone() == (None, 0)
+
+def test_apply_migrations_after_reset(db_path):
+    """Test that recreating the tables and forgetting the applied versions brings the full schema back."""
+    apply_migrations(db_path)
+    load_schema_scripts(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DROP TABLE schema_migrations")
+
+    apply_migrations(db_path)
+    assert "weather_updated_at" in column_names(db_path, "locations")
+    assert "bucket" in column_names(db_path, "weather_hourly")
+
+def test_existing_column_is_not_added_again(db_path, tmp_path):
+    """Test that an ADD COLUMN for a column the table already has is skipped, not an error."""
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    (migrations_dir / "0001_table.sql").write_text("CREATE TABLE t (id INTEGER, name TEXT);")
+    (migrations_dir / "0002_columns.sql").write_text(
+        "-- name exists already\nALTER TABLE t ADD COLUMN name TEXT;\nALTER TABLE \"t\" ADD size INTEGER;")
+
+    assert apply_migrations(db_path, str(migrations_dir)) == [1, 2]
+    assert column_names(db_path, "t") == {"id", "name", "size"}
+
+def test_failed_migration_is_rolled_back(db_path, tmp_path):
+    """Test that a failing migration leaves neither its changes nor its version row."""
+    migrations_dir = tmp_path / "migrations"
+    migrations_dir.mkdir()
+    (migrations_dir / "0001_good.sql").write_text("CREATE TABLE a (id INTEGER);")
+    (migrations_dir / "0002_bad.sql").write_text("CREATE TABLE b (id INTEGER);\nINSERT INTO missing VALUES (1);")
+
+    with pytest.raises(sqlite3.OperationalError):
+        apply_migrations(db_path, str(migrations_dir))
+
+    assert current_version(db_path) == 1
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert "a" in tables and "b" not in tables
+
+def test_split_statements():
+    """Test that scripts are split on complete statements, including triggers."""
+    script = """
+        CREATE TABLE t (id INTEGER); -- trailing comment
+        CREATE TRIGGER tr AFTER INSERT ON t BEGIN
+            UPDATE t SET id = id;
+        END;
+    """
+    statements = split_statements(script)
+    assert len(statements) == 2
+    assert statements[1].endswith("END;")
+
+
+##########################################################
+# Pragmas
+##########################################################
+
+def test_pool_applies_pragmas(db_path):
+    """Test that pooled connections come up with the configured pragmas."""
+    pool = ConnectionPool(db_path, size=1, pragmas={"journal_mode": "WAL", "busy_timeout": "1234", "cache_size": ""})
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    pool.close()
+
+def test_pool_rejects_unsafe_pragma(db_path):
+    """Test that pragma values cannot smuggle in extra SQL."""
+    with pytest.raises(ValueError, match="Invalid pragma"):
+        ConnectionPool(db_path, pragmas={"journal_mode": "WAL; DROP TABLE users"})
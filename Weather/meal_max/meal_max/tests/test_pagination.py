@@ -0,0 +1,46 @@
+import pytest
+
+from meal_max.utils.pagination import check_page_size, decode_cursor, encode_cursor, iter_rows, parse_fields
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes back to the sort key it was built from."""
+    cursor = encode_cursor([0.75, 42])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == [0.75, 42]
+
+
+@pytest.mark.parametrize("cursor", ["%%%", encode_cursor([1]), encode_cursor(["1", 2]), encode_cursor([True, 2])])
+def test_decode_cursor_rejects_malformed(cursor):
+    """Test that garbage, wrong-length and non-numeric cursors are rejected."""
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, 2)
+
+
+def test_parse_fields():
+    """Test that a projection keeps the requested order and rejects unknown fields."""
+    allowed = ["id", "location", "temp"]
+
+    assert parse_fields(None, allowed) == allowed
+    assert parse_fields("temp, id,temp", allowed) == ["temp", "id"]
+    with pytest.raises(ValueError, match="Invalid fields: secret"):
+        parse_fields("id,secret", allowed)
+
+
+def test_check_page_size():
+    """Test the page size bounds."""
+    assert check_page_size(1) == 1
+    for limit in (0, 1001):
+        with pytest.raises(ValueError, match="Invalid limit"):
+            check_page_size(limit)
+
+
+def test_iter_rows_fetches_in_batches(mocker):
+    """Test that rows are pulled with fetchmany, not fetchall."""
+    cursor = mocker.Mock()
+    cursor.fetchmany.side_effect = [[(1,), (2,)], [(3,)], []]
+
+    assert list(iter_rows(cursor, size=2)) == [(1,), (2,), (3,)]
+    cursor.fetchmany.assert_called_with(2)
+    cursor.fetchall.assert_not_called()
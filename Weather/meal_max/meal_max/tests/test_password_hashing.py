@@ -0,0 +1,138 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import threading
+
+import pytest
+
+from meal_max.utils.password_hashing import (
+    PasswordHasher,
+    Pbkdf2Hasher,
+    ScryptHasher,
+    VerificationPool,
+    VerificationQueueFull,
+    get_hasher,
+    verify_password
+)
+
+
+SALT = "ab" * 16
+
+
+##########################################################
+# Hashers
+##########################################################
+
+@pytest.mark.parametrize("hasher", [ScryptHasher(n=1024), Pbkdf2Hasher(iterations=1000)])
+def test_hash_and_verify(hasher):
+    """Test that each hasher verifies its own hashes."""
+    encoded = hasher.hash("secret", SALT)
+
+    assert encoded.startswith(hasher.algorithm + "$")
+    assert verify_password("secret", encoded, SALT) is True
+    assert verify_password("wrong", encoded, SALT) is False
+
+def test_needs_rehash_when_cost_changes():
+    """Test that hashes made with other cost parameters are flagged for upgrade."""
+    encoded = ScryptHasher(n=1024).hash("secret", SALT)
+
+    assert ScryptHasher(n=1024).needs_rehash(encoded) is False
+    assert ScryptHasher(n=2048).needs_rehash(encoded) is True
+    assert Pbkdf2Hasher(iterations=1000).needs_rehash(encoded) is True
+
+def test_old_cost_still_verifies():
+    """Test that a hash keeps verifying after the configured cost is raised."""
+    encoded = Pbkdf2Hasher(iterations=1000).hash("secret", SALT)
+    assert verify_password("secret", encoded, SALT) is True
+
+def test_get_hasher_from_environment(monkeypatch):
+    """Test that the hasher and its cost are configured through the environment."""
+    monkeypatch.setenv("PASSWORD_HASHER", "pbkdf2_sha256")
+    monkeypatch.setenv("PASSWORD_PBKDF2_ITERATIONS", "1234")
+    hasher = get_hasher()
+    assert isinstance(hasher, Pbkdf2Hasher) and hasher.iterations == 1234
+
+    monkeypatch.setenv("PASSWORD_HASHER", "md5")
+    with pytest.raises(ValueError, match="Unknown password hasher"):
+        get_hasher()
+
+def test_invalid_scrypt_cost():
+    """Test that scrypt n must be a power of two."""
+    with pytest.raises(ValueError, match="power of two"):
+        ScryptHasher(n=1000)
+
+def test_incomplete_hasher_cannot_be_instantiated():
+    """Test that a hasher missing part of the interface fails when built, not on first use."""
+    class HashOnly(PasswordHasher):
+        algorithm = "hash_only"
+
+        def hash(self, password, salt):
+            return password
+
+    with pytest.raises(TypeError, match="abstract"):
+        HashOnly()
+
+
+##########################################################
+# Verification pool
+##########################################################
+
+def test_verification_pool_records_latency():
+    """Test that verifications are timed."""
+    pool = VerificationPool(max_workers=1, max_queue=1)
+    encoded = Pbkdf2Hasher(iterations=1000).hash("secret", SALT)
+
+    assert pool.verify("secret", encoded, SALT) is True
+    stats = pool.stats()
+    assert stats["latency"]["count"] == 1
+    assert stats["in_flight"] == 0
+
+def test_verification_pool_rejects_when_full(monkeypatch):
+    """Test that submissions beyond the queue bound are rejected immediately."""
+    pool = VerificationPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_verify(password, encoded, salt):
+        started.set()
+        release.wait(timeout=5)
+        return True
+    monkeypatch.setattr("meal_max.utils.password_hashing.verify_password", blocking_verify)
+
+    threads = [threading.Thread(target=pool.verify, args=("a", "b", "c")) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    started.wait(timeout=5)
+    while pool.stats()["in_flight"] < 2:
+        pass
+
+    assert pool.stats()["queue_depth"] == 1
+    with pytest.raises(VerificationQueueFull, match="queue is full"):
+        pool.verify("a", "b", "c")
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    for thread in threads:
+        thread.join()
+
+def test_verification_pool_timeout_frees_queue_slot(monkeypatch):
+    """Test that a verification still queued when its caller gives up no longer holds a slot."""
+    pool = VerificationPool(max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking_verify(password, encoded, salt):
+        started.set()
+        release.wait(timeout=5)
+        return True
+    monkeypatch.setattr("meal_max.utils.password_hashing.verify_password", blocking_verify)
+
+    worker = threading.Thread(target=pool.verify, args=("a", "b", "c"))
+    worker.start()
+    started.wait(timeout=5)
+
+    with pytest.raises(FutureTimeoutError):
+        pool.verify("a", "b", "c", timeout=0.05)
+    assert pool.stats()["in_flight"] == 1
+
+    release.set()
+    worker.join()
+    assert pool.stats()["in_flight"] == 0
@@ -1,7 +1,11 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib.parse import parse_qs, urlparse
+
 import pytest
-import requests
 
-from meal_max.utils.random_utils import get_random
+from meal_max.utils.http_client import HttpClient
+from meal_max.utils.random_utils import RandomPool, get_random
 
 
 RANDOM_NUMBER = 42
@@ -9,12 +13,14 @@ NUM_MEALS = 100
 
 @pytest.fixture
 def mock_random_org(mocker):
-    # Patch the requests.get call
-    # requests.get returns an object, which we have replaced with a mock object
+    # Patch the shared HTTP client's get call
+    # HttpClient.get returns an object, which we have replaced with a mock object
     mock_response = mocker.Mock()
     # We are giving that object a text attribute
     mock_response.text = f"{RANDOM_NUMBER}"
-    mocker.patch("requests.get", return_value=mock_response)
+    mocker.patch("meal_max.utils.http_client.HttpClient.get", return_value=mock_response)
+    # Start from an empty buffer that never refills in the background
+    mocker.patch("meal_max.utils.random_utils.random_pool", RandomPool(batch_size=500, low_water=0))
     return mock_response
 
 
@@ -25,5 +31,108 @@ def test_get_random(mock_random_org):
     # Assert that the result is the mocked random number
     assert result == RANDOM_NUMBER, f"Expected random number {RANDOM_NUMBER}, but got {result}"
 
-    # Ensure that the correct URL was called
-    requests.get.assert_called_once_with("https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new", timeout=5)
+    # Ensure that a whole batch was requested in one call
+    HttpClient.get.assert_called_once_with("https://www.random.org/decimal-fractions/?num=500&dec=2&col=1&format=plain&rnd=new", timeout=5.0)
+
+
+##########################################################
+# Buffered pool against a local stub
+##########################################################
+
+class StubRandomOrg(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        server.hits += 1
+        if server.fail:
+            self.send_response(503)
+            self.end_headers()
+            return
+        num = int(parse_qs(urlparse(self.path).query)["num"][0])
+        body = "\n".join(f"0.{(server.hits + i) % 100:02d}" for i in range(num)).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_random_org():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRandomOrg)
+    server.hits = 0
+    server.fail = False
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_pool(server, **kwargs):
+    kwargs.setdefault("batch_size", 10)
+    kwargs.setdefault("low_water", 0)
+    return RandomPool(url=f"http://127.0.0.1:{server.server_address[1]}/", timeout=2, **kwargs)
+
+
+def test_numbers_are_served_from_one_batch(stub_random_org):
+    """Test that a batch of numbers costs one upstream request."""
+    pool = make_pool(stub_random_org)
+
+    numbers = [pool.get() for _ in range(10)]
+
+    assert stub_random_org.hits == 1
+    assert all(0 <= n < 1 for n in numbers)
+    stats = pool.stats()
+    assert stats['served'] == 10
+    assert stats['buffered'] == 0
+    assert stats['refills'] == 1
+    assert stats['fallbacks'] == 0
+    assert stats['refill_latency']['count'] == 1
+
+
+def test_low_water_triggers_background_refill(stub_random_org):
+    """Test that dropping below the low-water mark refills before the buffer runs out."""
+    pool = make_pool(stub_random_org, low_water=5)
+
+    for _ in range(6):
+        pool.get()
+    assert pool.wait_for_refill(timeout=2)
+
+    assert stub_random_org.hits == 2
+    assert pool.stats()['buffered'] == 14
+    assert pool.stats()['fallbacks'] == 0
+
+
+def test_falls_back_when_upstream_fails(stub_random_org):
+    """Test that an unavailable upstream falls back to the local generator without retrying on every call."""
+    stub_random_org.fail = True
+    pool = make_pool(stub_random_org, retry_after=60)
+
+    numbers = [pool.get() for _ in range(5)]
+
+    assert all(0 <= n < 1 for n in numbers)
+    assert all(round(n, 2) == n for n in numbers)
+    stats = pool.stats()
+    assert stats['fallbacks'] == 5
+    assert stats['refill_failures'] == 1
+    # The client retries 5xx responses, but only one refill was attempted
+    assert pool.refill() is False
+
+
+def test_refill_warms_the_pool(stub_random_org):
+    """Test that an explicit refill fills the buffer and clear() empties it."""
+    pool = make_pool(stub_random_org, batch_size=25)
+
+    assert pool.refill() is True
+    assert pool.stats()['buffered'] == 25
+
+    pool.clear()
+    assert pool.stats()['buffered'] == 0
+
+
+def test_invalid_batch_size():
+    """Test that a batch size beyond random.org's limit is rejected."""
+    with pytest.raises(ValueError, match="Invalid batch size: 10001"):
+        RandomPool(batch_size=10001)
@@ -0,0 +1,107 @@
+import pytest
+
+from meal_max.utils.scheduling import ProcessLock, RecentAccesses, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+##########################################################
+# Token bucket
+##########################################################
+
+def test_bucket_allows_burst_then_limits(clock):
+    """Test that a full bucket allows a burst of capacity calls and then refuses."""
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+    clock.now += 0.5
+    assert bucket.try_acquire() is True
+    assert bucket.try_acquire() is False
+
+
+def test_bucket_acquire_waits_for_refill(clock):
+    """Test that acquire() sleeps until the next token instead of failing."""
+    bucket = TokenBucket(rate=4, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.try_acquire()
+
+    assert bucket.acquire() is True
+    assert clock.now == pytest.approx(1000.25)
+    assert bucket.stats()['granted'] == 2
+    assert bucket.stats()['wait_time'] == pytest.approx(0.25)
+
+
+def test_bucket_acquire_timeout(clock):
+    """Test that acquire() gives up when no token arrives within the timeout."""
+    bucket = TokenBucket(rate=1, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.try_acquire()
+
+    assert bucket.acquire(timeout=0.2) is False
+    assert clock.now == pytest.approx(1000.2)
+
+
+def test_bucket_invalid_rate():
+    """Test that a non-positive rate is rejected."""
+    with pytest.raises(ValueError, match="Invalid rate: 0"):
+        TokenBucket(rate=0)
+
+
+##########################################################
+# Recent accesses
+##########################################################
+
+def test_recent_accesses_window_and_order(clock):
+    """Test that recent() returns keys inside the window, most recent first."""
+    accesses = RecentAccesses(clock=clock)
+    accesses.touch(1)
+    clock.now += 10
+    accesses.touch(2)
+    clock.now += 10
+    accesses.touch(3)
+    accesses.touch(1)
+
+    assert accesses.recent(15) == [1, 3, 2]
+    assert accesses.recent(5) == [1, 3]
+
+
+def test_recent_accesses_is_bounded(clock):
+    """Test that only the most recently accessed keys are kept."""
+    accesses = RecentAccesses(max_size=2, clock=clock)
+    for key in (1, 2, 3):
+        accesses.touch(key)
+
+    assert len(accesses) == 2
+    assert accesses.recent(60) == [3, 2]
+
+
+##########################################################
+# Process lock
+##########################################################
+
+def test_process_lock_is_exclusive(tmp_path):
+    """Test that only one holder gets the lock and that releasing hands it over."""
+    path = str(tmp_path / "refresher.lock")
+    first, second = ProcessLock(path), ProcessLock(path)
+
+    assert first.try_acquire()
+    assert first.try_acquire()
+    assert not second.try_acquire()
+
+    first.release()
+    assert not first.held
+    assert second.try_acquire()
+    second.release()
@@ -0,0 +1,55 @@
+import datetime
+import decimal
+import json
+
+from flask import Flask, jsonify, request
+import pytest
+
+from meal_max.utils import serialization
+from meal_max.utils.serialization import FastJSONProvider, get_backend
+
+
+@pytest.mark.parametrize("name", ["json", "auto"])
+def test_backends_agree(name):
+    """Test that every backend produces the same compact JSON."""
+    _, dumps, loads = get_backend(name)
+    payload = {'location': "São Paulo", 'temp': 21.5, 'tags': [1, None, True],
+               'observed': datetime.date(2024, 1, 2), 'price': decimal.Decimal("9.99")}
+
+    encoded = dumps(payload)
+
+    assert isinstance(encoded, bytes)
+    assert json.loads(encoded) == {'location': "São Paulo", 'temp': 21.5, 'tags': [1, None, True],
+                                   'observed': "2024-01-02", 'price': "9.99"}
+    assert b", " not in encoded and b'": ' not in encoded
+    assert loads(encoded)['location'] == "São Paulo"
+
+
+def test_unknown_backend():
+    """Test that a misconfigured backend is reported."""
+    with pytest.raises(ValueError, match="Invalid JSON backend"):
+        get_backend("simplejson")
+
+
+def test_orjson_required_but_missing(monkeypatch):
+    """Test that requiring orjson fails clearly when it is not installed, and auto falls back."""
+    monkeypatch.setattr(serialization, "orjson", None)
+
+    with pytest.raises(ValueError, match="orjson is not installed"):
+        get_backend("orjson")
+    assert get_backend("auto")[0] == "json"
+
+
+def test_provider_serves_jsonify_and_get_json():
+    """Test that the provider is used by jsonify and request parsing."""
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return jsonify({'echo': request.get_json()['value']})
+
+    response = app.test_client().post('/echo', json={'value': [1, 2]})
+
+    assert response.mimetype == "application/json"
+    assert response.data == b'{"echo":[1,2]}\n'
@@ -0,0 +1,141 @@
+import sqlite3
+import threading
+
+from flask import Flask
+import pytest
+
+from meal_max.utils import sql_utils
+from meal_max.utils.sql_utils import (
+    ConnectionPool,
+    check_database_connection,
+    check_table_exists,
+    find_missing_tables,
+    get_db_connection
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "test.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE locations (id INTEGER PRIMARY KEY, locations TEXT)")
+    return str(path)
+
+
+@pytest.fixture
+def pool(db_path, monkeypatch):
+    """Install a small shared pool pointed at a temporary database."""
+    pool = ConnectionPool(db_path, size=2, timeout=0.2)
+    monkeypatch.setattr(sql_utils, "_pool", pool)
+    yield pool
+    pool.close()
+
+
+##########################################################
+# Pool behaviour
+##########################################################
+
+def test_connections_are_reused(pool):
+    """Test that sequential checkouts reuse a single connection."""
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    stats = pool.stats()
+    assert stats["open"] == 1
+    assert stats["checkouts"] == 2
+
+def test_pool_exhaustion_times_out(pool):
+    """Test that a caller waits and then fails when every connection is in use."""
+    held = [pool.acquire(), pool.acquire()]
+
+    with pytest.raises(sqlite3.OperationalError, match="Timed out"):
+        pool.acquire()
+
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+    for conn in held:
+        pool.release(conn)
+
+def test_waiter_gets_released_connection(pool):
+    """Test that a waiting caller receives a connection as soon as one is released."""
+    held = [pool.acquire(), pool.acquire()]
+    timer = threading.Timer(0.05, pool.release, args=(held[0],))
+    timer.start()
+
+    assert pool.acquire() is held[0]
+    timer.join()
+
+def test_unhealthy_connection_is_replaced(pool):
+    """Test that a connection failing the health check is discarded on checkout."""
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert pool.stats()["discarded"] == 1
+    pool.release(replacement)
+
+def test_release_rolls_back_open_transaction(pool):
+    """Test that uncommitted work is not leaked to the next borrower."""
+    with pool.connection() as conn:
+        conn.execute("INSERT INTO locations (locations) VALUES ('Boston')")
+
+    with pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM locations").fetchone()[0] == 0
+
+def test_invalid_pool_size(db_path):
+    """Test that a pool must hold at least one connection."""
+    with pytest.raises(ValueError, match="Invalid pool size"):
+        ConnectionPool(db_path, size=0)
+
+
+##########################################################
+# Request-scoped connections
+##########################################################
+
+def test_request_reuses_one_connection(pool):
+    """Test that every get_db_connection() call in a request shares one connection."""
+    app = Flask(__name__)
+    sql_utils.init_app(app)
+
+    with app.app_context():
+        with get_db_connection() as first:
+            pass
+        with get_db_connection() as second:
+            pass
+        assert first is second
+        assert pool.stats()["in_use"] == 1
+
+    assert pool.stats()["in_use"] == 0
+    assert pool.stats()["checkouts"] == 1
+
+
+##########################################################
+# Health checks
+##########################################################
+
+def test_health_checks_use_pool(pool):
+    """Test that the health checks borrow pooled connections."""
+    check_database_connection()
+    check_table_exists("locations")
+
+    assert pool.stats()["open"] == 1
+    assert pool.stats()["checkouts"] == 2
+
+def test_check_table_missing(pool):
+    """Test that a missing table is reported."""
+    with pytest.raises(Exception, match="Table check error"):
+        check_table_exists("users")
+
+def test_find_missing_tables_in_one_query(pool):
+    """Test that several tables are checked with one sqlite_master lookup, names passed as parameters."""
+    missing = find_missing_tables(["users", "locations", "x'; DROP TABLE locations; --"])
+
+    assert missing == ["users", "x'; DROP TABLE locations; --"]
+    assert pool.stats()["checkouts"] == 1
+    assert find_missing_tables(["locations"]) == []
@@ -1,3 +1,5 @@
+import hashlib
+
 import pytest
 
 from meal_max.models.user_models import Users
@@ -22,7 +24,8 @@ def test_create_user(session, sample_user):
     assert user is not None, "User should be created in the database."
     assert user.username == sample_user["username"], "Username should match the input."
     assert len(user.salt) == 32, "Salt should be 32 characters (hex)."
-    assert len(user.password) == 64, "Password should be a 64-character SHA-256 hash."
+    assert user.password.startswith("scrypt$"), "Password should be a versioned scrypt hash."
+    assert user.salt in user.password, "The encoded hash should carry its salt."
 
 def test_create_duplicate_user(session, sample_user):
     """Test attempting to create a user with a duplicate username."""
@@ -44,6 +47,21 @@ def test_check_password_incorrect(session, sample_user):
     Users.create_user(**sample_user)
     assert Users.check_password(sample_user["username"], "wrongpassword") is False, "Password should not match."
 
+def test_check_password_upgrades_legacy_hash(session, sample_user):
+    """Test that a legacy single-round SHA-256 hash is replaced after a successful login."""
+    salt = "00" * 16
+    legacy_hash = hashlib.sha256((sample_user["password"] + salt).encode()).hexdigest()
+    session.add(Users(username=sample_user["username"], salt=salt, password=legacy_hash))
+    session.commit()
+
+    assert Users.check_password(sample_user["username"], "wrongpassword") is False
+    assert Users.query.filter_by(username=sample_user["username"]).first().password == legacy_hash
+
+    assert Users.check_password(sample_user["username"], sample_user["password"]) is True
+    user = Users.query.filter_by(username=sample_user["username"]).first()
+    assert user.password.startswith("scrypt$"), "Legacy hash should be upgraded on login."
+    assert Users.check_password(sample_user["username"], sample_user["password"]) is True
+
 def test_check_password_user_not_found(session):
     """Test checking password for a non-existent user."""
     with pytest.raises(ValueError, match="User nonexistentuser not found"):
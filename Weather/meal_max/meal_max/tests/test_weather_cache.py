@@ -0,0 +1,148 @@
+import threading
+
+import pytest
+
+from meal_max.utils.weather_cache import WeatherCache, normalize_location
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return WeatherCache(ttl=60, max_size=2, clock=clock)
+
+
+##########################################################
+# Normalization
+##########################################################
+
+def test_normalize_location():
+    """Test that case and whitespace differences map to the same key."""
+    assert normalize_location("  New   York ") == normalize_location("new york")
+
+
+##########################################################
+# TTL and LRU
+##########################################################
+
+def test_get_or_load_hit_and_miss(cache):
+    """Test that the loader only runs on the first lookup."""
+    calls = []
+    loader = lambda: calls.append(1) or {"temp": 20}
+
+    assert cache.get_or_load("boston", loader) == {"temp": 20}
+    assert cache.get_or_load("boston", loader) == {"temp": 20}
+
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_entry_expires_after_ttl(cache, clock):
+    """Test that an entry is reloaded once its TTL has passed."""
+    cache.set("boston", "old")
+    clock.now = 61
+
+    assert cache.get("boston") is None
+    assert cache.get_or_load("boston", lambda: "new") == "new"
+    assert cache.stats()["expirations"] == 1
+
+def test_stale_entry_outlives_ttl(clock):
+    """Test that an expired entry is a miss but stays available to get_stale() for stale_ttl."""
+    cache = WeatherCache(ttl=60, max_size=2, stale_ttl=100, clock=clock)
+    cache.set("boston", "old")
+    clock.now = 61
+
+    assert cache.get("boston") is None
+    assert cache.get_stale("boston") == "old"
+    clock.now = 160
+    assert cache.get_stale("boston") is None
+    assert cache.stats()["stale_served"] == 1
+
+def test_stale_entry_is_replaced_by_a_fresh_one(clock):
+    """Test that storing a fresh value drops the stale copy."""
+    cache = WeatherCache(ttl=60, max_size=2, stale_ttl=100, clock=clock)
+    cache.set("boston", "old")
+    clock.now = 61
+    cache.get("boston")
+    cache.set("boston", "new")
+
+    assert cache.get_stale("boston") == "new"
+    assert cache.stats()["stale"] == 0
+    assert cache.stats()["stale_served"] == 0
+
+def test_lru_eviction(cache):
+    """Test that the least recently used entry is evicted when full."""
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+def test_loader_error_is_not_cached(cache):
+    """Test that a failed load propagates and is retried on the next call."""
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError, match="upstream down"):
+        cache.get_or_load("boston", failing)
+    assert cache.get_or_load("boston", lambda: "ok") == "ok"
+
+def test_disabled_cache_always_loads(clock):
+    """Test that a ttl of zero turns caching off."""
+    cache = WeatherCache(ttl=0, max_size=10, clock=clock)
+    calls = []
+    for _ in range(3):
+        cache.get_or_load("boston", lambda: calls.append(1) or "value")
+    assert len(calls) == 3
+
+def test_invalid_configuration():
+    """Test that negative sizes are rejected."""
+    with pytest.raises(ValueError, match="Invalid max_size"):
+        WeatherCache(ttl=1, max_size=-1)
+    with pytest.raises(ValueError, match="Invalid stale_ttl"):
+        WeatherCache(ttl=1, max_size=1, stale_ttl=-1)
+
+
+##########################################################
+# Single-flight
+##########################################################
+
+def test_concurrent_misses_share_one_load(cache):
+    """Test that concurrent misses for one key make a single upstream call."""
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "weather"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("boston", slow_loader)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["coalesced"] < 4:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["weather"] * 5
@@ -0,0 +1,133 @@
+import sqlite3
+
+import pytest
+
+from meal_max.models import location_model
+from meal_max.models.weather_history import (
+    get_weather_history,
+    insert_observations,
+    observation_row,
+    prune_history,
+)
+
+
+DAY = 86400
+# Midnight UTC, so hourly and daily buckets line up with the test data
+T0 = 1700006400
+
+
+def observation(ts, temp, humidity=50):
+    return {'weather': [{'id': 800, 'main': 'Clear', 'description': 'clear sky'}],
+            'main': {'temp': temp, 'humidity': humidity, 'pressure': 1010}, 'wind': {'speed': 2.0}, 'dt': ts}
+
+
+@pytest.fixture
+def history_db(sqlite_db):
+    """Two live locations and a day of observations every 10 minutes for the first one."""
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.executemany("INSERT INTO locations (locations, weather) VALUES (?, 'old')", [("Boston",), ("Paris",)])
+        rows = [observation_row(1, observation(T0 + i * 600, temp=10 + (i % 6)), 0) for i in range(144)]
+        insert_observations(conn.cursor(), rows)
+    return sqlite_db
+
+
+def count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_observation_row():
+    """Test that an API response becomes a compact observation row."""
+    assert observation_row(7, observation(T0, 12.5, 40), 0) == (7, T0, 12.5, 40, 1010, 2.0, 800)
+    assert observation_row(7, {'dt': T0}, 0) is None
+
+
+def test_insert_observations_maintains_rollups(history_db):
+    """Test that hourly and daily roll-ups are maintained on insert."""
+    assert count(history_db, "weather_observations") == 144
+    with sqlite3.connect(history_db) as conn:
+        hourly = conn.execute("SELECT bucket, samples, temp_sum, temp_min, temp_max FROM weather_hourly "
+                              "WHERE location_id = 1 ORDER BY bucket").fetchall()
+        daily = conn.execute("SELECT samples, temp_min, temp_max FROM weather_daily").fetchall()
+    assert len(hourly) == 24
+    assert hourly[0] == (T0, 6, 75.0, 10, 15)
+    assert daily == [(144, 10, 15)]
+
+
+def test_duplicate_observation_is_not_counted_twice(history_db):
+    """Test that re-inserting an already stored observation leaves the roll-ups alone."""
+    with sqlite3.connect(history_db) as conn:
+        inserted = insert_observations(conn.cursor(), [observation_row(1, observation(T0, 99), 0)])
+        samples = conn.execute("SELECT samples FROM weather_daily").fetchone()[0]
+
+    assert inserted == 0
+    assert samples == 144
+
+
+def test_history_downsamples_raw_observations(history_db):
+    """Test that a raw series is merged into at most max_points buckets."""
+    history = get_weather_history(1, T0, T0 + 6 * 3600, resolution="raw", max_points=3)
+
+    assert history['resolution'] == "raw"
+    assert history['step'] == 7200
+    assert [point['ts'] for point in history['points']] == [T0, T0 + 7200, T0 + 14400]
+    assert history['points'][0] == {'ts': T0, 'samples': 12, 'temp_avg': 12.5, 'temp_min': 10,
+                                    'temp_max': 15, 'humidity_avg': 50.0}
+
+
+def test_history_from_rollups(history_db):
+    """Test that hourly and daily roll-ups give the same aggregates as the raw rows."""
+    hourly = get_weather_history(1, T0, T0 + DAY, resolution="hour", max_points=4)
+    daily = get_weather_history(1, T0, T0 + DAY, resolution="day")
+
+    assert hourly['step'] == 6 * 3600
+    assert len(hourly['points']) == 4
+    assert hourly['points'][0]['samples'] == 36
+    assert hourly['points'][0]['temp_avg'] == 12.5
+    assert daily['points'] == [{'ts': T0, 'samples': 144, 'temp_avg': 12.5, 'temp_min': 10,
+                                'temp_max': 15, 'humidity_avg': 50.0}]
+
+
+def test_history_rollups_include_bucket_holding_start(history_db):
+    """Test that a start inside an hour or day still returns that bucket."""
+    hourly = get_weather_history(1, T0 + 1800, T0 + 3 * 3600, resolution="hour")
+    daily = get_weather_history(1, T0 + 3600, T0 + DAY, resolution="day")
+
+    assert [point['ts'] for point in hourly['points']] == [T0, T0 + 3600, T0 + 7200]
+    assert [point['ts'] for point in daily['points']] == [T0]
+
+
+def test_history_auto_resolution(history_db, mocker):
+    """Test that auto picks the finest resolution still retained for the window."""
+    mocker.patch("meal_max.models.weather_history.time.time", return_value=T0 + DAY)
+
+    assert get_weather_history(1, T0, T0 + DAY, max_points=500)['resolution'] == "raw"
+    assert get_weather_history(1, T0, T0 + DAY, max_points=10)['resolution'] == "hour"
+    assert get_weather_history(1, T0 - 30 * DAY, T0 + DAY)['resolution'] == "hour"
+    assert get_weather_history(1, T0 - 365 * DAY, T0 + DAY)['resolution'] == "day"
+
+
+def test_history_invalid_window():
+    """Test that an empty window is rejected."""
+    with pytest.raises(ValueError, match="Invalid window"):
+        get_weather_history(1, T0, T0)
+
+
+def test_prune_history_applies_retention(history_db):
+    """Test that pruning removes raw rows past retention and keeps the roll-ups."""
+    deleted = prune_history(now=T0 + 7 * DAY + 12 * 3600, batch_size=1)
+
+    assert deleted['weather_observations'] == 72
+    assert deleted['weather_hourly'] == 0
+    assert 'weather_daily' not in deleted  # kept forever by default
+    assert count(history_db, "weather_observations") == 72
+    assert count(history_db, "weather_hourly") == 24
+
+
+def test_refresh_appends_history(history_db):
+    """Test that refreshed weather is appended to the history as well as stored on the location."""
+    updated = location_model.update_weather_batch([(2, observation(T0 + 60, 21), T0 + 60)])
+
+    assert updated == 1
+    history = get_weather_history(2, T0, T0 + 3600, resolution="raw")
+    assert history['points'][0]['temp_avg'] == 21
@@ -0,0 +1,184 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from meal_max.models import weather_providers
+from meal_max.models.weather_providers import (
+    FakeWeatherProvider,
+    OpenWeatherMapProvider,
+    WeatherProvider,
+    WeatherProviderError,
+    create_weather_provider,
+    get_weather_provider,
+    set_weather_provider,
+)
+
+
+##########################################################
+# Fake provider
+##########################################################
+
+def test_fake_weather_is_deterministic():
+    """Test that a location gets the same weather from every instance, whatever its spelling."""
+    first = FakeWeatherProvider().fetch("New York", "metric")
+    second = FakeWeatherProvider(seed=7).fetch("  new   york ", "metric")
+
+    assert first['main'] == second['main']
+    assert first['weather'] == second['weather']
+    assert set(first) == {'name', 'weather', 'main', 'wind', 'dt'}
+
+
+def test_fake_weather_units():
+    """Test that the requested unit system is applied to the same underlying weather."""
+    metric = FakeWeatherProvider().observation("Oslo")['main']['temp']
+    imperial = FakeWeatherProvider().observation("Oslo", "imperial")['main']['temp']
+
+    assert imperial == pytest.approx(metric * 9 / 5 + 32, abs=0.1)
+
+
+def test_fake_latency_and_concurrency():
+    """Test that every call waits the configured latency and concurrent calls are counted."""
+    provider = FakeWeatherProvider(latency_ms=50)
+    threads = [threading.Thread(target=provider.fetch, args=(f"City {i}", "metric")) for i in range(4)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - start >= 0.05
+    assert provider.stats() == {'requests': 4, 'errors': 0, 'in_flight': 0, 'peak_in_flight': 4}
+
+
+def test_fake_error_injection_is_reproducible():
+    """Test that the same seed fails the same calls, as unavailable."""
+    def outcomes(provider):
+        results = []
+        for _ in range(50):
+            try:
+                provider.fetch("Boston", "metric")
+                results.append(True)
+            except WeatherProviderError as e:
+                assert e.unavailable
+                assert "503" in str(e)
+                results.append(False)
+        return results
+
+    first = outcomes(FakeWeatherProvider(error_rate=0.3, seed=1))
+
+    assert first == outcomes(FakeWeatherProvider(error_rate=0.3, seed=1))
+    assert 5 < first.count(False) < 30
+
+
+def test_fake_unknown_location():
+    """Test that an unknown location fails like a 404, which is not an outage."""
+    provider = FakeWeatherProvider(unknown_locations=["Atlantis"])
+
+    with pytest.raises(WeatherProviderError, match="404, city not found") as excinfo:
+        provider.fetch("atlantis", "metric")
+    assert not excinfo.value.unavailable
+    assert provider.stats()['errors'] == 1
+
+
+def test_fake_deadline_times_out():
+    """Test that a call slower than its deadline gives up at the deadline."""
+    provider = FakeWeatherProvider(latency_ms=500)
+    start = time.monotonic()
+
+    with pytest.raises(TimeoutError):
+        provider.fetch("Boston", "metric", deadline=0.05)
+    assert time.monotonic() - start < 0.3
+
+
+def test_fake_async_fetch_does_not_block():
+    """Test that concurrent async fetches overlap their latency on one event loop."""
+    provider = FakeWeatherProvider(latency_ms=50)
+
+    async def main():
+        return await asyncio.gather(*(provider.afetch(f"City {i}", "metric") for i in range(20)))
+
+    results = asyncio.run(main())
+
+    assert [result['name'] for result in results] == [f"City {i}" for i in range(20)]
+    assert provider.stats()['peak_in_flight'] == 20
+
+
+def test_invalid_fake_configuration():
+    """Test that impossible settings are rejected."""
+    with pytest.raises(ValueError, match="Invalid latency"):
+        FakeWeatherProvider(latency_ms=-1)
+    with pytest.raises(ValueError, match="Invalid error_rate"):
+        FakeWeatherProvider(error_rate=1.5)
+
+
+##########################################################
+# OpenWeatherMap provider
+##########################################################
+
+def test_openweathermap_unavailable_status(mocker, monkeypatch):
+    """Test that a retryable status is reported as the provider being unavailable."""
+    monkeypatch.setenv("api_key", "test")
+    get = mocker.patch("meal_max.utils.http_client.HttpClient.get")
+    get.return_value.status_code = 503
+    get.return_value.text = "busy"
+
+    with pytest.raises(WeatherProviderError, match="Failed to fetch current weather: 503, busy") as excinfo:
+        OpenWeatherMapProvider("http://weather.test").fetch("Boston", "metric", deadline=2)
+    assert excinfo.value.unavailable
+    assert get.call_args.kwargs == {'params': {'q': "Boston", 'appid': "test", 'units': "metric"}, 'deadline': 2}
+
+
+def test_openweathermap_requires_api_key(mocker, monkeypatch):
+    """Test that no request is sent without an API key."""
+    monkeypatch.delenv("api_key", raising=False)
+    get = mocker.patch("meal_max.utils.http_client.HttpClient.get")
+
+    with pytest.raises(ValueError, match="API key not found"):
+        OpenWeatherMapProvider().fetch("Boston", "metric")
+    get.assert_not_called()
+
+
+##########################################################
+# Selection
+##########################################################
+
+def test_incomplete_provider_cannot_be_instantiated():
+    """Test that a provider without an async fetch fails when built, not on first use."""
+    class SyncOnly(WeatherProvider):
+        def fetch(self, location, units, deadline=None):
+            return {}
+
+    with pytest.raises(TypeError, match="abstract"):
+        SyncOnly()
+
+
+def test_create_weather_provider_from_environment(monkeypatch):
+    """Test that the fake is configured from its environment variables."""
+    monkeypatch.setenv("FAKE_WEATHER_LATENCY_MS", "25")
+    monkeypatch.setenv("FAKE_WEATHER_ERROR_RATE", "0.5")
+    monkeypatch.setenv("FAKE_WEATHER_UNKNOWN_LOCATIONS", "Atlantis,El Dorado")
+    monkeypatch.setenv("WEATHER_API_URL", "http://weather.test")
+
+    fake = create_weather_provider("fake")
+    assert (fake.latency, fake.error_rate, fake.unknown_locations) == (0.025, 0.5, {"atlantis", "el dorado"})
+    assert create_weather_provider("openweathermap").url == "http://weather.test"
+    with pytest.raises(ValueError, match="Invalid weather provider: darksky"):
+        create_weather_provider("darksky")
+
+
+def test_get_weather_provider_uses_configured_name(monkeypatch):
+    """Test that the shared provider is built from WEATHER_PROVIDER once, and can be replaced."""
+    monkeypatch.setattr(weather_providers, "WEATHER_PROVIDER", "fake")
+    set_weather_provider(None)
+    try:
+        provider = get_weather_provider()
+        assert isinstance(provider, FakeWeatherProvider)
+        assert get_weather_provider() is provider
+
+        replacement = FakeWeatherProvider()
+        set_weather_provider(replacement)
+        assert get_weather_provider() is replacement
+    finally:
+        set_weather_provider(None)
@@ -0,0 +1,120 @@
+import sqlite3
+import time
+
+import pytest
+
+from meal_max.models import location_model
+from meal_max.models.weather_refresh import WeatherRefresher
+from meal_max.utils.scheduling import RecentAccesses
+
+
+WEATHER = {'weather': [{'main': 'Rain', 'description': 'light rain'}], 'main': {'temp': 9, 'humidity': 80}}
+
+
+@pytest.fixture
+def locations(sqlite_db):
+    """Five live locations fetched an hour ago plus one deleted location."""
+    stale = time.time() - 3600
+    with sqlite3.connect(sqlite_db) as conn:
+        conn.executemany(
+            "INSERT INTO locations (locations, weather, weather_updated_at, deleted) VALUES (?, ?, ?, ?)",
+            [(f"City {i}", "old", stale + i, False) for i in range(5)] + [("Gone", "old", stale, True)])
+    return sqlite_db
+
+
+@pytest.fixture
+def mock_fetch(mocker):
+    fetched = []
+
+    def fake_fetch(location, units="metric"):
+        fetched.append(location)
+        if location == "City 3":
+            raise Exception("Failed to fetch current weather: 500, upstream error")
+        return WEATHER
+    mocker.patch("meal_max.models.location_model.fetch_current_weather", side_effect=fake_fetch)
+    mocker.patch("meal_max.models.location_model.recent_reads", RecentAccesses())
+    return fetched
+
+
+def make_refresher(**kwargs):
+    kwargs.setdefault("interval", 600)
+    kwargs.setdefault("rate", 1000)
+    kwargs.setdefault("burst", 1000)
+    return WeatherRefresher(**kwargs)
+
+
+def rows(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {name: (weather, updated_at) for name, weather, updated_at in
+                conn.execute("SELECT locations, weather, weather_updated_at FROM locations")}
+
+
+def test_run_once_refreshes_stale_locations(locations, mock_fetch):
+    """Test that a cycle refetches every stale live location and writes the results back."""
+    before = time.time()
+    result = make_refresher(batch_size=2).run_once()
+
+    assert result == {'due': 5, 'refreshed': 4, 'failed': 1, 'written': 4}
+    assert sorted(mock_fetch) == [f"City {i}" for i in range(5)]
+    stored = rows(locations)
+    assert stored["City 0"][0].startswith("Rain (light rain)")
+    assert stored["City 0"][1] >= before
+    # The failed fetch keeps its old weather, and deleted locations are never refreshed
+    assert stored["City 3"][0] == "old"
+    assert stored["Gone"][0] == "old"
+
+
+def test_run_once_skips_fresh_locations(locations, mock_fetch):
+    """Test that locations refreshed within the interval are left alone."""
+    refresher = make_refresher()
+    refresher.run_once()
+    mock_fetch.clear()
+
+    result = refresher.run_once()
+
+    assert result['due'] == 1  # only the location whose fetch failed
+    assert mock_fetch == ["City 3"]
+
+
+def test_recently_read_locations_come_first(locations, mock_fetch):
+    """Test that recently read locations are refreshed ahead of staler ones."""
+    location_model.recent_reads.touch(5)
+    location_model.recent_reads.touch(4)
+
+    due = location_model.get_locations_due_for_refresh(time.time(), 3, location_model.recent_reads.recent(60))
+
+    assert due == [(4, "City 3"), (5, "City 4"), (1, "City 0")]
+
+
+def test_refresh_populates_weather_cache(locations, mock_fetch):
+    """Test that refreshed responses also warm the request-path cache."""
+    location_model.weather_cache.clear()
+
+    make_refresher().run_once()
+
+    assert location_model.weather_cache.get(("city 0", "metric")) == WEATHER
+
+
+def test_get_weather_for_location_records_reads(locations, mock_fetch):
+    """Test that reading a location's weather marks it as recently read without fetching."""
+    weather = location_model.get_weather_for_location(2)
+
+    assert weather == "old"
+    assert location_model.recent_reads.recent(60) == [2]
+    assert mock_fetch == []
+
+
+def test_start_and_stop(locations, mock_fetch):
+    """Test that the background thread runs a cycle and stops cleanly."""
+    refresher = make_refresher(check_interval=60)
+    refresher.start()
+    deadline = time.monotonic() + 5
+    while refresher.stats()['cycles'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    refresher.stop(timeout=5)
+
+    stats = refresher.stats()
+    assert stats['cycles'] == 1
+    assert stats['refreshed'] == 4
+    assert stats['failed'] == 1
+    assert stats['running'] is False
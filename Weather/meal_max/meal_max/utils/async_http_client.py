@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from meal_max.utils.http_client import RETRY_STATUSES, LatencyHistogram
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class AsyncHttpClient:
+    """
+    Outbound HTTP client for the async (ASGI) routes.
+
+    One ``aiohttp.ClientSession`` keeps pooled keep-alive connections, and at most
+    ``max_in_flight`` requests are sent at once; further callers wait on a
+    semaphore without holding a thread, so one event loop can carry thousands
+    of pending upstream calls. Retries, backoff and per-host latency
+    histograms behave like the synchronous HttpClient.
+
+    Create it inside the event loop that will use it.
+    """
+
+    def __init__(self,
+                 max_in_flight: int = 1000,
+                 keepalive_timeout: float = 15.0,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.1,
+                 backoff_max: float = 2.0):
+        """
+        Initializes the client.
+
+        Args:
+            max_in_flight (int): Maximum concurrent requests, and open connections.
+            keepalive_timeout (float): Seconds an idle connection is kept for reuse.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait for response data.
+            max_retries (int): Retries after the first attempt.
+            backoff_factor (float): Base delay in seconds for the backoff.
+            backoff_max (float): Upper bound of a single backoff delay.
+
+        Raises:
+            ValueError: If max_in_flight is less than 1.
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"Invalid max_in_flight: {max_in_flight}. Must be at least 1.")
+        self.max_in_flight = max_in_flight
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        # The semaphore does the queueing, so the connection pool never makes a request wait
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_in_flight, keepalive_timeout=keepalive_timeout),
+            timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout))
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._histograms_lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+
+    def _histogram(self, host: str) -> LatencyHistogram:
+        with self._histograms_lock:
+            histogram = self._histograms.get(host)
+            if histogram is None:
+                histogram = self._histograms[host] = LatencyHistogram()
+            return histogram
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def _give_up(self, attempt: int, delay: float, expires: Optional[float]) -> bool:
+        # No retries left, or the backoff alone would run past the deadline
+        return attempt >= self.max_retries or (expires is not None and time.monotonic() + delay >= expires)
+
+    async def request(self, method: str, url: str, deadline: Optional[float] = None,
+                      **kwargs) -> aiohttp.ClientResponse:
+        """
+        Sends a request, retrying transient failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            deadline (float, optional): Seconds the whole call may take, waiting
+                for a slot, retries and backoff included.
+            **kwargs: Passed through to ``aiohttp.ClientSession.request``.
+
+        Returns:
+            aiohttp.ClientResponse: The last response received. Its body is
+            already read and its connection released, so ``await response.json()``
+            and ``await response.text()`` do no I/O.
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError: If every attempt failed, or the deadline passed.
+        """
+        expires = time.monotonic() + deadline if deadline is not None else None
+        histogram = self._histogram(urlsplit(url).netloc)
+
+        attempt = 0
+        while True:
+            self.waiting += 1
+            try:
+                await self._acquire(expires)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            delay = self._backoff(attempt)
+            start = time.perf_counter()
+            try:
+                if expires is not None:
+                    kwargs["timeout"] = aiohttp.ClientTimeout(total=max(expires - time.monotonic(), 0.001),
+                                                              sock_connect=self.connect_timeout,
+                                                              sock_read=self.read_timeout)
+                async with self.session.request(method, url, **kwargs) as response:
+                    await response.read()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                histogram.observe(time.perf_counter() - start)
+                if self._give_up(attempt, delay, expires):
+                    raise
+                logger.warning("%s %s failed (%s), retrying", method, url, e)
+            else:
+                histogram.observe(time.perf_counter() - start)
+                if response.status not in RETRY_STATUSES or self._give_up(attempt, delay, expires):
+                    return response
+                logger.warning("%s %s returned %s, retrying", method, url, response.status)
+            finally:
+                self.in_flight -= 1
+                self._semaphore.release()
+            # Back off without holding a slot
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _acquire(self, expires: Optional[float]) -> None:
+        if expires is None:
+            await self._semaphore.acquire()
+        else:
+            await asyncio.wait_for(self._semaphore.acquire(), max(expires - time.monotonic(), 0))
+
+    async def get(self, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """
+        Sends a GET request. See ``request``.
+        """
+        return await self.request("GET", url, **kwargs)
+
+    def latency_stats(self) -> dict[str, dict]:
+        """
+        Returns the latency histogram of every host contacted so far.
+
+        Returns:
+            dict: Histogram snapshots keyed by host.
+        """
+        with self._histograms_lock:
+            histograms = dict(self._histograms)
+        return {host: histogram.snapshot() for host, histogram in histograms.items()}
+
+    def stats(self) -> dict:
+        """
+        Returns the concurrency metrics.
+
+        Returns:
+            dict: max_in_flight, requests in flight, and requests waiting for a slot.
+        """
+        return {'max_in_flight': self.max_in_flight, 'in_flight': self.in_flight, 'waiting': self.waiting}
+
+    async def aclose(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        await self.session.close()
+
+
+_client: Optional[AsyncHttpClient] = None
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    """
+    Returns the async HTTP client of this process, creating it from the environment on first use.
+
+    Must be called from the event loop serving the async routes.
+
+    Returns:
+        AsyncHttpClient: The shared client.
+    """
+    global _client
+    if _client is None:
+        _client = AsyncHttpClient(
+            max_in_flight=int(os.getenv("ASYNC_HTTP_MAX_IN_FLIGHT", "1000")),
+            keepalive_timeout=float(os.getenv("ASYNC_HTTP_KEEPALIVE_TIMEOUT", "15")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+            max_retries=int(os.getenv("HTTP_MAX_RETRIES", "2")),
+            backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", "0.1")),
+        )
+    return _client
+
+def peek_async_http_client() -> Optional[AsyncHttpClient]:
+    """
+    Returns the async HTTP client if it has been created, without creating it.
+
+    Returns:
+        AsyncHttpClient or None: The shared client.
+    """
+    return _client
+
+async def close_async_http_client() -> None:
+    """
+    Closes and forgets the shared client, e.g. when the event loop shuts down.
+    """
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from typing import Callable
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised instead of calling a dependency while its circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker guarding calls to one upstream dependency.
+
+    While closed, calls go through and consecutive failures are counted.
+    After ``failure_threshold`` of them the circuit opens and every call is
+    rejected with CircuitOpenError, without waiting on the dependency, for
+    ``recovery_timeout`` seconds. Then it is half-open: at most
+    ``half_open_max_calls`` probe calls are let through, and the first
+    outcome closes the circuit again or reopens it for another
+    ``recovery_timeout``.
+
+    Callers report outcomes themselves, so they decide what counts as a
+    failure (an HTTP 503 does, a 404 for an unknown city does not):
+
+        breaker.before_call()
+        try:
+            response = send()
+        except Exception:
+            breaker.record_failure()
+            raise
+        ...
+    """
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = 5,
+                 recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the breaker, closed.
+
+        Args:
+            name (str): Name of the dependency, used in logs and errors.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            recovery_timeout (float): Seconds the circuit stays open before probing.
+            half_open_max_calls (int): Probe calls allowed at once while half-open.
+            clock (Callable): Monotonic time source, replaceable in tests.
+
+        Raises:
+            ValueError: If failure_threshold or half_open_max_calls is less than 1, or recovery_timeout is negative.
+        """
+        if failure_threshold < 1:
+            raise ValueError(f"Invalid failure_threshold: {failure_threshold}. Must be at least 1.")
+        if half_open_max_calls < 1:
+            raise ValueError(f"Invalid half_open_max_calls: {half_open_max_calls}. Must be at least 1.")
+        if recovery_timeout < 0:
+            raise ValueError(f"Invalid recovery_timeout: {recovery_timeout}. Must be >= 0.")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self._transitions: dict[tuple[str, str], int] = {}
+
+    def _transition_locked(self, state: str) -> None:
+        previous, self._state = self._state, state
+        self._transitions[(previous, state)] = self._transitions.get((previous, state), 0) + 1
+        if state == OPEN:
+            self._opened_at = self._clock()
+            logger.warning("Circuit %s opened after %d consecutive failures, retrying in %.1fs",
+                           self.name, self.consecutive_failures, self.recovery_timeout)
+        else:
+            logger.info("Circuit %s is now %s (was %s)", self.name, state, previous)
+        self._probes = 0
+
+    def _current_state_locked(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._transition_locked(HALF_OPEN)
+        return self._state
+
+    @property
+    def state(self) -> str:
+        """
+        The current state: closed, open or half_open.
+        """
+        with self._lock:
+            return self._current_state_locked()
+
+    def before_call(self) -> None:
+        """
+        Admits a call, or rejects it without touching the dependency.
+
+        Every admitted call must be followed by record_success(), record_failure() or release().
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with every probe slot taken.
+        """
+        with self._lock:
+            state = self._current_state_locked()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self._opened_at + self.recovery_timeout - self._clock())
+        raise CircuitOpenError(f"{self.name} is unavailable (circuit {state}), retry in {retry_in:.1f}s")
+
+    def record_success(self) -> None:
+        """
+        Reports that an admitted call succeeded; a successful probe closes the circuit.
+        """
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._transition_locked(CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        Reports that an admitted call failed; a failed probe, or one failure too many, opens the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED
+                                             and self.consecutive_failures >= self.failure_threshold):
+                self._transition_locked(OPEN)
+
+    def release(self) -> None:
+        """
+        Reports that an admitted call ended without reaching the dependency, e.g. it was misconfigured.
+
+        Frees a half-open probe slot without deciding the circuit's state.
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def reset(self) -> None:
+        """
+        Closes the circuit and forgets the failure streak. Counters are left untouched.
+        """
+        with self._lock:
+            self._state = CLOSED
+            self._probes = 0
+            self.consecutive_failures = 0
+
+    def transitions(self) -> dict[tuple[str, str], int]:
+        """
+        Returns how often the circuit changed state.
+
+        Returns:
+            dict: Counts keyed by (from_state, to_state).
+        """
+        with self._lock:
+            return dict(self._transitions)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the breaker.
+
+        Returns:
+            dict: state, open, consecutive_failures, successes, failures and rejected.
+        """
+        with self._lock:
+            state = self._current_state_locked()
+            return {
+                'state': state,
+                'open': state == OPEN,
+                'consecutive_failures': self.consecutive_failures,
+                'successes': self.successes,
+                'failures': self.failures,
+                'rejected': self.rejected,
+            }
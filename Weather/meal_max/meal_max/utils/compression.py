@@ -0,0 +1,132 @@
+import gzip
+import logging
+import os
+import threading
+from typing import Optional
+
+from flask import Flask, request, Response
+
+from meal_max.utils.logger import configure_logger
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+# Bodies smaller than this many bytes are sent as is; compressing them costs more than it saves
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "4"))
+COMPRESS_MIMETYPES = {"application/json", "application/x-ndjson", "text/plain", "text/html"}
+
+
+class Compressor:
+    """
+    Negotiates and applies Content-Encoding to finished responses.
+
+    Only complete (non-streamed) 200 responses of a compressible type whose
+    body is at least ``min_size`` bytes are compressed, with br when the
+    client accepts it and brotli is installed, otherwise gzip. Compressed
+    responses get ``Vary: Accept-Encoding`` and their ETag is made weak, since
+    the bytes differ from the identity encoding while the content does not.
+    """
+
+    def __init__(self, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        """
+        Args:
+            min_size (int): Smallest body, in bytes, that is compressed.
+            gzip_level (int): gzip compression level, 1-9.
+            brotli_quality (int): brotli quality, 0-11.
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._lock = threading.Lock()
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def choose_encoding(self, accept_encoding) -> Optional[str]:
+        """
+        Picks the encoding to use from an Accept-Encoding header.
+
+        Args:
+            accept_encoding (werkzeug.datastructures.Accept): The parsed header, e.g. request.accept_encodings.
+
+        Returns:
+            str or None: "br", "gzip", or None to send the identity encoding.
+        """
+        return accept_encoding.best_match(self.encodings) if accept_encoding else None
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """
+        Compresses a body.
+
+        Args:
+            data (bytes): The body.
+            encoding (str): "br" or "gzip".
+
+        Returns:
+            bytes: The compressed body.
+        """
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def __call__(self, response: Response) -> Response:
+        if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+                or response.mimetype not in COMPRESS_MIMETYPES or "Content-Encoding" in response.headers):
+            return response
+        response.vary.add("Accept-Encoding")
+        if (response.content_length or 0) < self.min_size:
+            return response
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        body = self.compress(data, encoding)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        with self._lock:
+            self.compressed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(body)
+        return response
+
+    def stats(self) -> dict:
+        """
+        Returns the compression metrics.
+
+        Returns:
+            dict: responses compressed, and their total bytes before and after compression.
+        """
+        with self._lock:
+            return {'compressed': self.compressed, 'bytes_in': self.bytes_in, 'bytes_out': self.bytes_out}
+
+
+compressor = Compressor(min_size=COMPRESS_MIN_SIZE, gzip_level=COMPRESS_GZIP_LEVEL,
+                        brotli_quality=COMPRESS_BROTLI_QUALITY)
+
+
+def init_app(app: Flask) -> None:
+    """
+    Compresses the app's responses if COMPRESS_ENABLED is set.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    if COMPRESS_ENABLED:
+        app.after_request(compressor)
+        logger.info("Response compression enabled (%s, min %d bytes)", "/".join(compressor.encodings),
+                    compressor.min_size)
@@ -0,0 +1,258 @@
+import atexit
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# File the weather export is appended to; empty disables the export
+WEATHER_EXPORT_PATH = os.getenv("WEATHER_EXPORT_PATH", "")
+WEATHER_EXPORT_MAX_BYTES = int(os.getenv("WEATHER_EXPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+WEATHER_EXPORT_BACKUP_COUNT = int(os.getenv("WEATHER_EXPORT_BACKUP_COUNT", "5"))
+WEATHER_EXPORT_COMPRESS = os.getenv("WEATHER_EXPORT_COMPRESS", "true").lower() == "true"
+# Records waiting for the writer; when full new records are dropped
+WEATHER_EXPORT_QUEUE_SIZE = int(os.getenv("WEATHER_EXPORT_QUEUE_SIZE", "10000"))
+WEATHER_EXPORT_BATCH_SIZE = int(os.getenv("WEATHER_EXPORT_BATCH_SIZE", "500"))
+# Seconds a record may wait before a partial batch is written
+WEATHER_EXPORT_FLUSH_INTERVAL = float(os.getenv("WEATHER_EXPORT_FLUSH_INTERVAL", "1.0"))
+
+
+class JsonlExporter:
+    """
+    Appends records to a rotating JSON Lines file from a background thread.
+
+    export() only puts the record on a bounded queue, so callers never touch
+    the disk and memory use is capped at ``queue_size`` records; when the
+    queue is full further records are dropped and counted. The writer thread
+    writes up to ``batch_size`` records per write and flushes after every
+    batch. When the file grows past ``max_bytes`` it is renamed to
+    ``<path>.1`` (gzip-compressed to ``<path>.1.gz`` when ``compress`` is set),
+    older files shift up, and at most ``backup_count`` of them are kept.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backup_count: int = 5,
+                 compress: bool = True, queue_size: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0):
+        """
+        Initializes the exporter and starts its writer thread.
+
+        Args:
+            path (str): The JSON Lines file to append to.
+            max_bytes (int): Size at which the file is rotated; 0 disables rotation.
+            backup_count (int): Rotated files kept.
+            compress (bool): Whether rotated files are gzip-compressed.
+            queue_size (int): Maximum records waiting for the writer.
+            batch_size (int): Maximum records written per batch.
+            flush_interval (float): Seconds to wait for a batch to fill up.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stopping = False
+        self.exported = 0
+        self.dropped = 0
+        self.batches = 0
+        self.rotations = 0
+        self.errors = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="weather-export", daemon=True)
+        self._thread.start()
+
+    def export(self, record: dict) -> bool:
+        """
+        Queues a record for the writer without blocking.
+
+        Args:
+            record (dict): A JSON-serializable record.
+
+        Returns:
+            bool: True if the record was queued, False if it was dropped.
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _next_batch(self) -> Optional[list]:
+        # Blocks for the first record, then collects more until the batch is full or the interval passes
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                record = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is None:
+                self._stopping = True  # write this batch, then stop
+                break
+            batch.append(record)
+        return batch
+
+    def _rotated_name(self, index: int) -> str:
+        return f"{self.path}.{index}" + (".gz" if self.compress else "")
+
+    def _rotate(self) -> None:
+        if self.backup_count < 1:
+            os.remove(self.path)
+        else:
+            for index in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(self._rotated_name(index)):
+                    os.replace(self._rotated_name(index), self._rotated_name(index + 1))
+            if self.compress:
+                with open(self.path, "rb") as src, gzip.open(self._rotated_name(1), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self._rotated_name(1))
+        with self._lock:
+            self.rotations += 1
+        logger.info("Rotated export file %s", self.path)
+
+    def _write(self, batch: list) -> None:
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in batch)
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+            size = fh.tell()
+        with self._lock:
+            self.exported += len(batch)
+            self.batches += 1
+        if self.max_bytes and size >= self.max_bytes:
+            self._rotate()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                self._write(batch)
+            except (OSError, TypeError, ValueError) as e:
+                logger.error("Failed to export %d records to %s: %s", len(batch), self.path, e)
+                with self._lock:
+                    self.errors += 1
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Writes every queued record, then stops the writer thread.
+
+        If the writer cannot drain the queue in time, close() returns after
+        ``timeout`` seconds anyway and the records still queued are counted as
+        dropped.
+
+        Args:
+            timeout (float): Seconds to wait for the writer; None waits indefinitely.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            # The stop marker needs a free slot, which a stuck writer never makes
+            self._queue.put(None, timeout=timeout)
+            marker = 1
+        except queue.Full:
+            marker = 0
+        else:
+            self._thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+            if not self._thread.is_alive():
+                return
+        pending = max(self._queue.qsize() - marker, 0)
+        with self._lock:
+            self.dropped += pending
+        logger.warning("Export writer for %s did not finish within %.1fs, dropping %d queued records",
+                       self.path, timeout, pending)
+
+    def stats(self) -> dict:
+        """
+        Returns the exporter metrics.
+
+        Returns:
+            dict: queued records, exported, dropped, batch, rotation and error counts.
+        """
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'exported': self.exported,
+                'dropped': self.dropped,
+                'batches': self.batches,
+                'rotations': self.rotations,
+                'errors': self.errors,
+            }
+
+
+_weather_exporter: Optional[JsonlExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_weather_exporter() -> Optional[JsonlExporter]:
+    """
+    Returns the process-wide weather exporter, starting it on first use.
+
+    Returns:
+        JsonlExporter or None: The exporter, or None if WEATHER_EXPORT_PATH is not set.
+    """
+    global _weather_exporter
+    if not WEATHER_EXPORT_PATH:
+        return None
+    if _weather_exporter is None:
+        with _exporter_lock:
+            if _weather_exporter is None:
+                _weather_exporter = JsonlExporter(
+                    WEATHER_EXPORT_PATH,
+                    max_bytes=WEATHER_EXPORT_MAX_BYTES,
+                    backup_count=WEATHER_EXPORT_BACKUP_COUNT,
+                    compress=WEATHER_EXPORT_COMPRESS,
+                    queue_size=WEATHER_EXPORT_QUEUE_SIZE,
+                    batch_size=WEATHER_EXPORT_BATCH_SIZE,
+                    flush_interval=WEATHER_EXPORT_FLUSH_INTERVAL,
+                )
+                atexit.register(_weather_exporter.close, 5.0)
+    return _weather_exporter
+
+def reset_weather_exporter() -> None:
+    """
+    Forgets the shared exporter without waiting for it, e.g. in a forked
+    worker whose writer thread did not survive the fork. The next call to
+    get_weather_exporter() starts a new one.
+    """
+    global _weather_exporter
+    with _exporter_lock:
+        _weather_exporter = None
+
+def export_weather(record: dict) -> None:
+    """
+    Queues a weather record for export if the export is enabled.
+
+    Args:
+        record (dict): The record, e.g. a created location with its weather.
+    """
+    exporter = get_weather_exporter()
+    if exporter is not None:
+        exporter.export(record)
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Seconds a readiness result is reused, so frequent probes from many orchestrators cost one check per TTL
+READINESS_CACHE_TTL = float(os.getenv("READINESS_CACHE_TTL", "5"))
+# Weather or refresher cycles older than this many refresh intervals count as stale
+READINESS_STALE_FACTOR = float(os.getenv("READINESS_STALE_FACTOR", "3"))
+# Whether stale weather takes the replica out of rotation; by default it is only reported as degraded,
+# since an upstream weather outage affects every replica alike
+READINESS_REQUIRE_FRESH_WEATHER = os.getenv("READINESS_REQUIRE_FRESH_WEATHER", "false").lower() == "true"
+
+
+class ReadinessProbe:
+    """
+    Runs the readiness checks and caches the outcome for ``ttl`` seconds.
+
+    Probes arriving while the result is fresh are answered from the cache,
+    and concurrent probes after it expires wait for a single evaluation, so
+    probing never multiplies database work. A failing critical check makes
+    the replica unready; a failing non-critical check only marks it degraded.
+    """
+
+    def __init__(self, ttl: float = 5.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl (float): Seconds a result is reused; 0 evaluates the checks on every probe.
+            clock (Callable): Monotonic time source, replaceable in tests.
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._checks: list[tuple[str, Callable[[], tuple[bool, dict]], bool]] = []
+        self._lock = threading.Lock()
+        self._result: Optional[dict] = None
+        self._expires = 0.0
+        self.evaluations = 0
+        self.cached = 0
+        self.failures = 0
+
+    def add_check(self, name: str, check: Callable[[], tuple[bool, dict]], critical: bool = True) -> None:
+        """
+        Registers a check.
+
+        Args:
+            name (str): Key of the check in the result.
+            check (Callable): Returns (ok, details); an exception counts as a failure.
+            critical (bool): Whether a failure makes the replica unready rather than degraded.
+        """
+        self._checks.append((name, check, critical))
+
+    def _evaluate(self) -> dict:
+        checks = {}
+        status = "ready"
+        for name, check, critical in self._checks:
+            try:
+                ok, details = check()
+            except Exception as e:
+                ok, details = False, {'error': str(e)}
+            checks[name] = {'ok': ok, **details}
+            if not ok:
+                if critical:
+                    status = "unready"
+                elif status == "ready":
+                    status = "degraded"
+        return {'status': status, 'checks': checks, 'checked_at': time.time()}
+
+    def check(self) -> dict:
+        """
+        Returns the readiness of this replica, evaluating the checks if the cached result expired.
+
+        Returns:
+            dict: status ("ready", "degraded" or "unready"), the details of each
+            check, and when they were evaluated (unix time).
+        """
+        if self._result is not None and self._clock() < self._expires:
+            self.cached += 1
+            return self._result
+        with self._lock:
+            # Another probe may have refreshed the result while this one waited
+            if self._result is not None and self._clock() < self._expires:
+                self.cached += 1
+                return self._result
+            previous = self._result['status'] if self._result is not None else None
+            result = self._evaluate()
+            self.evaluations += 1
+            if result['status'] == "unready":
+                self.failures += 1
+            if result['status'] != previous:
+                log = logger.info if result['status'] == "ready" else logger.warning
+                log("Readiness changed to %s: %s", result['status'],
+                    ", ".join(name for name, details in result['checks'].items() if not details['ok']) or "all checks ok")
+            self._result = result
+            self._expires = self._clock() + self.ttl
+            return result
+
+    def clear(self) -> None:
+        """
+        Drops the cached result so the next probe evaluates the checks.
+        """
+        with self._lock:
+            self._result = None
+            self._expires = 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns the probe metrics.
+
+        Returns:
+            dict: whether the last result was ready (None before the first
+            probe), and the evaluation, cached answer and failure counters.
+        """
+        result = self._result
+        return {
+            'ready': None if result is None else result['status'] != "unready",
+            'evaluations': self.evaluations,
+            'cached': self.cached,
+            'failures': self.failures,
+        }
+
+
+def staleness(updated_at: Optional[float], limit: float, now: Optional[float] = None) -> tuple[bool, dict]:
+    """
+    Compares the age of a timestamp with a limit.
+
+    Args:
+        updated_at (float): Unix time of the last update, or None if there was none.
+        limit (float): Maximum acceptable age in seconds.
+        now (float): Current unix time; defaults to time.time().
+
+    Returns:
+        tuple: (ok, details) with the age and limit in seconds; a missing timestamp is ok.
+    """
+    if updated_at is None:
+        return True, {'age': None, 'limit': limit}
+    age = (time.time() if now is None else now) - updated_at
+    return age <= limit, {'age': round(age, 3), 'limit': limit}
+
+
+readiness = ReadinessProbe(ttl=READINESS_CACHE_TTL)
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+import threading
+import time
+from typing import Callable, Optional
+
+from flask import request, Response
+from werkzeug.http import is_resource_modified
+
+
+class ConditionalStats:
+    """
+    Counts conditional GET outcomes of the cacheable read routes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.conditional = 0
+        self.not_modified = 0
+
+    def record(self, conditional: bool, not_modified: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.conditional += conditional
+            self.not_modified += not_modified
+
+    def stats(self) -> dict:
+        """
+        Returns the counters.
+
+        Returns:
+            dict: requests served, how many carried a validator, and how many were answered with 304.
+        """
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'conditional': self.conditional,
+                'not_modified': self.not_modified,
+            }
+
+
+conditional_stats = ConditionalStats()
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a strong entity tag from the parts that identify a representation and its version.
+
+    Args:
+        *parts: e.g. the route name, row id and row version.
+
+    Returns:
+        str: The unquoted entity tag.
+    """
+    return "-".join(str(part) for part in parts)
+
+def max_age(updated_at: float, interval: float, now: Optional[float] = None) -> int:
+    """
+    Returns how long a client may reuse a response before the data is due to be refreshed.
+
+    Args:
+        updated_at (float): Unix time the data was last written; 0 if unknown.
+        interval (float): Seconds between refreshes of the data.
+        now (float): Current unix time, injectable for tests.
+
+    Returns:
+        int: Seconds, between 0 and interval.
+    """
+    if not updated_at:
+        return 0
+    now = time.time() if now is None else now
+    return int(max(0.0, min(interval, updated_at + interval - now)))
+
+def conditional_response(etag: str, updated_at: float, max_age_seconds: int,
+                         build: Callable[[], Response], now: Optional[float] = None) -> Response:
+    """
+    Answers a GET with 304 Not Modified if the client's copy is current, otherwise with build().
+
+    The validators are checked before build() is called, so a 304 never
+    reads or serializes the body. Both responses carry the ETag,
+    Last-Modified and Cache-Control headers.
+
+    If-None-Match takes precedence over If-Modified-Since. HTTP dates have
+    whole-second resolution, so Last-Modified is only sent, and
+    If-Modified-Since only honoured, once the second of the last write is
+    over; until then a second write could share the same date.
+
+    Args:
+        etag (str): The current entity tag, from make_etag().
+        updated_at (float): Unix time the data was last written; 0 omits Last-Modified.
+        max_age_seconds (int): Cache-Control max-age.
+        build (Callable): Builds the full response.
+        now (float): Current unix time, injectable for tests.
+
+    Returns:
+        Response: The 304 or the built response.
+    """
+    now = time.time() if now is None else now
+    last_modified = None
+    if updated_at and int(updated_at) < int(now):
+        last_modified = datetime.fromtimestamp(int(updated_at), tz=timezone.utc)
+    conditional = 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers
+    modified = not conditional or is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+    conditional_stats.record(conditional, not modified)
+
+    response = build() if modified else Response(status=304)
+    if response.status_code in (200, 304):
+        response.set_etag(etag)
+        # Assigning None would send the current time, so the header is left out instead
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age_seconds
+    return response
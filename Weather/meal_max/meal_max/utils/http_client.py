@@ -0,0 +1,232 @@
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class LatencyHistogram:
+    """
+    Thread-safe cumulative latency histogram with fixed bucket bounds.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            seconds (float): The observed latency in seconds.
+        """
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += seconds
+
+    def snapshot(self) -> dict:
+        """
+        Returns the histogram as cumulative bucket counts.
+
+        Returns:
+            dict: ``buckets`` mapping each upper bound (and "+Inf") to the number
+            of observations at or below it, plus ``count`` and ``sum``.
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            running += count
+            cumulative[str(bound)] = running
+        return {'buckets': cumulative, 'count': running, 'sum': total}
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP client with pooled keep-alive connections.
+
+    Every request goes through one ``requests.Session`` so TCP and TLS
+    connections are reused across calls. Connection errors, timeouts and
+    retryable status codes are retried with full-jitter exponential backoff,
+    and the latency of every attempt is recorded per host.
+    """
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 20,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 10.0,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.1,
+                 backoff_max: float = 2.0):
+        """
+        Initializes the client.
+
+        Args:
+            pool_connections (int): Number of per-host connection pools to keep.
+            pool_maxsize (int): Maximum keep-alive connections per host.
+            connect_timeout (float): Seconds to wait for a connection.
+            read_timeout (float): Seconds to wait for response data.
+            max_retries (int): Retries after the first attempt.
+            backoff_factor (float): Base delay in seconds for the backoff.
+            backoff_max (float): Upper bound of a single backoff delay.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._histograms_lock = threading.Lock()
+
+    def _histogram(self, host: str) -> LatencyHistogram:
+        with self._histograms_lock:
+            histogram = self._histograms.get(host)
+            if histogram is None:
+                histogram = self._histograms[host] = LatencyHistogram()
+            return histogram
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_factor * (2 ** attempt)))
+
+    def _give_up(self, attempt: int, delay: float, expires: Optional[float]) -> bool:
+        # No retries left, or the backoff alone would run past the deadline
+        return attempt >= self.max_retries or (expires is not None and time.monotonic() + delay >= expires)
+
+    def request(self, method: str, url: str, deadline: Optional[float] = None, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying transient failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The request URL.
+            deadline (float, optional): Seconds the whole call may take, retries
+                and backoff included. Each attempt's timeouts are cut to the time
+                left, and no retry is started that could not finish in time.
+            **kwargs: Passed through to ``requests.Session.request``. ``timeout``
+                defaults to the client's (connect, read) timeouts.
+
+        Returns:
+            requests.Response: The last response received.
+
+        Raises:
+            requests.exceptions.RequestException: If every attempt failed, or the deadline passed.
+        """
+        timeout = kwargs.pop("timeout", self.timeout)
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        expires = time.monotonic() + deadline if deadline is not None else None
+        histogram = self._histogram(urlsplit(url).netloc)
+
+        attempt = 0
+        while True:
+            if expires is not None:
+                remaining = expires - time.monotonic()
+                if remaining <= 0:
+                    raise requests.exceptions.Timeout(f"{method} {url} exceeded its {deadline}s deadline")
+                kwargs["timeout"] = tuple(remaining if t is None else min(t, remaining) for t in timeout)
+            else:
+                kwargs["timeout"] = timeout
+            delay = self._backoff(attempt)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                histogram.observe(time.perf_counter() - start)
+                if self._give_up(attempt, delay, expires):
+                    raise
+                logger.warning("%s %s failed (%s), retrying", method, url, e)
+            else:
+                histogram.observe(time.perf_counter() - start)
+                if response.status_code not in RETRY_STATUSES or self._give_up(attempt, delay, expires):
+                    return response
+                logger.warning("%s %s returned %s, retrying", method, url, response.status_code)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request. See ``request``.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def latency_stats(self) -> dict[str, dict]:
+        """
+        Returns the latency histogram of every host contacted so far.
+
+        Returns:
+            dict: Histogram snapshots keyed by host.
+        """
+        with self._histograms_lock:
+            histograms = dict(self._histograms)
+        return {host: histogram.snapshot() for host, histogram in histograms.items()}
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections.
+        """
+        self.session.close()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Returns the process-wide HTTP client, creating it from the environment on first use.
+
+    Returns:
+        HttpClient: The shared client.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(
+                    pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", "10")),
+                    pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+                    connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05")),
+                    read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "10")),
+                    max_retries=int(os.getenv("HTTP_MAX_RETRIES", "2")),
+                    backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", "0.1")),
+                )
+    return _client
+
+def reset_http_client() -> None:
+    """
+    Forgets the shared client without closing it, e.g. in a forked worker that
+    must not reuse the parent's sockets. The next get_http_client() call
+    creates a new one.
+    """
+    global _client
+    with _client_lock:
+        _client = None
@@ -1,26 +1,236 @@
+import atexit
+from collections import OrderedDict
+import json
 import logging
+import logging.handlers
+import os
+import queue
+import random
 import sys
+import threading
+import time
+from typing import Optional
 
-from flask import current_app, has_request_context
 
+# Default level for every meal_max logger, e.g. INFO
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+# Per-logger overrides, e.g. "meal_max.utils.sql_utils=WARNING,meal_max.models=INFO"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# "text" or "json"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Records per second allowed from a single call site; 0 disables rate limiting
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "0"))
+# Fraction of DEBUG/INFO records kept; warnings and errors are never sampled
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+# Bound on records waiting for the background writer; when full new records are dropped
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
 
-def configure_logger(logger):
-    logger.setLevel(logging.DEBUG)  # Set the desired logging level here
+ROOT_LOGGER = "meal_max"
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each record as a single-line JSON object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per call site (logger and message template).
+
+    Each call site may emit ``rate`` records per second with bursts of up to
+    ``burst`` records; anything beyond that is dropped and counted. A record
+    logged with %-style arguments is keyed by its template; one whose message
+    was formatted by the caller (e.g. an f-string) is keyed by its source
+    line, so varying text does not create a new bucket per message. At most
+    ``max_sites`` buckets are kept, evicting the least recently used.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, max_sites: int = 1024):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.max_sites = max_sites
+        self._buckets: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.args:
+            key = (record.name, record.msg)
+        else:
+            key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_sites:
+                # The evicted site starts again with a full bucket, as after an idle spell
+                self._buckets.popitem(last=False)
+            if not allowed:
+                self.suppressed += 1
+            return allowed
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a random fraction of records below WARNING.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or random.random() < self.rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller: when the queue is full the record is dropped.
+    """
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments here (they may change after the call returns);
+        # timestamp formatting and traceback rendering happen on the writer thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
-    # Create a console handler that logs to stderr
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setLevel(logging.DEBUG)
 
-    # Create a formatter with a timestamp
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_lock = threading.Lock()
+_queue_handler: Optional[_DroppingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_external_loggers: set = set()
 
-    # Add the formatter to the handler
-    handler.setFormatter(formatter)
 
-    # Add the handler to the logger
-    logger.addHandler(handler)
+def _parse_levels(spec: str) -> dict[str, str]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _level_for(name: str, levels: dict[str, str]) -> str:
+    # The most specific configured prefix wins
+    while name:
+        if name in levels:
+            return levels[name]
+        name = name.rpartition(".")[0]
+    return LOG_LEVEL
+
+
+def _make_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def setup_logging() -> logging.Handler:
+    """
+    Installs the shared, non-blocking log pipeline. Safe to call any number of times.
+
+    Records are put on a bounded queue by a QueueHandler on the calling thread
+    and formatted and written to stderr by a QueueListener thread, so request
+    threads never wait on stderr.
+
+    Returns:
+        logging.Handler: The shared queue handler.
+    """
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(_make_formatter())
+
+        log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = _DroppingQueueHandler(log_queue)
+        if LOG_RATE_LIMIT > 0:
+            handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT))
+        if LOG_SAMPLE_RATE < 1:
+            handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.addHandler(handler)
+        root.propagate = False
+        root.setLevel(_level_for(ROOT_LOGGER, _parse_levels(LOG_LEVELS)))
+        _queue_handler = handler
+        return handler
+
+def shutdown_logging() -> None:
+    """
+    Stops the background writer after flushing queued records.
+    """
+    global _queue_handler, _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+        if _queue_handler is not None:
+            for logger in [logging.getLogger(ROOT_LOGGER)] + list(_external_loggers):
+                logger.removeHandler(_queue_handler)
+        _listener = None
+        _queue_handler = None
+        _external_loggers.clear()
+
+def restart_logging() -> None:
+    """
+    Rebuilds the pipeline, e.g. in a forked worker where the writer thread did not survive.
+    """
+    external = list(_external_loggers)
+    shutdown_logging()
+    for logger in external:
+        configure_logger(logger)
+
+
+def configure_logger(logger):
+    """
+    Sets a logger's level and connects it to the shared log pipeline.
+
+    Loggers under ``meal_max`` reach the pipeline by propagation; any other
+    logger (for example the Flask app logger) gets the shared queue handler
+    attached once. Calling this repeatedly never adds duplicate handlers.
 
-    if has_request_context():
-        app_logger = current_app.logger
-        for handler in app_logger.handlers:
-            logger.addHandler(handler)
\ No newline at end of file
+    Args:
+        logger (logging.Logger): The logger to configure.
+    """
+    handler = setup_logging()
+    logger.setLevel(_level_for(logger.name, _parse_levels(LOG_LEVELS)))
+    if logger.name != ROOT_LOGGER and not logger.name.startswith(ROOT_LOGGER + "."):
+        with _lock:
+            if handler not in logger.handlers:
+                logger.addHandler(handler)
+            logger.propagate = False
+            _external_loggers.add(logger)
@@ -0,0 +1,294 @@
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+from flask import Flask, g, request, Response
+
+from meal_max.utils import sql_utils
+from meal_max.utils.http_client import LatencyHistogram
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# Fraction of requests and queries whose latency is timed; 0 turns timing off, counters are always kept
+METRICS_SAMPLE_RATE = float(os.getenv("METRICS_SAMPLE_RATE", "1.0"))
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|TABLE|JOIN)\s+(\w+)", re.IGNORECASE)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+def histogram_lines(name: str, labels: dict, snapshot: dict) -> list[str]:
+    """
+    Formats a LatencyHistogram snapshot as Prometheus histogram samples.
+
+    Args:
+        name (str): The metric name.
+        labels (dict): Labels of this series.
+        snapshot (dict): From LatencyHistogram.snapshot().
+
+    Returns:
+        list[str]: The _bucket, _sum and _count lines.
+    """
+    lines = [f"{name}_bucket{_format_labels({**labels, 'le': bound})} {count}"
+             for bound, count in snapshot['buckets'].items()]
+    lines.append(f"{name}_sum{_format_labels(labels)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_format_labels(labels)} {snapshot['count']}")
+    return lines
+
+
+class HistogramFamily:
+    """
+    Latency histograms of one metric, one per combination of label values.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._children: dict[tuple, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labelvalues: tuple, seconds: float) -> None:
+        """
+        Records one observation.
+
+        Args:
+            labelvalues (tuple): One value per label name, in order.
+            seconds (float): The observed latency.
+        """
+        child = self._children.get(labelvalues)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, LatencyHistogram(self.buckets))
+        child.observe(seconds)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            children = sorted(self._children.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labelvalues, child in children:
+            lines.extend(histogram_lines(self.name, dict(zip(self.labelnames, labelvalues)), child.snapshot()))
+        return lines
+
+
+class CounterFamily:
+    """
+    Monotonic counters of one metric, one per combination of label values.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...]):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labelvalues: tuple, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(dict(zip(self.labelnames, labelvalues)))} {value}"
+                     for labelvalues, value in values)
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds the app's metrics and renders them in the Prometheus text format.
+
+    Histograms and counters are updated by the request and query hooks.
+    Everything else is read at scrape time from the ``stats()`` methods the
+    pools, caches and background workers already have, so keeping those
+    metrics costs nothing between scrapes.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        """
+        Args:
+            sample_rate (float): Fraction of events whose latency is timed, 0 to 1.
+        """
+        self.sample_rate = sample_rate
+        self._families: list = []
+        self._collectors: list[Callable[[], Iterable[str]]] = []
+
+    def sampled(self) -> bool:
+        """
+        Decides whether to time the current event.
+
+        Returns:
+            bool: True for a sample_rate fraction of calls.
+        """
+        return self.sample_rate >= 1 or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...],
+                  buckets: tuple[float, ...] = REQUEST_BUCKETS) -> HistogramFamily:
+        family = HistogramFamily(name, help_text, labelnames, buckets)
+        self._families.append(family)
+        return family
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...]) -> CounterFamily:
+        family = CounterFamily(name, help_text, labelnames)
+        self._families.append(family)
+        return family
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        """
+        Adds a function that returns exposition lines at scrape time.
+
+        Args:
+            collector (Callable): Returns the lines, including # HELP and # TYPE.
+        """
+        self._collectors.append(collector)
+
+    def register_stats(self, prefix: str, stats: Callable[[], Optional[dict]], help_text: str,
+                       counters: Iterable[str] = ()) -> None:
+        """
+        Exposes the numeric values of a stats() dict as gauges, or counters for the given keys.
+
+        Each key becomes ``<prefix>_<key>`` (counters get a ``_total`` suffix).
+        Booleans become 0/1; None, strings and nested dicts are skipped.
+
+        Args:
+            prefix (str): Metric name prefix, e.g. meal_max_db_pool.
+            stats (Callable): Returns the stats dict, or None to expose nothing.
+            help_text (str): What the stats describe.
+            counters (Iterable[str]): Keys that only ever increase.
+        """
+        counters = set(counters)
+
+        def collect() -> list[str]:
+            values = stats()
+            lines = []
+            for key, value in (values or {}).items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                kind = "counter" if key in counters else "gauge"
+                name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+                lines.extend([f"# HELP {name} {help_text}: {key.replace('_', ' ')}", f"# TYPE {name} {kind}",
+                              f"{name} {value}"])
+            return lines
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        """
+        Renders every metric.
+
+        Returns:
+            str: The Prometheus text exposition.
+        """
+        lines = ["# HELP meal_max_metrics_sample_rate Fraction of requests and queries whose latency is timed",
+                 "# TYPE meal_max_metrics_sample_rate gauge",
+                 f"meal_max_metrics_sample_rate {self.sample_rate}"]
+        for family in self._families:
+            lines.extend(family.collect())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(sample_rate=METRICS_SAMPLE_RATE)
+
+request_latency = registry.histogram(
+    "meal_max_http_request_duration_seconds", "Time spent handling requests (sampled)",
+    ("route", "method", "status"))
+requests_total = registry.counter(
+    "meal_max_http_requests_total", "Requests handled", ("route", "method", "status"))
+query_latency = registry.histogram(
+    "meal_max_sql_query_duration_seconds", "Time to execute SQL statements on pooled connections (sampled)",
+    ("statement",), QUERY_BUCKETS)
+
+
+_statement_labels: dict[str, str] = {}
+
+
+def statement_label(sql: str) -> str:
+    """
+    Reduces a SQL statement to its verb and first table, e.g. "SELECT locations".
+
+    Keeps the label set small however many variants of a statement
+    (parameter lists, projections) are executed.
+
+    Args:
+        sql (str): The statement.
+
+    Returns:
+        str: The label.
+    """
+    label = _statement_labels.get(sql)
+    if label is None:
+        words = sql.split(None, 1)
+        verb = words[0].upper() if words else ""
+        match = _TABLE.search(sql)
+        label = f"{verb} {match.group(1)}" if match else verb
+        if len(_statement_labels) < 1000:
+            _statement_labels[sql] = label
+    return label
+
+
+class QueryTimer:
+    """
+    Receives SQL statement timings from sql_utils cursors.
+    """
+
+    def sampled(self) -> bool:
+        return registry.sampled()
+
+    def observe(self, sql: str, seconds: float) -> None:
+        query_latency.observe((statement_label(sql),), seconds)
+
+
+def _start_timer() -> None:
+    if registry.sampled():
+        g._metrics_start = time.perf_counter()
+
+def _record_request(response: Response) -> Response:
+    rule = request.url_rule
+    labels = (rule.rule if rule is not None else "<unmatched>", request.method, str(response.status_code))
+    requests_total.inc(labels)
+    start = g.pop("_metrics_start", None)
+    if start is not None:
+        request_latency.observe(labels, time.perf_counter() - start)
+    return response
+
+def render_metrics() -> Response:
+    """
+    Builds the /api/metrics response.
+
+    Returns:
+        Response: Every metric in the Prometheus text format.
+    """
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+def init_app(app: Flask) -> None:
+    """
+    Installs the request and SQL query timing hooks if METRICS_ENABLED is set.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    sql_utils.query_timer = QueryTimer()
@@ -0,0 +1,164 @@
+import logging
+import os
+import re
+import sqlite3
+from typing import Optional
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+MIGRATIONS_DIR = os.getenv(
+    "SQL_MIGRATIONS_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "sql", "migrations")
+)
+
+# Migration files are named <version>_<description>.sql, e.g. 0002_hot_query_indexes.sql
+MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+
+# SQLite has no ADD COLUMN IF NOT EXISTS, so the runner checks the table itself
+ADD_COLUMN = re.compile(r"^ALTER\s+TABLE\s+[\"`]?(\w+)[\"`]?\s+ADD\s+(?:COLUMN\s+)?[\"`]?(\w+)", re.IGNORECASE)
+
+
+def list_migrations(migrations_dir: str = MIGRATIONS_DIR) -> list[tuple[int, str, str]]:
+    """
+    Lists the migration scripts in a directory, ordered by version.
+
+    Args:
+        migrations_dir (str): Directory holding the migration scripts.
+
+    Returns:
+        list[tuple[int, str, str]]: (version, name, path) for each script.
+
+    Raises:
+        ValueError: If two scripts share a version number.
+    """
+    migrations = {}
+    for filename in os.listdir(migrations_dir):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {filename}")
+        migrations[version] = (version, match.group(2), os.path.join(migrations_dir, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+def split_statements(script: str) -> list[str]:
+    """
+    Splits a SQL script into complete statements.
+
+    Args:
+        script (str): The SQL script.
+
+    Returns:
+        list[str]: The statements, in order.
+    """
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if statement.strip(";").strip():
+                statements.append(statement)
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+def added_column(statement: str) -> Optional[tuple[str, str]]:
+    """
+    Returns the table and column an ALTER TABLE ... ADD COLUMN statement adds.
+
+    Args:
+        statement (str): A statement from split_statements(), possibly preceded by comment lines.
+
+    Returns:
+        tuple[str, str] or None: (table, column), or None for any other statement.
+    """
+    lines = [line for line in statement.splitlines() if not line.strip().startswith("--")]
+    match = ADD_COLUMN.match("\n".join(lines).strip())
+    return (match.group(1), match.group(2)) if match else None
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1].lower() == column.lower() for row in conn.execute(f'PRAGMA table_info("{table}")'))
+
+def apply_migrations(db_path: str, migrations_dir: str = MIGRATIONS_DIR) -> list[int]:
+    """
+    Applies every migration that has not been recorded in schema_migrations yet.
+
+    Each migration runs in its own write transaction together with the row that
+    records it, so a failed migration leaves no trace and running this again
+    (from any number of processes) never re-applies a migration. An ADD COLUMN
+    whose column already exists is skipped, so migrations also apply cleanly to
+    a database built by the schema scripts in sql/ or reset by create_db.sh.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+        migrations_dir (str): Directory holding the migration scripts.
+
+    Returns:
+        list[int]: The versions applied by this call.
+
+    Raises:
+        sqlite3.Error: If a migration fails. Earlier migrations stay applied.
+    """
+    applied = []
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        for version, name, path in list_migrations(migrations_dir):
+            with open(path, "r") as fh:
+                statements = split_statements(fh.read())
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,)).fetchone():
+                    conn.execute("ROLLBACK")
+                    continue
+                for statement in statements:
+                    column = added_column(statement)
+                    if column and _has_column(conn, *column):
+                        logger.info("Migration %04d_%s: %s.%s already exists", version, name, *column)
+                        continue
+                    conn.execute(statement)
+                conn.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+                conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                conn.execute("ROLLBACK")
+                logger.error("Migration %04d_%s failed: %s", version, name, str(e))
+                raise e
+
+            logger.info("Applied migration %04d_%s", version, name)
+            applied.append(version)
+    finally:
+        conn.close()
+    return applied
+
+def current_version(db_path: str) -> Optional[int]:
+    """
+    Returns the highest applied migration version.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+
+    Returns:
+        int or None: The version, or None if no migration has been applied.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT MAX(version) FROM schema_migrations").fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    finally:
+        conn.close()
@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+import os
+from typing import Any, Iterable, Iterator, Optional
+
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+# Rows fetched from SQLite per round trip while streaming
+STREAM_FETCH_SIZE = int(os.getenv("STREAM_FETCH_SIZE", "500"))
+
+
+def encode_cursor(values: Iterable[Any]) -> str:
+    """
+    Encodes the sort key of the last row of a page as an opaque cursor.
+
+    Args:
+        values (Iterable): The sort key, e.g. (wins, meal_id).
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, length: int) -> list:
+    """
+    Decodes a cursor produced by encode_cursor().
+
+    Args:
+        cursor (str): The cursor string.
+        length (int): Number of values the sort key must have.
+
+    Returns:
+        list: The sort key values.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(values, list) or len(values) != length or \
+            not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> list[str]:
+    """
+    Parses a comma-separated field projection.
+
+    Args:
+        fields (str): e.g. "id,location,temp"; None or empty selects every allowed field.
+        allowed (Iterable[str]): The fields that may be requested, in output order.
+
+    Returns:
+        list[str]: The requested fields, in the order given.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    allowed = list(allowed)
+    if not fields:
+        return allowed
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Invalid fields: {', '.join(unknown)}. Expected any of {', '.join(allowed)}.")
+    return requested
+
+def check_page_size(limit: int) -> int:
+    """
+    Validates a page size.
+
+    Args:
+        limit (int): The requested page size.
+
+    Returns:
+        int: The page size.
+
+    Raises:
+        ValueError: If limit is not between 1 and MAX_PAGE_SIZE.
+    """
+    if not isinstance(limit, int) or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"Invalid limit: {limit}. Limit must be between 1 and {MAX_PAGE_SIZE}.")
+    return limit
+
+def iter_rows(cursor, size: int = STREAM_FETCH_SIZE) -> Iterator[tuple]:
+    """
+    Yields the rows of an executed query a batch at a time, never the whole result at once.
+
+    Args:
+        cursor (sqlite3.Cursor): A cursor with an executed query.
+        size (int): Rows fetched per batch.
+
+    Yields:
+        tuple: Each row.
+    """
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
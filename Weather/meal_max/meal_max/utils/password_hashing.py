@@ -0,0 +1,278 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from meal_max.utils.http_client import LatencyHistogram
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class PasswordHasher(ABC):
+    """
+    Base class for versioned password hashers.
+
+    Hashes are encoded as ``<algorithm>$<cost parameters...>$<salt hex>$<hash hex>``
+    so the algorithm and cost used for a stored hash are always known, and a
+    hash produced with older settings can be detected and upgraded.
+    """
+
+    algorithm = ""
+
+    @abstractmethod
+    def hash(self, password: str, salt: str) -> str:
+        """
+        Hashes a password.
+
+        Args:
+            password (str): The password to hash.
+            salt (str): The salt, as a hex string.
+
+        Returns:
+            str: The encoded hash.
+        """
+
+    @abstractmethod
+    def verify(self, password: str, encoded: str) -> bool:
+        """
+        Checks a password against an encoded hash produced by this hasher.
+
+        Args:
+            password (str): The password to check.
+            encoded (str): The stored encoded hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+
+    @abstractmethod
+    def needs_rehash(self, encoded: str) -> bool:
+        """
+        Returns whether a stored hash was made with another algorithm or other cost parameters.
+
+        Args:
+            encoded (str): The stored encoded hash.
+
+        Returns:
+            bool: True if the hash should be replaced on the next successful login.
+        """
+
+
+class ScryptHasher(PasswordHasher):
+    """
+    Memory-hard scrypt hasher. Memory use is roughly 128 * n * r bytes.
+    """
+
+    algorithm = "scrypt"
+
+    def __init__(self, n: int = 2 ** 14, r: int = 8, p: int = 1, dklen: int = 32):
+        if n < 2 or n & (n - 1):
+            raise ValueError(f"Invalid scrypt n: {n}. n must be a power of two greater than 1.")
+        self.n = n
+        self.r = r
+        self.p = p
+        self.dklen = dklen
+
+    def _derive(self, password: str, salt: str, n: int, r: int, p: int, dklen: int) -> bytes:
+        return hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=n, r=r, p=p,
+                              maxmem=256 * n * r * p + 1024 * 1024, dklen=dklen)
+
+    def hash(self, password: str, salt: str) -> str:
+        digest = self._derive(password, salt, self.n, self.r, self.p, self.dklen)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${salt}${digest.hex()}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, n, r, p, salt, expected = encoded.split("$")
+        digest = self._derive(password, salt, int(n), int(r), int(p), len(expected) // 2)
+        return hmac.compare_digest(digest.hex(), expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not encoded.startswith(f"{self.algorithm}${self.n}${self.r}${self.p}$")
+
+
+class Pbkdf2Hasher(PasswordHasher):
+    """
+    PBKDF2-HMAC-SHA256 hasher.
+    """
+
+    algorithm = "pbkdf2_sha256"
+
+    def __init__(self, iterations: int = 600_000):
+        if iterations < 1:
+            raise ValueError(f"Invalid iterations: {iterations}. Must be at least 1.")
+        self.iterations = iterations
+
+    def hash(self, password: str, salt: str) -> str:
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), self.iterations)
+        return f"{self.algorithm}${self.iterations}${salt}${digest.hex()}"
+
+    def verify(self, password: str, encoded: str) -> bool:
+        _, iterations, salt, expected = encoded.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(digest.hex(), expected)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        return not encoded.startswith(f"{self.algorithm}${self.iterations}$")
+
+
+def _verify_legacy_sha256(password: str, encoded: str, salt: str) -> bool:
+    # Hashes stored before versioned encoding: one round of sha256(password + salt), salt kept separately
+    return hmac.compare_digest(hashlib.sha256((password + salt).encode()).hexdigest(), encoded)
+
+
+HASHERS = {
+    ScryptHasher.algorithm: ScryptHasher,
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher,
+}
+
+
+def get_hasher() -> PasswordHasher:
+    """
+    Builds the hasher for new passwords from the environment.
+
+    Returns:
+        PasswordHasher: The configured hasher.
+
+    Raises:
+        ValueError: If PASSWORD_HASHER names an unknown algorithm.
+    """
+    algorithm = os.getenv("PASSWORD_HASHER", ScryptHasher.algorithm)
+    if algorithm == ScryptHasher.algorithm:
+        return ScryptHasher(
+            n=int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14))),
+            r=int(os.getenv("PASSWORD_SCRYPT_R", "8")),
+            p=int(os.getenv("PASSWORD_SCRYPT_P", "1")),
+        )
+    if algorithm == Pbkdf2Hasher.algorithm:
+        return Pbkdf2Hasher(iterations=int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "600000")))
+    raise ValueError(f"Unknown password hasher: {algorithm}. Expected one of {', '.join(HASHERS)}.")
+
+def verify_password(password: str, encoded: str, salt: str) -> bool:
+    """
+    Checks a password against a stored hash of any supported version.
+
+    Args:
+        password (str): The password to check.
+        encoded (str): The stored hash.
+        salt (str): The stored salt, only used by legacy SHA-256 hashes.
+
+    Returns:
+        bool: True if the password matches.
+
+    Raises:
+        ValueError: If the hash uses an unknown algorithm.
+    """
+    if "$" not in encoded:
+        return _verify_legacy_sha256(password, encoded, salt)
+    algorithm = encoded.split("$", 1)[0]
+    if algorithm not in HASHERS:
+        raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+    # Cost parameters come from the encoded hash, so default instances are enough
+    return HASHERS[algorithm]().verify(password, encoded)
+
+
+class VerificationQueueFull(RuntimeError):
+    """
+    Raised instead of queueing a password verification when the pool is saturated.
+    """
+
+
+class VerificationPool:
+    """
+    Bounded worker pool for password verification.
+
+    Slow hashes run on at most ``max_workers`` threads (hashlib releases the GIL
+    while hashing), so a burst of logins cannot oversubscribe the CPU. At most
+    ``max_queue`` verifications may wait; beyond that submissions are rejected
+    immediately instead of piling up behind the workers.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-verify")
+        self._lock = threading.Lock()
+        self._outstanding = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+
+    def _run(self, password: str, encoded: str, salt: str) -> bool:
+        start = time.perf_counter()
+        try:
+            return verify_password(password, encoded, salt)
+        finally:
+            self.latency.observe(time.perf_counter() - start)
+            with self._lock:
+                self._outstanding -= 1
+
+    def verify(self, password: str, encoded: str, salt: str, timeout: Optional[float] = None) -> bool:
+        """
+        Verifies a password on the pool and waits for the answer.
+
+        Args:
+            password (str): The password to check.
+            encoded (str): The stored hash.
+            salt (str): The stored salt.
+            timeout (float): Seconds to wait for the result; None waits indefinitely.
+
+        Returns:
+            bool: True if the password matches.
+
+        Raises:
+            VerificationQueueFull: If the queue is full.
+            concurrent.futures.TimeoutError: If the result is not ready in time.
+        """
+        with self._lock:
+            if self._outstanding >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise VerificationQueueFull("Password verification queue is full")
+            self._outstanding += 1
+        try:
+            future = self._executor.submit(self._run, password, encoded, salt)
+        except BaseException:
+            with self._lock:
+                self._outstanding -= 1
+            raise
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # A verification still waiting for a worker is dropped, so it does not hold a queue slot
+            if future.cancel():
+                with self._lock:
+                    self._outstanding -= 1
+            raise
+
+    def stats(self) -> dict:
+        """
+        Returns the pool metrics.
+
+        Returns:
+            dict: queue_depth (verifications waiting for a worker), in_flight,
+            rejected, and the verification latency histogram.
+        """
+        with self._lock:
+            outstanding = self._outstanding
+            rejected = self.rejected
+        return {
+            'queue_depth': max(outstanding - self.max_workers, 0),
+            'in_flight': outstanding,
+            'rejected': rejected,
+            'latency': self.latency.snapshot(),
+        }
+
+
+# Seconds a login waits for its verification before giving up; the request thread is never held longer
+PASSWORD_VERIFY_TIMEOUT = float(os.getenv("PASSWORD_VERIFY_TIMEOUT", "10"))
+
+verification_pool = VerificationPool(
+    max_workers=int(os.getenv("PASSWORD_VERIFY_WORKERS", "4")),
+    max_queue=int(os.getenv("PASSWORD_VERIFY_QUEUE", "64")),
+)
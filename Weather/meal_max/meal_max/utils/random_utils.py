@@ -1,38 +1,220 @@
+from collections import deque
 import logging
+import os
+import secrets
+import threading
+import time
+from typing import Optional
+
 import requests
 
+from meal_max.utils.http_client import LatencyHistogram, get_http_client
 from meal_max.utils.logger import configure_logger
 
 logger = logging.getLogger(__name__)
 configure_logger(logger)
 
 
-def get_random() -> float:
-    url = "https://www.random.org/decimal-fractions/?num=1&dec=2&col=1&format=plain&rnd=new"
+RANDOM_ORG_URL = os.getenv("RANDOM_ORG_URL", "https://www.random.org/decimal-fractions/")
+# Numbers requested per call; random.org allows up to 10,000 decimal fractions per request
+RANDOM_BATCH_SIZE = int(os.getenv("RANDOM_BATCH_SIZE", "500"))
+# A background refill starts when fewer numbers than this are buffered
+RANDOM_LOW_WATER = int(os.getenv("RANDOM_LOW_WATER", "100"))
+RANDOM_FETCH_TIMEOUT = float(os.getenv("RANDOM_FETCH_TIMEOUT", "5"))
+# Seconds to serve from the local generator after a failed refill before asking upstream again
+RANDOM_RETRY_AFTER = float(os.getenv("RANDOM_RETRY_AFTER", "30"))
+RANDOM_DECIMALS = 2
 
-    try:
-        # Log the request to random.org
-        logger.info("Fetching random number from %s", url)
 
-        response = requests.get(url, timeout=5)
+class RandomPool:
+    """
+    Buffer of random numbers fetched from random.org in batches.
 
-        # Check if the request was successful
-        response.raise_for_status()
+    Numbers are handed out from memory. When the buffer drops below
+    ``low_water`` a background thread fetches another ``batch_size`` numbers
+    in a single request, so callers normally never wait on the network. Only a
+    caller that finds the buffer empty with no refill running fetches inline.
+    If random.org cannot be reached, numbers come from the operating system's
+    CSPRNG instead and upstream is not asked again for ``retry_after`` seconds.
+    """
+
+    def __init__(self, url: str = RANDOM_ORG_URL, batch_size: int = 500, low_water: int = 100,
+                 timeout: float = 5.0, retry_after: float = 30.0, decimals: int = RANDOM_DECIMALS):
+        """
+        Initializes an empty pool. Nothing is fetched until the first number is requested.
 
-        random_number_str = response.text.strip()
+        Args:
+            url (str): The random.org decimal-fractions endpoint.
+            batch_size (int): Numbers fetched per request.
+            low_water (int): Buffered count below which a background refill starts.
+            timeout (float): Seconds to wait for a batch.
+            retry_after (float): Seconds to skip upstream after a failed refill.
+            decimals (int): Decimal places of each number.
 
+        Raises:
+            ValueError: If batch_size is not between 1 and 10,000 or low_water is negative.
+        """
+        if not 1 <= batch_size <= 10000:
+            raise ValueError(f"Invalid batch size: {batch_size}. Batch size must be between 1 and 10000.")
+        if low_water < 0:
+            raise ValueError(f"Invalid low-water mark: {low_water}. Must not be negative.")
+        self.url = url
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.decimals = decimals
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._refill_done = threading.Event()
+        self._refill_done.set()
+        self._retry_at = 0.0
+        self.served = 0
+        self.fallbacks = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.refill_latency = LatencyHistogram()
+
+    def _batch_url(self) -> str:
+        return f"{self.url}?num={self.batch_size}&dec={self.decimals}&col=1&format=plain&rnd=new"
+
+    def _fetch_batch(self) -> list[float]:
+        url = self._batch_url()
+        logger.info("Fetching %d random numbers from %s", self.batch_size, url)
+        response = get_http_client().get(url, timeout=self.timeout)
+        response.raise_for_status()
         try:
-            random_number = float(random_number_str)
+            return [float(line) for line in response.text.split()]
         except ValueError:
-            raise ValueError("Invalid response from random.org: %s" % random_number_str)
+            raise ValueError("Invalid response from random.org: %s" % response.text[:100])
+
+    def _start_refill(self) -> bool:
+        # Caller holds self._lock
+        if self._refilling or time.monotonic() < self._retry_at:
+            return False
+        self._refilling = True
+        self._refill_done.clear()
+        return True
+
+    def _refill(self) -> bool:
+        start = time.perf_counter()
+        try:
+            numbers = self._fetch_batch()
+            with self._lock:
+                self._buffer.extend(numbers)
+                self.refills += 1
+            logger.info("Buffered %d random numbers", len(numbers))
+            return True
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("Refilling random numbers from random.org failed: %s", e)
+            with self._lock:
+                self.refill_failures += 1
+                self._retry_at = time.monotonic() + self.retry_after
+            return False
+        finally:
+            self.refill_latency.observe(time.perf_counter() - start)
+            with self._lock:
+                self._refilling = False
+            self._refill_done.set()
+
+    def _fallback(self) -> float:
+        scale = 10 ** self.decimals
+        return secrets.randbelow(scale) / scale
+
+    def get(self) -> float:
+        """
+        Returns the next random number between 0 and 1.
+
+        Returns:
+            float: A number from random.org, or from the local CSPRNG if the
+            buffer is empty and upstream is unavailable or already being asked.
+        """
+        with self._lock:
+            inline = not self._buffer and self._start_refill()
+        if inline:
+            self._refill()
 
-        logger.info("Received random number: %.3f", random_number)
-        return random_number
+        with self._lock:
+            self.served += 1
+            number = self._buffer.popleft() if self._buffer else None
+            if len(self._buffer) < self.low_water and self._start_refill():
+                threading.Thread(target=self._refill, name="random-refill", daemon=True).start()
+            if number is not None:
+                return number
+            self.fallbacks += 1
+        logger.debug("Random number buffer empty; using local generator")
+        return self._fallback()
+
+    def refill(self) -> bool:
+        """
+        Fetches one batch now, e.g. to warm the pool at startup.
+
+        Returns:
+            bool: True if a batch was fetched, False if the fetch failed, a refill
+            was already running, or upstream is in its retry window.
+        """
+        with self._lock:
+            if not self._start_refill():
+                return False
+        return self._refill()
+
+    def wait_for_refill(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a running refill to finish.
+
+        Args:
+            timeout (float): Seconds to wait; None waits indefinitely.
+
+        Returns:
+            bool: True if no refill is running anymore.
+        """
+        return self._refill_done.wait(timeout)
+
+    def clear(self) -> None:
+        """
+        Drops buffered numbers, e.g. in a forked worker that must not reuse its parent's numbers.
+        """
+        with self._lock:
+            self._buffer.clear()
+            self._retry_at = 0.0
+
+    def stats(self) -> dict:
+        """
+        Returns the pool metrics.
+
+        Returns:
+            dict: buffered count, numbers served, fallbacks to the local generator,
+            refill and refill failure counts, and the refill latency histogram.
+        """
+        with self._lock:
+            return {
+                'buffered': len(self._buffer),
+                'served': self.served,
+                'fallbacks': self.fallbacks,
+                'refills': self.refills,
+                'refill_failures': self.refill_failures,
+                'refilling': self._refilling,
+                'refill_latency': self.refill_latency.snapshot(),
+            }
+
+
+random_pool = RandomPool(
+    batch_size=RANDOM_BATCH_SIZE,
+    low_water=RANDOM_LOW_WATER,
+    timeout=RANDOM_FETCH_TIMEOUT,
+    retry_after=RANDOM_RETRY_AFTER,
+)
+
+
+def get_random() -> float:
+    """
+    Returns a random number between 0 and 1 with two decimal places.
 
-    except requests.exceptions.Timeout:
-        logger.error("Request to random.org timed out.")
-        raise RuntimeError("Request to random.org timed out.")
+    Numbers come from a buffer refilled from random.org in batches, falling
+    back to the local CSPRNG when random.org is unavailable.
 
-    except requests.exceptions.RequestException as e:
-        logger.error("Request to random.org failed: %s", e)
-        raise RuntimeError("Request to random.org failed: %s" % e)
+    Returns:
+        float: The random number.
+    """
+    return random_pool.get()
@@ -0,0 +1,217 @@
+from collections import OrderedDict
+import fcntl
+import os
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens are added at ``rate`` per second up to ``capacity``; each call takes
+    one token. A full bucket allows a burst of ``capacity`` calls, after which
+    calls are spaced ``1 / rate`` seconds apart.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum tokens held; defaults to one second's worth (at least 1).
+            clock (callable): Monotonic time source, injectable for tests.
+            sleep (callable): Sleep function, injectable for tests.
+
+        Raises:
+            ValueError: If rate or capacity is not positive.
+        """
+        if rate <= 0:
+            raise ValueError(f"Invalid rate: {rate}. Rate must be greater than 0.")
+        capacity = capacity if capacity is not None else max(rate, 1.0)
+        if capacity <= 0:
+            raise ValueError(f"Invalid capacity: {capacity}. Capacity must be greater than 0.")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+        self.granted = 0
+        self.wait_time = 0.0
+
+    def _refill_locked(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """
+        Takes a token if one is available, without waiting.
+
+        Returns:
+            bool: True if a token was taken.
+        """
+        with self._lock:
+            self._refill_locked()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self.granted += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Takes a token, waiting for one to become available.
+
+        Args:
+            timeout (float): Seconds to wait at most; None waits indefinitely.
+
+        Returns:
+            bool: True if a token was taken, False if the timeout ran out first.
+        """
+        start = self._clock()
+        while True:
+            with self._lock:
+                self._refill_locked()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.granted += 1
+                    self.wait_time += self._clock() - start
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if timeout is not None:
+                remaining = start + timeout - self._clock()
+                if remaining <= 0:
+                    with self._lock:
+                        self.wait_time += self._clock() - start
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+    def stats(self) -> dict:
+        """
+        Returns the limiter metrics.
+
+        Returns:
+            dict: rate, capacity, tokens currently available, tokens granted,
+            and total seconds callers spent waiting.
+        """
+        with self._lock:
+            self._refill_locked()
+            return {
+                'rate': self.rate,
+                'capacity': self.capacity,
+                'tokens': self._tokens,
+                'granted': self.granted,
+                'wait_time': self.wait_time,
+            }
+
+
+class RecentAccesses:
+    """
+    Bounded, thread-safe record of when keys were last accessed.
+
+    Only the ``max_size`` most recently accessed keys are remembered.
+    """
+
+    def __init__(self, max_size: int = 10000, clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes an empty record.
+
+        Args:
+            max_size (int): Maximum number of keys remembered.
+            clock (callable): Monotonic time source, injectable for tests.
+        """
+        self.max_size = max_size
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._accessed: OrderedDict[Hashable, float] = OrderedDict()
+
+    def touch(self, key: Hashable) -> None:
+        """
+        Records an access to a key.
+
+        Args:
+            key: The key accessed.
+        """
+        with self._lock:
+            self._accessed[key] = self._clock()
+            self._accessed.move_to_end(key)
+            while len(self._accessed) > self.max_size:
+                self._accessed.popitem(last=False)
+
+    def recent(self, window: float) -> list:
+        """
+        Returns the keys accessed within the last ``window`` seconds.
+
+        Args:
+            window (float): How far back to look, in seconds.
+
+        Returns:
+            list: The keys, most recently accessed first.
+        """
+        cutoff = self._clock() - window
+        keys = []
+        with self._lock:
+            for key, accessed_at in reversed(self._accessed.items()):
+                if accessed_at < cutoff:
+                    break
+                keys.append(key)
+        return keys
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._accessed)
+
+
+class ProcessLock:
+    """
+    Non-blocking exclusive lock on a file, held until released or the process exits.
+
+    Lets one of several server worker processes claim a singleton job, such
+    as the weather refresher. The operating system drops the lock when the
+    holder exits, so a replacement worker can claim it.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The lock file; created if missing.
+        """
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def try_acquire(self) -> bool:
+        """
+        Claims the lock without waiting.
+
+        Returns:
+            bool: True if this process holds the lock.
+        """
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """
+        Releases the lock if held.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
@@ -0,0 +1,106 @@
+import dataclasses
+import datetime
+import decimal
+import json
+import logging
+import os
+from typing import Any, Callable, Optional
+import uuid
+
+from flask import Flask, Response
+from flask.json.provider import JSONProvider
+
+from meal_max.utils.logger import configure_logger
+
+try:
+    import orjson
+except ImportError:  # optional; the standard library encoder is used instead
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+# "auto" uses orjson when it is installed, "orjson" requires it, "json" forces the standard library
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto").lower()
+
+
+def _default(obj: Any) -> Any:
+    # The types Flask's default provider serializes that orjson and json do not both handle natively
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_dumps(obj: Any) -> bytes:
+    # ASCII-escaped output is what the C encoder produces fastest
+    return json.dumps(obj, default=_default, separators=(",", ":")).encode("ascii")
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def get_backend(name: str = JSON_BACKEND) -> tuple[str, Callable[[Any], bytes], Callable[[Any], Any]]:
+    """
+    Resolves a JSON backend name.
+
+    Args:
+        name (str): "auto", "orjson" or "json".
+
+    Returns:
+        tuple: The resolved backend name, its dumps (object to UTF-8 bytes) and its loads.
+
+    Raises:
+        ValueError: If the name is unknown, or orjson is requested but not installed.
+    """
+    if name not in ("auto", "orjson", "json"):
+        raise ValueError(f"Invalid JSON backend: {name}. Expected auto, orjson or json.")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON backend orjson requested but orjson is not installed.")
+    if name != "json" and orjson is not None:
+        return "orjson", _orjson_dumps, orjson.loads
+    return "json", _json_dumps, json.loads
+
+
+backend, dumps, loads = get_backend()
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by the fastest available encoder.
+
+    Installed as ``app.json``, so jsonify(), request.get_json() and every
+    route go through it without changes. Output is compact and keys keep
+    their insertion order.
+    """
+
+    def __init__(self, app: Flask, backend_name: Optional[str] = None):
+        super().__init__(app)
+        self.backend, self._dumps, self._loads = get_backend(backend_name or JSON_BACKEND)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dumps(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return self._loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Encode straight to bytes instead of going through a str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps(obj) + b"\n", mimetype="application/json")
+
+
+def init_app(app: Flask) -> None:
+    """
+    Installs the fast JSON provider on the app.
+
+    Args:
+        app (Flask): The Flask application.
+    """
+    app.json = FastJSONProvider(app)
+    logger.info("JSON serialization backend: %s", app.json.backend)
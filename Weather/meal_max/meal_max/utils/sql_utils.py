@@ -1,9 +1,17 @@
 from contextlib import contextmanager
 import logging
 import os
+import queue
+import re
 import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from flask import Flask, g, has_app_context
 
 from meal_max.utils.logger import configure_logger
+from meal_max.utils.migrations import apply_migrations
 
 
 logger = logging.getLogger(__name__)
@@ -13,29 +21,402 @@ configure_logger(logger)
 # load the db path from the environment with a default value
 DB_PATH = os.getenv("DB_PATH", "/app/sql/meal_max.db")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_RUN_MIGRATIONS = os.getenv("DB_RUN_MIGRATIONS", "true").lower() == "true"
+
+# Applied to every pooled connection. Set a variable to an empty string to keep SQLite's default.
+DB_PRAGMAS = {
+    "journal_mode": os.getenv("DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("DB_CACHE_SIZE", "-20000"),  # negative values are KiB
+    "busy_timeout": os.getenv("DB_BUSY_TIMEOUT", "5000"),  # milliseconds
+}
+
+PRAGMA_VALUE = re.compile(r"^-?\w+$")
+
+# Set by metrics.init_app(); an object with sampled() -> bool and observe(sql, seconds)
+query_timer = None
+
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that reports how long each statement takes to execute to ``query_timer``.
+
+    With no timer installed, or for an unsampled call, the only overhead is
+    one attribute check.
+    """
+
+    def execute(self, sql, parameters=()):
+        timer = query_timer
+        if timer is None or not timer.sampled():
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            timer.observe(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        timer = query_timer
+        if timer is None or not timer.sampled():
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            timer.observe(sql, time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    Connection whose cursors, including those behind the execute() shortcuts, are TimedCursors.
+    """
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of SQLite connections.
+
+    Up to ``size`` connections are opened lazily and handed out one caller at a
+    time. Callers that find the pool exhausted wait up to ``timeout`` seconds.
+    On checkout a connection is replaced if it is older than ``recycle`` seconds
+    or, when ``pre_ping`` is set, if it fails a ``SELECT 1`` health check.
+    """
+
+    def __init__(self, db_path: str, size: int = 5, timeout: float = 30.0,
+                 recycle: float = 3600.0, pre_ping: bool = True, pragmas: Optional[dict] = None):
+        """
+        Initializes the pool. No connection is opened until the first checkout.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            size (int): Maximum number of open connections.
+            timeout (float): Seconds to wait for a free connection.
+            recycle (float): Maximum connection age in seconds; 0 disables recycling.
+            pre_ping (bool): Whether to health check connections on checkout.
+            pragmas (dict): PRAGMA name to value, applied to each new connection.
+
+        Raises:
+            ValueError: If size is less than 1 or a pragma value is not a plain word or number.
+        """
+        if size < 1:
+            raise ValueError(f"Invalid pool size: {size}. Pool size must be at least 1.")
+        pragmas = {name: str(value) for name, value in (pragmas or {}).items() if str(value)}
+        for name, value in pragmas.items():
+            if not PRAGMA_VALUE.match(name) or not PRAGMA_VALUE.match(value):
+                raise ValueError(f"Invalid pragma: {name}={value}")
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.pragmas = pragmas
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created_at: dict[sqlite3.Connection, float] = {}
+        self._opened = 0  # open connections plus connections being opened
+        self._lock = threading.Lock()
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.timeouts = 0
+        self.discarded = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=TimedConnection)
+        try:
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name} = {value};")
+        except sqlite3.Error:
+            conn.close()
+            raise
+        logger.debug("Opened database connection to %s", self.db_path)
+        return conn
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return True
+            return False
+
+    def _open_reserved(self) -> sqlite3.Connection:
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._lock:
+                self._opened -= 1
+            raise
+        with self._lock:
+            self._created_at[conn] = time.monotonic()
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        if self.recycle and time.monotonic() - self._created_at.get(conn, 0.0) > self.recycle:
+            return False
+        if self.pre_ping:
+            try:
+                conn.execute("SELECT 1;")
+            except sqlite3.Error:
+                return False
+        return True
+
+    def _reserve_or_wait(self) -> sqlite3.Connection:
+        if self._reserve_slot():
+            return self._open_reserved()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._lock:
+            self.waits += 1
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout}s waiting for a database connection")
+                try:
+                    # Wake up periodically in case a discarded connection freed a slot
+                    return self._idle.get(timeout=min(remaining, 0.1))
+                except queue.Empty:
+                    if self._reserve_slot():
+                        return self._open_reserved()
+        finally:
+            with self._lock:
+                self.wait_time += time.monotonic() - start
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Checks out a healthy connection, waiting if the pool is exhausted.
+
+        Returns:
+            sqlite3.Connection: A connection owned by the caller until released.
+
+        Raises:
+            sqlite3.OperationalError: If the pool is closed or no connection frees up in time.
+            sqlite3.Error: If a new connection cannot be opened.
+        """
+        if self._closed:
+            raise sqlite3.OperationalError("Connection pool is closed")
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._reserve_or_wait()
+            if self._is_healthy(conn):
+                break
+            self.discard(conn)
+        with self._lock:
+            self.checkouts += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """
+        Returns a connection to the pool, rolling back any open transaction.
+
+        Args:
+            conn (sqlite3.Connection): A connection obtained from acquire().
+        """
+        if self._closed:
+            self.discard(conn)
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self.discard(conn)
+            return
+        self._idle.put(conn)
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        """
+        Closes a connection and frees its slot in the pool.
+
+        Args:
+            conn (sqlite3.Connection): A connection obtained from acquire().
+        """
+        with self._lock:
+            if self._created_at.pop(conn, None) is not None:
+                self._opened -= 1
+            self.discarded += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """
+        Context manager that checks a connection out and releases it afterwards.
+
+        Yields:
+            sqlite3.Connection: The checked-out connection.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            _rollback_quietly(conn)
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """
+        Closes every idle connection. Checked-out connections are closed when released.
+        """
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self.discard(conn)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the pool metrics.
+
+        Returns:
+            dict: size, open, idle and in_use connection counts, checkout/wait/timeout
+            counters, total wait time, and the oldest and mean connection age in seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - created for created in self._created_at.values()]
+            idle = self._idle.qsize()
+            return {
+                'size': self.size,
+                'open': len(ages),
+                'idle': idle,
+                'in_use': len(ages) - idle,
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+                'max_connection_age': max(ages, default=0.0),
+                'mean_connection_age': sum(ages) / len(ages) if ages else 0.0,
+            }
+
+
+def _rollback_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        pass
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Returns:
+        ConnectionPool: The shared pool for DB_PATH.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_PATH, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                                       recycle=DB_POOL_RECYCLE, pre_ping=DB_POOL_PRE_PING,
+                                       pragmas=DB_PRAGMAS)
+    return _pool
+
+def reset_pool() -> None:
+    """
+    Closes the shared pool so the next get_pool() call opens a fresh one.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = None
+
+def init_db() -> None:
+    """
+    Startup step: applies pending schema migrations and opens the first pooled
+    connection so the configured pragmas (including WAL mode) take effect.
+
+    Raises:
+        sqlite3.Error: If a migration fails or the database cannot be opened.
+    """
+    if DB_RUN_MIGRATIONS:
+        applied = apply_migrations(DB_PATH)
+        logger.info("Applied %d schema migrations", len(applied))
+    with get_pool().connection() as conn:
+        journal_mode = conn.execute("PRAGMA journal_mode;").fetchone()[0]
+    logger.info("Database ready at %s (journal_mode=%s)", DB_PATH, journal_mode)
+
 
 def check_database_connection():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        # This ensures the connection is actually active
-        cursor.execute("SELECT 1;")
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # This ensures the connection is actually active
+            cursor.execute("SELECT 1;")
     except sqlite3.Error as e:
         error_message = f"Database connection error: {e}"
         logger.error(error_message)
         raise Exception(error_message) from e
 
+def find_missing_tables(tablenames: Iterable[str]) -> list[str]:
+    """
+    Checks which of the given tables are missing from the schema.
+
+    One parameterized sqlite_master lookup on a pooled connection, however
+    many tables are checked; no table is scanned.
+
+    Args:
+        tablenames (Iterable[str]): The tables that should exist.
+
+    Returns:
+        list[str]: The missing tables, in the order given.
+
+    Raises:
+        sqlite3.Error: If the database cannot be queried.
+    """
+    tablenames = list(tablenames)
+    if not tablenames:
+        return []
+    placeholders = ",".join("?" * len(tablenames))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+                       tablenames)
+        found = {row[0] for row in cursor.fetchall()}
+    return [name for name in tablenames if name not in found]
+
 def check_table_exists(tablename: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM {tablename} LIMIT 1;")
-        conn.close()
+        missing = find_missing_tables([tablename])
     except sqlite3.Error as e:
         error_message = f"Table check error: {e}"
         logger.error(error_message)
         raise Exception(error_message) from e
+    if missing:
+        error_message = f"Table check error: no such table: {tablename}"
+        logger.error(error_message)
+        raise Exception(error_message)
 
 ###################################################
 #
@@ -45,14 +426,46 @@ def check_table_exists(tablename: str):
 ###################################################
 @contextmanager
 def get_db_connection():
-    conn = None
+    """
+    Yields a pooled database connection.
+
+    Inside a Flask app context the same connection is reused by every call for
+    the rest of the request and released by the teardown registered in
+    init_app(). Outside a request each call checks out its own connection.
+
+    Yields:
+        sqlite3.Connection: The connection to use.
+
+    Raises:
+        sqlite3.Error: If a connection cannot be obtained or a query fails.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        yield conn
+        if has_app_context():
+            conn = g.get("_db_conn")
+            if conn is None:
+                conn = g._db_conn = get_pool().acquire()
+            try:
+                yield conn
+            except BaseException:
+                _rollback_quietly(conn)
+                raise
+        else:
+            with get_pool().connection() as conn:
+                yield conn
     except sqlite3.Error as e:
         logger.error("Database connection error: %s", str(e))
         raise e
-    finally:
-        if conn:
-            conn.close()
-            logger.info("Database connection closed.")
+
+def _release_request_connection(exception: Optional[BaseException] = None) -> None:
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def init_app(app: Flask) -> None:
+    """
+    Registers the teardown that returns the request-scoped connection to the pool.
+
+    Args:
+        app (Flask): The application to register with.
+    """
+    app.teardown_appcontext(_release_request_connection)
@@ -0,0 +1,262 @@
+from collections import OrderedDict
+import logging
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional, Union
+
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+def normalize_location(location: str) -> str:
+    """
+    Normalizes a location name so that equivalent spellings share a cache entry.
+
+    Args:
+        location (str): The location name as supplied by the caller.
+
+    Returns:
+        str: The location with collapsed whitespace, casefolded.
+    """
+    return " ".join(location.split()).casefold()
+
+
+class _InFlight:
+    """
+    A pending upstream load that concurrent callers for the same key wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class WeatherCache:
+    """
+    Bounded, thread-safe TTL cache with LRU eviction and single-flight loading.
+
+    Entries expire ``ttl`` seconds after they were stored. When the cache is
+    full the least recently used entry is evicted. Concurrent misses for the
+    same key are collapsed into one call of the loader; the other callers wait
+    for its result (or its exception).
+
+    An expired entry is kept for another ``stale_ttl`` seconds. Lookups treat
+    it as a miss, but get_stale() still returns it, so callers can fall back
+    to it while the upstream is failing.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_size: int = 1024, stale_ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes the cache.
+
+        Args:
+            ttl (float): Seconds an entry stays fresh. 0 disables caching.
+            max_size (int): Maximum number of entries kept before LRU eviction.
+            stale_ttl (float): Seconds an expired entry remains available to get_stale(). 0 drops it on expiry.
+            clock (callable): Monotonic time source, injectable for tests.
+
+        Raises:
+            ValueError: If ttl, max_size or stale_ttl is negative.
+        """
+        if ttl < 0:
+            raise ValueError(f"Invalid ttl: {ttl}. ttl must be >= 0.")
+        if max_size < 0:
+            raise ValueError(f"Invalid max_size: {max_size}. max_size must be >= 0.")
+        if stale_ttl < 0:
+            raise ValueError(f"Invalid stale_ttl: {stale_ttl}. stale_ttl must be >= 0.")
+        self.ttl = ttl
+        self.max_size = max_size
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._in_flight: dict[Hashable, _InFlight] = {}
+        # Expired entries still within stale_ttl, as (value, stale_until), least recently expired first
+        self._stale: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the fresh value for a key, or None on a miss.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The cached value, or None if it is absent or expired.
+        """
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            if self.stale_ttl > 0:
+                self._stale[key] = (value, expires_at + self.stale_ttl)
+                while len(self._stale) > self.max_size:
+                    self._stale.popitem(last=False)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting least recently used entries if the cache is full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._set_locked(key, value)
+
+    def get_stale(self, key: Hashable) -> Any:
+        """
+        Returns the value for a key even if it expired less than stale_ttl seconds ago.
+
+        Meant as a fallback when loading a fresh value failed.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The fresh or stale value, or None if there is neither.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if now < expires_at:
+                    return value
+                stale_until = expires_at + self.stale_ttl
+            else:
+                entry = self._stale.get(key)
+                if entry is None:
+                    return None
+                value, stale_until = entry
+            if now >= stale_until:
+                return None
+            self.stale_served += 1
+            return value
+
+    def _set_locked(self, key: Hashable, value: Any) -> None:
+        self._stale.pop(key, None)
+        self._entries[key] = (value, self._clock() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            logger.debug("Evicted weather cache entry: %s", evicted_key)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, calling the loader once on a miss.
+
+        If another thread is already loading the same key, this call waits for
+        that load instead of starting a second one.
+
+        Args:
+            key: The cache key.
+            loader (callable): Zero-argument function producing the value.
+
+        Returns:
+            The cached or freshly loaded value.
+
+        Raises:
+            Exception: Whatever the loader raised, re-raised in every waiter.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._in_flight[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = loader()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if call.error is None and self.enabled:
+                    self._set_locked(key, call.value)
+                del self._in_flight[key]
+            call.done.set()
+        return call.value
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Removes a single entry from the cache if present.
+
+        Args:
+            key: The cache key.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._stale.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes every entry. Counters are left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._stale.clear()
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """
+        Returns a snapshot of the cache counters.
+
+        Returns:
+            dict: size, stale (expired entries kept for get_stale), max_size, ttl, hits,
+            misses, evictions, expirations, coalesced and stale_served.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'stale': len(self._stale),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'coalesced': self.coalesced,
+                'stale_served': self.stale_served,
+            }
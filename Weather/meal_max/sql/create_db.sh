@@ -6,6 +6,8 @@ if [ -f "$DB_PATH" ]; then
     # Drop and recreate the tables
     sqlite3 "$DB_PATH" < /app/sql/create_user_table.sql
     sqlite3 "$DB_PATH" < /app/sql/create_location_table.sql
+    # The recreated tables lack what the migrations added; forget them so the app applies them again
+    sqlite3 "$DB_PATH" "DROP TABLE IF EXISTS schema_migrations;"
     echo "Database recreated successfully."
 else
     echo "Creating database at $DB_PATH."
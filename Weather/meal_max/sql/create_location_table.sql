@@ -4,6 +4,12 @@ CREATE TABLE locations (
     locations TEXT NOT NULL UNIQUE,
     favorite BOOLEAN DEFAULT FALSE,
     weather TEXT NOT NULL,
-    forecast TEXT NOT NULL,
+    forecast TEXT,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
+
+-- History refers to location ids, which restart once the table is recreated.
+-- Migration 0006 creates these tables again when create_db.sh resets schema_migrations.
+DROP TABLE IF EXISTS weather_observations;
+DROP TABLE IF EXISTS weather_hourly;
+DROP TABLE IF EXISTS weather_daily;
@@ -8,4 +8,14 @@ CREATE TABLE meals (
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
     deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+);
+
+DROP TABLE IF EXISTS meal_leaderboard;
+CREATE TABLE meal_leaderboard (
+    meal_id INTEGER PRIMARY KEY,
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_pct REAL NOT NULL
+);
+CREATE INDEX idx_meal_leaderboard_wins ON meal_leaderboard(wins DESC, meal_id);
+CREATE INDEX idx_meal_leaderboard_win_pct ON meal_leaderboard(win_pct DESC, meal_id);
@@ -3,5 +3,5 @@ CREATE TABLE users (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     username TEXT NOT NULL UNIQUE,
     salt TEXT NOT NULL,
-    password TEXT NOT NULL,
+    password TEXT NOT NULL
 );
\ No newline at end of file
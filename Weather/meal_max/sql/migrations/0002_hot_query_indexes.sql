@@ -0,0 +1,5 @@
+-- get_leaderboard: WHERE deleted = false AND battles > 0 ORDER BY wins
+CREATE INDEX IF NOT EXISTS idx_meals_deleted_battles_wins ON meals(deleted, battles, wins);
+
+-- location lookups and listings skip soft-deleted rows
+CREATE INDEX IF NOT EXISTS idx_locations_deleted ON locations(deleted);
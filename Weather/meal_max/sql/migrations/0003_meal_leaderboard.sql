@@ -0,0 +1,15 @@
+-- Materialized leaderboard, kept in step with meals by kitchen_model in the
+-- same transaction as every stats write. Only active meals with battles have a row.
+CREATE TABLE IF NOT EXISTS meal_leaderboard (
+    meal_id INTEGER PRIMARY KEY,
+    battles INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_pct REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_meal_leaderboard_wins ON meal_leaderboard(wins DESC, meal_id);
+CREATE INDEX IF NOT EXISTS idx_meal_leaderboard_win_pct ON meal_leaderboard(win_pct DESC, meal_id);
+
+INSERT OR IGNORE INTO meal_leaderboard (meal_id, battles, wins, win_pct)
+SELECT id, battles, wins, wins * 1.0 / battles
+FROM meals WHERE deleted = FALSE AND battles > 0;
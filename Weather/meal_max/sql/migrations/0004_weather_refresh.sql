@@ -0,0 +1,5 @@
+-- When locations.weather was last fetched (unix seconds); 0 means never, so the refresher picks it up first
+ALTER TABLE locations ADD COLUMN weather_updated_at REAL NOT NULL DEFAULT 0;
+
+-- weather refresher: WHERE deleted = false AND weather_updated_at < ? ORDER BY weather_updated_at
+CREATE INDEX IF NOT EXISTS idx_locations_deleted_weather_updated ON locations(deleted, weather_updated_at);
@@ -0,0 +1,15 @@
+-- Typed weather fields, written alongside the formatted locations.weather string
+ALTER TABLE locations ADD COLUMN weather_condition TEXT;
+ALTER TABLE locations ADD COLUMN weather_description TEXT;
+ALTER TABLE locations ADD COLUMN temp REAL;          -- °C
+ALTER TABLE locations ADD COLUMN humidity INTEGER;   -- %
+ALTER TABLE locations ADD COLUMN pressure INTEGER;   -- hPa
+ALTER TABLE locations ADD COLUMN wind_speed REAL;    -- m/s
+ALTER TABLE locations ADD COLUMN observed_at INTEGER; -- unix time of the upstream observation
+
+-- search_locations_by_weather: WHERE deleted = false AND temp >= ? ORDER BY temp
+CREATE INDEX IF NOT EXISTS idx_locations_deleted_temp ON locations(deleted, temp);
+CREATE INDEX IF NOT EXISTS idx_locations_deleted_humidity ON locations(deleted, humidity);
+
+-- Existing rows only have the formatted string; make them due so the refresher fills in the typed fields
+UPDATE locations SET weather_updated_at = 0 WHERE temp IS NULL;
@@ -0,0 +1,34 @@
+-- Every fetched observation, clustered by (location_id, ts) so a location's series is one contiguous range
+CREATE TABLE IF NOT EXISTS weather_observations (
+    location_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,              -- unix time of the observation
+    temp REAL NOT NULL,               -- °C
+    humidity INTEGER NOT NULL,        -- %
+    pressure INTEGER,                 -- hPa
+    wind_speed REAL,                  -- m/s
+    condition_code INTEGER,           -- OpenWeatherMap condition id, e.g. 800 for clear sky
+    PRIMARY KEY (location_id, ts)
+) WITHOUT ROWID;
+
+-- Roll-ups maintained on insert; averages are the sums divided by samples
+CREATE TABLE IF NOT EXISTS weather_hourly (
+    location_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,          -- unix time of the start of the hour
+    samples INTEGER NOT NULL,
+    temp_sum REAL NOT NULL,
+    temp_min REAL NOT NULL,
+    temp_max REAL NOT NULL,
+    humidity_sum INTEGER NOT NULL,
+    PRIMARY KEY (location_id, bucket)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS weather_daily (
+    location_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,          -- unix time of the start of the UTC day
+    samples INTEGER NOT NULL,
+    temp_sum REAL NOT NULL,
+    temp_min REAL NOT NULL,
+    temp_max REAL NOT NULL,
+    humidity_sum INTEGER NOT NULL,
+    PRIMARY KEY (location_id, bucket)
+) WITHOUT ROWID;